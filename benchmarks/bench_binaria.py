@@ -0,0 +1,70 @@
+"""
+Imagen binaria empaquetada (1 bit por píxel) frente a uint8 0/255: memoria,
+conversión, operaciones lógicas y erosión/dilatación rectangulares. Usa un
+"documento escaneado" sintético grande y data/imagen_binaria.bmp, y comprueba
+que los resultados coinciden con OpenCV.
+Uso (desde la raíz del proyecto):  python -m benchmarks.bench_binaria [lado] [repeticiones]
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from src.logic.binaria import ImagenBinaria
+from benchmarks.comun import medir
+
+TAMANOS = [3, 9, 31, 101]
+
+def documento(lado, semilla=0):
+    """Texto simulado: renglones de "palabras" (rectángulos de tinta) sobre fondo blanco"""
+    rng = np.random.default_rng(semilla)
+    imagen = np.full((lado, lado), 255, np.uint8)
+    for y in range(40, lado - 40, 48):
+        x = 40
+        while x < lado - 80:
+            largo = int(rng.integers(20, 80))
+            imagen[y:y + 24, x:x + largo] = 0
+            x += largo + int(rng.integers(8, 20))
+    # Ruido de escaneo
+    imagen[rng.random((lado, lado)) < 0.002] ^= 255
+    return imagen
+
+def comparar(nombre, imagen, repeticiones):
+    otra = np.roll(imagen, 7, axis=1)
+    t_emp, binaria = medir(lambda: ImagenBinaria.desde_uint8(imagen), repeticiones)
+    t_des, _ = medir(binaria.a_uint8, repeticiones)
+    otra_binaria = ImagenBinaria.desde_uint8(otra)
+    print(f"\n{nombre}: {imagen.shape[1]}x{imagen.shape[0]}, uint8 {imagen.nbytes / 2**20:.1f} MB, "
+          f"empaquetada {binaria.nbytes / 2**20:.2f} MB")
+    print(f"  empaquetar {t_emp * 1e3:.1f} ms, desempaquetar {t_des * 1e3:.1f} ms  (tiempos en ms, mejor de {repeticiones})")
+
+    print(f"  {'operación':<14}{'uint8':>9}{'bits':>9}  iguales")
+    casos = [
+        ("AND", lambda: cv2.bitwise_and(imagen, otra), lambda: binaria & otra_binaria),
+        ("OR", lambda: cv2.bitwise_or(imagen, otra), lambda: binaria | otra_binaria),
+        ("XOR", lambda: cv2.bitwise_xor(imagen, otra), lambda: binaria ^ otra_binaria),
+        ("NOT", lambda: cv2.bitwise_not(imagen), lambda: ~binaria),
+    ]
+    for k in TAMANOS:
+        kernel = np.ones((k, k), np.uint8)
+        casos.append((f"erosión {k}", lambda kernel=kernel: cv2.erode(imagen, kernel),
+                      lambda k=k: binaria.erosionar(k)))
+        casos.append((f"dilatación {k}", lambda kernel=kernel: cv2.dilate(imagen, kernel),
+                      lambda k=k: binaria.dilatar(k)))
+    for operacion, con_uint8, con_bits in casos:
+        t_uint8, esperado = medir(con_uint8, repeticiones)
+        t_bits, obtenido = medir(con_bits, repeticiones)
+        print(f"  {operacion:<14}{t_uint8 * 1e3:>9.1f}{t_bits * 1e3:>9.1f}"
+              f"  {np.array_equal(obtenido.a_uint8(), esperado)}")
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 8192
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    binaria = cv2.imread(os.path.join("data", "imagen_binaria.bmp"), cv2.IMREAD_GRAYSCALE)
+    if binaria is not None:
+        comparar("imagen_binaria.bmp", np.where(binaria > 127, 255, 0).astype(np.uint8), repeticiones)
+    comparar("documento sintético", documento(lado), repeticiones)
+
+if __name__ == "__main__":
+    main()
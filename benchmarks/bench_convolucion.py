@@ -0,0 +1,49 @@
+"""
+Convolución con kernels grandes: filter2D directo, descomposición separable y
+FFT por bloques, junto al método que elige el modelo de coste (AUTO).
+Uso (desde la raíz del proyecto):  python -m benchmarks.bench_convolucion [ruta_imagen] [repeticiones]
+"""
+import sys
+
+import cv2
+import numpy as np
+
+from src.logic import convolucion
+from benchmarks.comun import medir
+
+TAMANOS = [3, 7, 15, 31, 63, 101]
+
+def kernels(k, rng):
+    g = cv2.getGaussianKernel(k, k / 5)
+    aleatorio = rng.random((k, k))
+    yield "gauss (rango 1)", g @ g.T
+    yield "gauss + rampa (rango 2)", g @ g.T + np.outer(np.ones(k), np.linspace(0, 1, k)) / (k * k)
+    yield "aleatorio", aleatorio / aleatorio.sum()
+
+def main():
+    ruta = sys.argv[1] if len(sys.argv) > 1 else "data/gl.jpg"
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    img = cv2.imread(ruta)
+    if img is None:
+        sys.exit(f"No se pudo leer {ruta}")
+    rng = np.random.default_rng(0)
+
+    print(f"{ruta} {img.shape[1]}x{img.shape[0]}. Tiempos en ms (mejor de {repeticiones}); "
+          f"error = máx |x - filter2D|\n")
+    print(f"{'kernel':<26}{'k':>4}{'directo':>9}{'separable':>11}{'fft':>8}{'auto':>11}{'error':>10}")
+    for k in TAMANOS:
+        for nombre, kernel in kernels(k, rng):
+            kernel = kernel.astype(np.float32)
+            tiempos, resultados = {}, {}
+            for metodo in ("DIRECTO", "SEPARABLE", "FFT"):
+                tiempos[metodo], resultados[metodo] = medir(
+                    lambda: convolucion.convolucionar(img, kernel, metodo), repeticiones)
+            error = max(float(np.abs(resultados[m] - resultados["DIRECTO"]).max()) for m in ("SEPARABLE", "FFT"))
+            elegido = convolucion.elegir_metodo(kernel)
+            marca = "" if tiempos[elegido] <= 1.1 * min(tiempos.values()) else "*"
+            print(f"{nombre:<26}{k:>4}{tiempos['DIRECTO'] * 1e3:>9.1f}{tiempos['SEPARABLE'] * 1e3:>11.1f}"
+                  f"{tiempos['FFT'] * 1e3:>8.1f}{elegido:>10}{marca:1}{error:>10.1e}")
+    print("\n* = el método elegido tarda más de un 10% que el mejor")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Mínimo/máximo rectangular: van Herk/Gil-Werman frente a scipy.ndimage y cv2.erode,
+con kernels de 3 a 301, en gris y en color. Comprueba además que los resultados
+son idénticos y da el tamaño a partir del cual vHGW gana a cv2.erode.
+Uso (desde la raíz del proyecto):  python -m benchmarks.bench_extremos [imagen] [repeticiones]
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+import scipy.ndimage as ndimage
+
+from src.logic import extremos
+from benchmarks.comun import medir
+
+TAMANOS = [3, 5, 9, 15, 21, 31, 51, 75, 101, 151, 201, 301]
+
+def main():
+    ruta = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data", "20161102_145611.jpg")
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    color = cv2.imread(ruta)
+    if color is None:
+        sys.exit(f"No se pudo leer {ruta}")
+    gris = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+    print(f"Imagen {ruta} {color.shape} (tiempos en ms, mejor de {repeticiones})\n")
+    print(f"{'k':>4} {'ndimage':>9} {'vHGW':>8} {'cv2.erode':>10} {'vHGW eros.':>11}"
+          f" {'ndimage BGR':>12} {'vHGW BGR':>9} {'cv2 BGR':>8}")
+    cruce_gris = cruce_color = None
+
+    for k in TAMANOS:
+        kernel = np.ones((k, k), np.uint8)
+        # Borde reflejado (filtro_maximo) y borde ignorado (erosión)
+        assert np.array_equal(ndimage.maximum_filter(gris, size=k), extremos.maximo_rectangular(gris, k))
+        assert np.array_equal(cv2.erode(gris, kernel), extremos.minimo_rectangular(gris, k, modo="ignorar"))
+        assert np.array_equal(ndimage.minimum_filter(color, size=(k, k, 1)), extremos.minimo_rectangular(color, k))
+
+        tiempos = [
+            medir(lambda: ndimage.maximum_filter(gris, size=k), repeticiones)[0],
+            medir(lambda: extremos.maximo_rectangular(gris, k), repeticiones)[0],
+            medir(lambda: cv2.erode(gris, kernel), repeticiones)[0],
+            medir(lambda: extremos.minimo_rectangular(gris, k, modo="ignorar"), repeticiones)[0],
+            medir(lambda: ndimage.minimum_filter(color, size=(k, k, 1)), repeticiones)[0],
+            medir(lambda: extremos.minimo_rectangular(color, k), repeticiones)[0],
+            medir(lambda: cv2.erode(color, kernel, borderType=cv2.BORDER_REFLECT), repeticiones)[0],
+        ]
+        print(f"{k:>4}" + "".join(f"{t * 1000:>{w}.1f}" for t, w in zip(tiempos, (10, 9, 11, 12, 13, 10, 9))))
+        if cruce_gris is None and tiempos[3] < tiempos[2]:
+            cruce_gris = k
+        if cruce_color is None and tiempos[5] < tiempos[6]:
+            cruce_color = k
+
+    print(f"\nvHGW gana a OpenCV desde k = {cruce_gris} (gris) y k = {cruce_color} (color)")
+    print(f"UMBRAL_KERNEL actual: {extremos.UMBRAL_KERNEL} (gris), {extremos.UMBRAL_KERNEL_COLOR} (color)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Perfil morfológico (aperturas y cierres k = 3, 5, ..., 61): escalas
+encadenadas frente a llamar a morfologia.apertura_ex / cierre_ex con cada k.
+Usa data/cameraman.tif y una imagen sintética grande, y comprueba que
+coinciden escala a escala.
+Uso (desde la raíz del proyecto):  python -m benchmarks.bench_granulometria [lado]
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from src.logic import granulometria, morfologia
+from benchmarks.comun import medir
+
+def sintetica(lado, semilla=0):
+    """Granos de varios tamaños sobre ruido suave"""
+    rng = np.random.default_rng(semilla)
+    ruido = rng.random((lado, lado)).astype(np.float32)
+    imagen = (cv2.GaussianBlur(ruido, (0, 0), 3) * 255).astype(np.uint8)
+    for _ in range(lado // 4):
+        x, y = rng.integers(0, lado, 2)
+        cv2.circle(imagen, (int(x), int(y)), int(rng.integers(2, 30)), 255, -1)
+    return imagen
+
+def comparar(nombre, imagen):
+    print(f"\n{nombre}: {imagen.shape[1]}x{imagen.shape[0]}, {len(granulometria.TAMANOS)} escalas (tiempos en s)")
+    print(f"  {'forma':<12}{'tipo':<10}{'directa':>9}{'encadenada':>12}  iguales")
+    for forma in ("RECTANGULO", "DIAMANTE"):
+        for tipo, directa in (("APERTURA", morfologia.apertura_ex), ("CIERRE", morfologia.cierre_ex)):
+            t_directa, referencia = medir(lambda: [directa(imagen, k, forma) for k in granulometria.TAMANOS])
+            t_encadenada, pila = medir(lambda: granulometria.perfil_morfologico(imagen, forma=forma, tipo=tipo))
+            iguales = all(np.array_equal(capa, esperada) for capa, esperada in zip(pila, referencia))
+            print(f"  {forma:<12}{tipo:<10}{t_directa:>9.3f}{t_encadenada:>12.3f}  {iguales}")
+    t_espectro, _ = medir(lambda: granulometria.espectro_patron(imagen))
+    print(f"  espectro de patrones (aperturas + cierres, sin pila): {t_espectro:.3f}")
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    gris = cv2.imread(os.path.join("data", "cameraman.tif"), cv2.IMREAD_GRAYSCALE)
+    if gris is not None:
+        comparar("cameraman.tif", gris)
+    comparar("sintética", sintetica(lado))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Escalado de la ejecución por bandas en paralelo (1..N hilos).
+Uso (desde la raíz del proyecto):  python -m benchmarks.bench_paralelo [imagen] [repeticiones]
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from src.logic.pipeline import Pipeline
+from src.logic import teselado
+from benchmarks.comun import medir
+
+RECETAS = ["filtro_maximo:9", "filtro_minimo:9", "filtro_kirsch", "filtro_prewitt", "filtro_roberts"]
+
+def main():
+    ruta = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data", "20161102_145611.jpg")
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    img = cv2.imread(ruta)
+    if img is None:
+        sys.exit(f"No se pudo leer {ruta}")
+    max_hilos = os.cpu_count() or 1
+    hilos = sorted({1, 2, 4, 8, 16, max_hilos} & set(range(1, max_hilos + 1)))
+    print(f"Imagen {ruta} {img.shape}, hasta {max_hilos} hilos\n")
+    print(f"{'operación':<18}" + "".join(f"{h:>6} h" for h in hilos) + "   aceleración")
+
+    for receta in RECETAS:
+        pipeline = Pipeline.desde_texto([receta])
+        base = pipeline.ejecutar(img)
+        tiempos = []
+        for h in hilos:
+            resultado = pipeline.ejecutar_en_paralelo(img, trabajadores=h)
+            assert np.array_equal(resultado, base), f"{receta} difiere con {h} hilos"
+            tiempos.append(medir(lambda: pipeline.ejecutar_en_paralelo(img, trabajadores=h), repeticiones)[0])
+        columnas = "".join(f"{t * 1000:7.0f}ms" for t in tiempos)
+        print(f"{receta:<18}{columnas}   x{tiempos[0] / tiempos[-1]:.2f}")
+
+if __name__ == "__main__":
+    main()
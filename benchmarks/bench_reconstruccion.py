@@ -0,0 +1,97 @@
+"""
+Reconstrucción morfológica: algoritmo híbrido (barridos + cola FIFO) frente a
+repetir dilatación geodésica hasta que no cambia. Usa data/imagen_binaria.bmp,
+una imagen en grises y máscaras sintéticas grandes: pasillos en zigzag horizontales y verticales
+y una espiral, cuyo camino geodésico recorre media imagen. Comprueba que coinciden.
+Uso (desde la raíz del proyecto):  python -m benchmarks.bench_reconstruccion [lado_sintetico] [max_iteraciones_ingenua]
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from src.logic import reconstruccion
+from benchmarks.comun import medir
+
+def ingenua(marcador, mascara, max_iteraciones):
+    """Dilatación geodésica repetida; None si no converge en max_iteraciones"""
+    kernel = np.ones((3, 3), np.uint8)
+    actual = np.minimum(marcador, mascara)
+    for _ in range(max_iteraciones):
+        siguiente = np.minimum(cv2.dilate(actual, kernel), mascara)
+        if np.array_equal(siguiente, actual):
+            return actual
+        actual = siguiente
+    return None
+
+def manchas(lado, semilla=0):
+    """Máscara binaria de manchas irregulares (ruido suavizado y umbralizado)"""
+    ruido = np.random.default_rng(semilla).random((lado, lado)).astype(np.float32)
+    return np.where(cv2.GaussianBlur(ruido, (0, 0), 6) > 0.5, 255, 0).astype(np.uint8)
+
+def serpentina(lado, paso=8):
+    """Pasillo en zigzag de una sola pieza: el camino geodésico es de ~lado² / paso píxeles"""
+    mascara = np.zeros((lado, lado), np.uint8)
+    for i, y in enumerate(range(0, lado, paso)):
+        mascara[y:y + paso // 2] = 255
+        if y + paso // 2 < lado:  # Unión con el tramo siguiente, alternando extremo
+            x = lado - paso // 2 if i % 2 == 0 else 0
+            mascara[y:y + paso, x:x + paso // 2] = 255
+    return mascara
+
+def espiral(lado, paso=8):
+    """Pasillo en espiral cuadrada hacia dentro: gira en los cuatro sentidos"""
+    izq = arr = paso // 2
+    der = aba = lado - 1 - paso // 2
+    puntos = [(izq, arr)]
+    while izq < der and arr < aba:
+        puntos += [(der, arr), (der, aba), (izq, aba)]
+        arr += paso
+        puntos.append((izq, arr))
+        izq, der, aba = izq + paso, der - paso, aba - paso
+    mascara = np.zeros((lado, lado), np.uint8)
+    cv2.polylines(mascara, [np.array(puntos, np.int32)], False, 255, thickness=paso // 2)
+    return mascara, puntos[0]
+
+def casos(lado):
+    binaria = cv2.imread(os.path.join("data", "imagen_binaria.bmp"), cv2.IMREAD_GRAYSCALE)
+    gris = cv2.imread(os.path.join("data", "cameraman.tif"), cv2.IMREAD_GRAYSCALE)
+    if binaria is not None:
+        binaria = np.where(binaria > 127, 255, 0).astype(np.uint8)
+        yield "imagen_binaria: apertura rec. 15", cv2.erode(binaria, np.ones((15, 15), np.uint8)), binaria
+        borde = np.zeros_like(binaria)
+        borde[[0, -1]], borde[:, [0, -1]] = binaria[[0, -1]], binaria[:, [0, -1]]
+        yield "imagen_binaria: desde el borde", borde, binaria
+    if gris is not None:
+        yield "cameraman: h-máximos h=20", np.clip(gris.astype(np.int16) - 20, 0, 255).astype(np.uint8), gris
+    mascara = manchas(lado)
+    semillas = np.zeros_like(mascara)
+    semillas[::lado // 8, ::lado // 8] = 255
+    yield f"manchas {lado}x{lado}: semillas", semillas, mascara
+    mascara = serpentina(lado)
+    marcador = np.zeros_like(mascara)
+    marcador[0, 0] = 255
+    yield f"serpentina {lado}x{lado}", marcador, mascara
+    yield f"serpentina vertical {lado}x{lado}", marcador.T.copy(), mascara.T.copy()
+    mascara, (x, y) = espiral(lado)
+    marcador = np.zeros_like(mascara)
+    marcador[y, x] = 255
+    yield f"espiral {lado}x{lado}", marcador, mascara
+
+def main():
+    lado = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    max_iteraciones = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    print(f"Tiempos en s. La ingenua se corta a {max_iteraciones} iteraciones\n")
+    print(f"{'caso':<36}{'píxeles':>10}{'híbrida':>9}{'ingenua':>9}  iguales")
+    for nombre, marcador, mascara in casos(lado):
+        t_hibrida, hibrida = medir(lambda: reconstruccion.reconstruccion_dilatacion(marcador, mascara))
+        t_ingenua, referencia = medir(lambda: ingenua(marcador, mascara, max_iteraciones))
+        if referencia is None:
+            print(f"{nombre:<40}{mascara.size:>10}{t_hibrida:>9.3f}{'>' + format(t_ingenua, '.1f'):>9}  (no converge)")
+        else:
+            print(f"{nombre:<40}{mascara.size:>10}{t_hibrida:>9.3f}{t_ingenua:>9.3f}"
+                  f"  {np.array_equal(hibrida, referencia)}")
+
+if __name__ == "__main__":
+    main()
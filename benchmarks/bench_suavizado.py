@@ -0,0 +1,42 @@
+"""
+Suavizado que preserva bordes: filtro guiado y rejilla bilateral frente a
+cv2.bilateralFilter, con radios crecientes, sobre las imágenes de data/.
+Uso (desde la raíz del proyecto):  python -m benchmarks.bench_suavizado [max_megapixeles] [repeticiones]
+"""
+import os
+import sys
+
+import cv2
+
+from src.logic import suavizado
+from benchmarks.comun import medir
+
+RADIOS = [2, 4, 8, 16, 32]
+SIGMA_RANGO = 25.0
+EXTENSIONES = (".png", ".jpg", ".jpeg", ".bmp", ".tif")
+
+def main():
+    # cv2.bilateralFilter con radios grandes es muy lento: por defecto se saltan las imágenes enormes
+    max_mp = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    rutas = sorted(os.path.join("data", n) for n in os.listdir("data") if n.lower().endswith(EXTENSIONES))
+
+    print(f"Tiempos en ms (mejor de {repeticiones}); PSNR en dB respecto a cv2.bilateralFilter\n")
+    print(f"{'imagen':<26}{'r':>4}{'cv2':>10}{'guiado':>9}{'rejilla':>9}{'PSNR guiado':>13}{'PSNR rejilla':>14}")
+    for ruta in rutas:
+        img = cv2.imread(ruta)
+        if img is None:
+            continue
+        if img.shape[0] * img.shape[1] > max_mp * 1e6:
+            print(f"{os.path.basename(ruta):<26}  (omitida, {img.shape[1]}x{img.shape[0]})")
+            continue
+        for r in RADIOS:
+            t_cv, ref = medir(lambda: cv2.bilateralFilter(img, 2 * r + 1, SIGMA_RANGO, r), repeticiones)
+            t_guiado, guiado = medir(lambda: suavizado.filtro_guiado(img, r), repeticiones)
+            t_rejilla, rejilla = medir(lambda: suavizado.filtro_bilateral_rejilla(img, r, SIGMA_RANGO),
+                                       repeticiones)
+            print(f"{os.path.basename(ruta):<26}{r:>4}{t_cv * 1000:>10.1f}{t_guiado * 1000:>9.1f}"
+                  f"{t_rejilla * 1000:>9.1f}{cv2.PSNR(ref, guiado):>13.1f}{cv2.PSNR(ref, rejilla):>14.1f}")
+
+if __name__ == "__main__":
+    main()
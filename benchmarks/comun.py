@@ -0,0 +1,13 @@
+"""
+Utilidades compartidas por los benchmarks.
+"""
+import time
+
+def medir(funcion, repeticiones=1):
+    """(mejor tiempo en s de `repeticiones` llamadas a funcion(), resultado de la última)"""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
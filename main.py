@@ -1,8 +1,14 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from src.ui.ventana import VentanaPrincipal
 
 if __name__ == "__main__":
+    # Modo por lotes (sin interfaz): python main.py --lote --op filtro_gaussiano:5 ...
+    if len(sys.argv) > 1 and sys.argv[1] == "--lote":
+        from src.cli import lote
+        sys.exit(lote.main(sys.argv[2:]))
+
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.ventana import VentanaPrincipal
+
     # 1. Crea la instancia de la aplicación
     app = QApplication(sys.argv)
     
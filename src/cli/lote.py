@@ -0,0 +1,141 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import cv2
+
+from src.logic import teselado
+from src.logic.pipeline import Pipeline
+
+# ==========================================
+# PROCESAMIENTO POR LOTES (SIN INTERFAZ)
+# ==========================================
+# Aplica una receta (lista ordenada de operaciones del registro) a todas las
+# imágenes de una carpeta, repartiendo los archivos entre varios procesos.
+# La receta viaja a los procesos como texto ('filtro_gaussiano:5') y cada uno
+# arma su propio Pipeline. Con pocas imágenes muy grandes conviene menos
+# procesos y más hilos por proceso (--hilos): las recetas teselables se
+# reparten entonces por bandas dentro de cada imagen.
+
+EXTENSIONES = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+def _iniciar_trabajador(hilos=1):
+    # Cada proceso ya es un núcleo; evitamos que OpenCV lance sus propios hilos.
+    # Los hilos que sí se usan son los de las bandas (teselado), si se piden
+    cv2.setNumThreads(1)
+    teselado.configurar_trabajadores(hilos)
+
+def procesar_archivo(ruta_entrada, ruta_salida, receta):
+    """Lee, aplica la receta y escribe. Retorna (segundos, megapíxeles)"""
+    inicio = time.perf_counter()
+    img = cv2.imread(ruta_entrada)
+    if img is None:
+        raise ValueError(f"No se pudo leer {ruta_entrada}")
+    megapixeles = img.shape[0] * img.shape[1] / 1e6
+    pipeline = Pipeline.desde_texto(receta)
+    if teselado.obtener_trabajadores() > 1 and pipeline.es_teselable():
+        img = pipeline.ejecutar_en_paralelo(img)
+    else:
+        img = pipeline.ejecutar(img)
+    cv2.imwrite(ruta_salida, img)
+    return time.perf_counter() - inicio, megapixeles
+
+def nombre_salida(ruta_entrada):
+    """
+    Nombre del PNG de salida. Se conserva la extensión original ('a.jpg' ->
+    'a.jpg.png') para que 'a.jpg' y 'a.tif' no se pisen; un PNG se queda igual.
+    """
+    nombre = os.path.basename(ruta_entrada)
+    return nombre if nombre.lower().endswith(".png") else nombre + ".png"
+
+def listar_imagenes(carpeta):
+    return sorted(
+        os.path.join(carpeta, f) for f in os.listdir(carpeta)
+        if f.lower().endswith(EXTENSIONES)
+    )
+
+def ejecutar_lote(entrada, salida, receta, procesos=None, en_vuelo=None, hilos=1):
+    """
+    Procesa todas las imágenes de `entrada` y escribe PNGs en `salida` (ver nombre_salida).
+    `en_vuelo` limita cuántos archivos hay a la vez en proceso (acota la memoria).
+    `hilos`: hilos por proceso para las recetas teselables (por bandas).
+    Retorna la lista de (archivo, segundos, megapíxeles, error).
+    """
+    procesos = procesos or os.cpu_count() or 1
+    en_vuelo = en_vuelo or 2 * procesos
+    os.makedirs(salida, exist_ok=True)
+
+    # Validar la receta antes de lanzar procesos
+    Pipeline.desde_texto(receta)
+
+    archivos = listar_imagenes(entrada)
+    # Por si el sistema de archivos de salida no distingue mayúsculas
+    destinos = {}
+    for ruta in archivos:
+        clave = os.path.normcase(nombre_salida(ruta)).lower()
+        if clave in destinos:
+            raise ValueError(f"{os.path.basename(ruta)} y {os.path.basename(destinos[clave])} "
+                             f"se escribirían en el mismo archivo de salida")
+        destinos[clave] = ruta
+
+    resultados = []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                             initargs=(hilos,)) as pool:
+        pendientes = {}
+        cola = iter(archivos)
+        while True:
+            # Mantener como mucho `en_vuelo` tareas encoladas
+            for ruta in cola:
+                futuro = pool.submit(procesar_archivo, ruta, os.path.join(salida, nombre_salida(ruta)), receta)
+                pendientes[futuro] = ruta
+                if len(pendientes) >= en_vuelo:
+                    break
+            if not pendientes:
+                break
+
+            hechos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                ruta = pendientes.pop(futuro)
+                try:
+                    segundos, mp = futuro.result()
+                    resultados.append((ruta, segundos, mp, None))
+                    print(f"  {os.path.basename(ruta):<30} {segundos * 1000:8.1f} ms  {mp:6.2f} MP")
+                except Exception as e:
+                    resultados.append((ruta, 0.0, 0.0, str(e)))
+                    print(f"  {os.path.basename(ruta):<30} ERROR: {e}")
+    return resultados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Procesamiento por lotes sin interfaz gráfica")
+    parser.add_argument("--entrada", default="data", help="Carpeta con las imágenes de entrada")
+    parser.add_argument("--salida", default="salidas", help="Carpeta donde se guardan los resultados")
+    parser.add_argument("--op", action="append", default=[], dest="ops",
+                        help="Operación 'nombre:arg1,clave=valor' (se puede repetir, se aplican en orden)")
+    parser.add_argument("--procesos", type=int, default=None, help="Número de procesos (por defecto, núcleos)")
+    parser.add_argument("--hilos", type=int, default=1,
+                        help="Hilos por proceso para recetas teselables (por defecto 1)")
+    args = parser.parse_args(argv)
+
+    if not args.ops:
+        parser.error("Indica al menos una operación con --op")
+    if args.hilos < 1:
+        parser.error("--hilos debe ser al menos 1")
+    try:
+        Pipeline.desde_texto(args.ops)
+    except ValueError as e:
+        parser.error(str(e))
+
+    inicio = time.perf_counter()
+    try:
+        resultados = ejecutar_lote(args.entrada, args.salida, args.ops, args.procesos, hilos=args.hilos)
+    except ValueError as e:
+        parser.error(str(e))
+    total = time.perf_counter() - inicio
+
+    correctos = [r for r in resultados if r[3] is None]
+    megapixeles = sum(r[2] for r in correctos)
+    print(f"\n{len(correctos)}/{len(resultados)} imágenes en {total:.2f} s")
+    if total > 0:
+        print(f"Rendimiento: {len(correctos) / total:.2f} img/s, {megapixeles / total:.2f} MP/s")
+    return 0 if len(correctos) == len(resultados) else 1
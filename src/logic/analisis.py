@@ -1,7 +1,8 @@
 import cv2
 import numpy as np
 from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+from src.logic import granulometria
 
 # --- NUEVO: CÁLCULO DE PROPIEDADES ---
 def calcular_estadisticas(imagen):
@@ -46,6 +47,12 @@ def calcular_estadisticas(imagen):
     }
     return stats
 
+def ecualizar_histograma(imagen):
+    """Ecualiza el histograma (las imágenes a color se pasan antes a grises)"""
+    if len(imagen.shape) == 3:
+        imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    return cv2.equalizeHist(imagen)
+
 # --- FUNCIONES ORIGINALES (MANTENIDAS) ---
 
 def calcular_histograma(imagen, modelo_actual="RGB"):
@@ -92,6 +99,23 @@ def calcular_histograma(imagen, modelo_actual="RGB"):
     ax.grid(True, alpha=0.3)
     return fig
 
+def calcular_espectro_patron(imagen, forma="RECTANGULO"):
+    """Espectro de patrones (cierres a la izquierda, aperturas a la derecha), ver granulometria.py"""
+    return figura_espectro_patron(*granulometria.espectro_patron(imagen, forma=forma))
+
+def figura_espectro_patron(escalas, espectro):
+    """Gráfica de un espectro ya calculado (el cálculo puede ir en otro hilo)"""
+    fig = Figure(figsize=(5, 4), dpi=100)
+    ax = fig.add_subplot(111)
+    colores = ['#444444' if k < 0 else '#0078d7' for k in escalas]
+    ax.bar(escalas, espectro * 100, width=1.6, color=colores)
+    ax.axvline(0, color='black', linewidth=0.8)
+    ax.set_title("Espectro de Patrones (Granulometría)")
+    ax.set_xlabel("Tamaño del elemento (− cierres / + aperturas)")
+    ax.set_ylabel("% del volumen")
+    ax.grid(True, alpha=0.3)
+    return fig
+
 def separar_canales(imagen, modelo="RGB"):
     if len(imagen.shape) == 2:
         return [("Gris / Binario", imagen)]
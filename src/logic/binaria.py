@@ -0,0 +1,184 @@
+import cv2
+import numpy as np
+
+# ==========================================
+# IMAGEN BINARIA EMPAQUETADA (1 BIT POR PÍXEL)
+# ==========================================
+# Cada fila se guarda en palabras de 64 bits: el píxel x es el bit x % 64 de
+# la palabra x // 64 (orden de bits "little"). Ocupa 8 veces menos que la
+# versión uint8 0/255 y las operaciones lógicas procesan 64 píxeles por
+# instrucción. Los bits de relleno del final de cada fila están siempre a 0.
+#
+# Erosión y dilatación rectangulares se hacen sobre las palabras: desplazar
+# la imagen x píxeles es desplazar bits (con acarreo entre palabras), y el
+# AND/OR de una ventana de k desplazamientos se obtiene por duplicación en
+# log2(k) pasos. Como en cv2.erode/cv2.dilate, lo que cae fuera de la imagen
+# no cuenta. Para mostrarla, a_uint8() la devuelve en la forma 0/255.
+
+_BITS = 64
+_PALABRA = np.dtype("<u8")  # Explícito: la correspondencia byte -> bit no depende de la máquina
+_UNOS = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class ImagenBinaria:
+    def __init__(self, palabras, ancho):
+        self.palabras = palabras  # (alto, palabras por fila), uint64
+        self.ancho = ancho
+
+    @classmethod
+    def desde_uint8(cls, imagen, umbral=127):
+        """Empaqueta una imagen (gris o BGR): un píxel está activo si vale más que `umbral`"""
+        if len(imagen.shape) == 3:
+            imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+        alto, ancho = imagen.shape
+        bytes_fila = -(-ancho // _BITS) * 8
+        empaquetada = np.zeros((alto, bytes_fila), np.uint8)
+        bits = np.packbits(imagen > umbral, axis=1, bitorder="little")
+        empaquetada[:, :bits.shape[1]] = bits
+        return cls(empaquetada.view(_PALABRA), ancho)
+
+    def a_uint8(self):
+        """La imagen como uint8 0/255 (para mostrarla o seguir con OpenCV)"""
+        bits = np.unpackbits(self.palabras.view(np.uint8), axis=1, count=self.ancho, bitorder="little")
+        bits *= 255
+        return bits
+
+    @property
+    def shape(self):
+        return self.palabras.shape[0], self.ancho
+
+    @property
+    def nbytes(self):
+        return self.palabras.nbytes
+
+    def contar(self):
+        """Número de píxeles activos"""
+        return int(np.bitwise_count(self.palabras).sum())
+
+    def _relleno(self):
+        """Máscara de los bits que no son píxeles (el final de la última palabra de cada fila)"""
+        relleno = np.zeros(self.palabras.shape[1], _PALABRA)
+        sobrantes = self.palabras.shape[1] * _BITS - self.ancho
+        if sobrantes:
+            relleno[-1] = ~(_UNOS >> np.uint64(sobrantes))
+        return relleno
+
+    def _nueva(self, palabras):
+        return ImagenBinaria(palabras, self.ancho)
+
+    # --- Lógica ---
+    def _compatible(self, otra):
+        if not isinstance(otra, ImagenBinaria):
+            return NotImplemented
+        if otra.shape != self.shape:
+            raise ValueError(f"Las imágenes binarias deben tener el mismo tamaño: {self.shape} y {otra.shape}")
+        return otra
+
+    def __and__(self, otra):
+        otra = self._compatible(otra)
+        return otra if otra is NotImplemented else self._nueva(self.palabras & otra.palabras)
+
+    def __or__(self, otra):
+        otra = self._compatible(otra)
+        return otra if otra is NotImplemented else self._nueva(self.palabras | otra.palabras)
+
+    def __xor__(self, otra):
+        otra = self._compatible(otra)
+        return otra if otra is NotImplemented else self._nueva(self.palabras ^ otra.palabras)
+
+    def __invert__(self):
+        # El relleno tiene que seguir a 0
+        return self._nueva(~self.palabras & ~self._relleno())
+
+    def __eq__(self, otra):
+        return (isinstance(otra, ImagenBinaria) and otra.shape == self.shape
+                and np.array_equal(self.palabras, otra.palabras))
+
+    __hash__ = None
+
+    # --- Morfología ---
+    def _extremo(self, alto, ancho, es_erosion):
+        # Fuera de la imagen: 1 para la erosión (no la limita), 0 para la dilatación
+        operacion = np.bitwise_and if es_erosion else np.bitwise_or
+        relleno = self._relleno()[-1]
+        palabras = _ventana_horizontal(self.palabras, ancho, operacion, es_erosion, relleno)
+        palabras = _ventana_vertical(palabras, alto, operacion)
+        if palabras is self.palabras:
+            palabras = palabras.copy()
+        palabras[:, -1] &= ~relleno
+        return self._nueva(palabras)
+
+    def erosionar(self, alto, ancho=None):
+        """Erosión con un rectángulo alto x ancho (mismo resultado que cv2.erode)"""
+        return self._extremo(alto, alto if ancho is None else ancho, True)
+
+    def dilatar(self, alto, ancho=None):
+        """Dilatación con un rectángulo alto x ancho (mismo resultado que cv2.dilate)"""
+        return self._extremo(alto, alto if ancho is None else ancho, False)
+
+
+# --- Ventanas sobre las palabras ---
+def _fondo(relleno):
+    return _UNOS if relleno else np.uint64(0)
+
+def _desplazado(palabras, c, relleno, out):
+    """out[x] = imagen[x + c] en cada fila (c >= 0); por la derecha entra el fondo"""
+    n = palabras.shape[1]
+    q, b = divmod(c, _BITS)
+    out[:, max(n - q, 0):] = _fondo(relleno)
+    if q >= n:
+        return out
+    if b == 0:
+        out[:, :n - q] = palabras[:, q:]
+        return out
+    # Cada palabra toma sus bits de la palabra q y el acarreo de la q + 1
+    np.right_shift(palabras[:, q:], np.uint64(b), out=out[:, :n - q])
+    out[:, :n - q - 1] |= palabras[:, q + 1:] << np.uint64(_BITS - b)
+    out[:, n - q - 1] |= _fondo(relleno) << np.uint64(_BITS - b)
+    return out
+
+def _combinar_vertical(palabras, c, operacion):
+    """palabras[y] = operacion(palabras[y], palabras[y + c]), en su sitio. Las últimas c filas
+    se combinarían con el fondo, que es el neutro de la operación: se quedan igual"""
+    if c < palabras.shape[0]:
+        operacion(palabras[:-c], palabras[c:], out=palabras[:-c])
+
+def _duplicar(palabras, k, combinar):
+    """Tras esto, cada posición combina la ventana [x, x + k) (duplicando: log2(k) pasos)"""
+    cubierto = 1
+    while cubierto * 2 <= k:
+        combinar(palabras, cubierto)
+        cubierto *= 2
+    if cubierto < k:
+        combinar(palabras, k - cubierto)
+
+def _ventana_horizontal(palabras, k, operacion, relleno, bits_relleno):
+    """operacion (AND/OR) de la ventana de k píxeles con el mismo ancla que cv2 (k // 2 a la izquierda)"""
+    if k <= 1:
+        return palabras
+    # Palabras de fondo a la izquierda para que existan las ventanas que empiezan fuera
+    antes = k // 2
+    palabras_antes = -(-antes // _BITS)
+    ampliada = np.empty((palabras.shape[0], palabras_antes + palabras.shape[1]), _PALABRA)
+    ampliada[:, :palabras_antes] = _fondo(relleno)
+    ampliada[:, palabras_antes:] = palabras
+    if relleno:
+        ampliada[:, -1] |= bits_relleno  # Los bits que no son píxeles también son fondo
+    desplazado = np.empty_like(ampliada)
+    _duplicar(ampliada, k, lambda p, c: operacion(p, _desplazado(p, c, relleno, desplazado), out=p))
+    # La ventana del píxel x empieza en x - antes, que en la ampliada es el bit x + desfase
+    desfase = palabras_antes * _BITS - antes
+    if desfase:
+        ampliada = _desplazado(ampliada, desfase, relleno, desplazado)
+    return ampliada[:, :palabras.shape[1]]
+
+def _ventana_vertical(palabras, k, operacion):
+    if k <= 1:
+        return palabras
+    antes = k // 2
+    ampliada = np.empty((antes + palabras.shape[0], palabras.shape[1]), _PALABRA)
+    ampliada[:antes] = _fondo(operacion is np.bitwise_and)
+    ampliada[antes:] = palabras
+    _duplicar(ampliada, k, lambda p, c: _combinar_vertical(p, c, operacion))
+    # La fila y del resultado es la ventana que empieza en y - k // 2, o sea ampliada[y]
+    return ampliada[:palabras.shape[0]]
@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from src.logic.inmutable import congelar
+
+# ==========================================
+# CACHÉ DE RESULTADOS (DIRECCIONADA POR CONTENIDO)
+# ==========================================
+# La clave combina un hash rápido del buffer de entrada, el nombre de la
+# operación y sus parámetros; si la misma operación se repite sobre la misma
+# imagen (alternar resultados, rehacer tras deshacer) se reutiliza el
+# resultado. Se expulsa el menos usado (LRU) cuando se supera el límite de
+# memoria. Es segura entre hilos.
+
+# Huellas ya calculadas de imágenes congeladas: su contenido no puede cambiar,
+# así que el hash se calcula una sola vez por array.
+_huellas = {}
+_lock_huellas = threading.Lock()
+
+def _olvidar_huella(id_array):
+    with _lock_huellas:
+        _huellas.pop(id_array, None)
+
+def huella(imagen):
+    """Hash (blake2b de 128 bits) de forma, tipo y contenido de la imagen"""
+    congelada = not imagen.flags.writeable
+    if congelada:
+        with _lock_huellas:
+            entrada = _huellas.get(id(imagen))
+        if entrada is not None and entrada[0]() is imagen:
+            return entrada[1]
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((imagen.shape, imagen.dtype.str)).encode())
+    h.update(np.ascontiguousarray(imagen).data)
+    resultado = h.digest()
+
+    if congelada:
+        ref = weakref.ref(imagen, lambda _, i=id(imagen): _olvidar_huella(i))
+        with _lock_huellas:
+            _huellas[id(imagen)] = (ref, resultado)
+    return resultado
+
+def _clave_parametro(valor):
+    return huella(valor) if isinstance(valor, np.ndarray) else valor
+
+
+class CacheResultados:
+    def __init__(self, max_bytes=256 * 1024**2):
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()  # clave -> resultado (el final es el más reciente)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(imagen, nombre, params):
+        return (huella(imagen), nombre,
+                tuple(sorted((k, _clave_parametro(v)) for k, v in params.items())))
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def obtener(self, clave):
+        with self._lock:
+            resultado = self._entradas.get(clave)
+            if resultado is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return resultado
+
+    def guardar(self, clave, resultado):
+        """Guarda el resultado (congelado, para que nadie lo modifique) y lo retorna"""
+        if not isinstance(resultado, np.ndarray) or resultado.nbytes > self.max_bytes:
+            return resultado
+        congelar(resultado)
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= anterior.nbytes
+            self._entradas[clave] = resultado
+            self._bytes += resultado.nbytes
+            while self._bytes > self.max_bytes:
+                _, expulsado = self._entradas.popitem(last=False)
+                self._bytes -= expulsado.nbytes
+        return resultado
+
+    def ejecutar(self, nombre, funcion, imagen, params):
+        """Retorna funcion(imagen, **params) desde la caché si ya se calculó"""
+        clave = self.clave(imagen, nombre, params)
+        resultado = self.obtener(clave)
+        if resultado is None:
+            resultado = self.guardar(clave, funcion(imagen, **params))
+        return resultado
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+            self.aciertos = 0
+            self.fallos = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+            }
+
+
+# Caché de la interfaz (trabajador.py). El registro, el pipeline, las teselas
+# y los lotes no la usan salvo que se les pase explícitamente
+CACHE = CacheResultados()
@@ -1,10 +1,13 @@
 import cv2
 import numpy as np
 
-def aplicar_modelo(imagen, modelo):
+from src.logic import integral
+
+def aplicar_modelo(imagen, modelo, ventana=25):
     """
     Controlador principal para cambios de espacio de color.
-    modelos: 'RGB', 'GRAY', 'BINARY', 'HSV', 'CMYK'
+    modelos: 'RGB', 'GRAY', 'BINARY', 'NIBLACK', 'SAUVOLA', 'HSV', 'CMYK'
+    ventana: lado de la ventana local de NIBLACK/SAUVOLA
     """
     if imagen is None: return None
     
@@ -13,7 +16,8 @@ def aplicar_modelo(imagen, modelo):
     if len(imagen.shape) == 2:
         img_bgr = cv2.cvtColor(imagen, cv2.COLOR_GRAY2BGR)
     else:
-        img_bgr = imagen.copy()
+        # Sin copia: ninguna rama escribe sobre img_bgr (y puede venir congelada)
+        img_bgr = imagen
 
     # 2. Aplicar transformación
     if modelo == "RGB":
@@ -31,6 +35,13 @@ def aplicar_modelo(imagen, modelo):
         _, binaria = cv2.threshold(gris, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         return binaria
 
+    elif modelo == "NIBLACK":
+        # Umbral local (media y desviación de la vecindad) en vez de uno global
+        return integral.umbral_niblack(img_bgr, ventana)
+
+    elif modelo == "SAUVOLA":
+        return integral.umbral_sauvola(img_bgr, ventana)
+
     elif modelo == "HSV":
         return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
 
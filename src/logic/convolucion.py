@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+import scipy.fft
+
+from src.logic.cache import huella
+
+# ==========================================
+# CONVOLUCIÓN CON SELECCIÓN AUTOMÁTICA DE MÉTODO
+# ==========================================
+# Mismo resultado que cv2.filter2D (correlación, ancla en el centro, borde
+# BORDER_REFLECT_101) calculado por el camino más barato:
+# - DIRECTO: filter2D tal cual
+# - SEPARABLE: el kernel se descompone con SVD en r productos columna x fila
+#   (r = rango numérico) y cada uno es un sepFilter2D
+# - FFT: por bloques (overlap-save). Cada bloque de salida lee su región con
+#   el halo del kernel, se transforma a un tamaño óptimo y se multiplica por el
+#   espectro del kernel, que se calcula una vez y se guarda.
+# El modelo de coste estima las operaciones por píxel de cada método; las
+# constantes salen de medir en una máquina normal (ver _COSTE_*).
+
+METODOS = ("AUTO", "DIRECTO", "SEPARABLE", "FFT")
+
+TAM_BLOQUE = 512        # Lado del bloque de salida en el método FFT
+TOLERANCIA_RANGO = 1e-6  # Valor singular relativo por debajo del cual se descarta
+MAX_ESPECTROS = 8
+
+# Coste relativo por píxel de cada método, calibrado midiendo en una CPU de
+# escritorio (unidades arbitrarias, solo importa la comparación)
+_COSTE_DIRECTO = 1.5          # por coeficiente del kernel
+_AREA_DFT_OPENCV = 50         # desde este área filter2D ya usa su propia DFT de imagen entera
+_COSTE_DFT_OPENCV = 1.4       # ... que cuesta esto respecto a nuestra FFT por bloques
+_COSTE_PASADA = 5.0           # fijo por cada sepFilter2D (y la suma de su resultado)
+_COSTE_SEPARABLE = 0.45       # por coeficiente de cada pasada 1D
+_COSTE_FFT = 5.0              # por píxel del bloque transformado y log2 de su tamaño
+
+_espectros = OrderedDict()  # (huella del kernel, tamaño fft) -> espectro
+_lock = threading.Lock()
+
+
+def descomponer(kernel):
+    """Pares (columna, fila) cuya suma de productos exteriores reproduce el kernel"""
+    u, s, vt = np.linalg.svd(kernel.astype(np.float64))
+    rango = int(np.sum(s > s[0] * TOLERANCIA_RANGO)) if s[0] > 0 else 0
+    return [((u[:, i] * np.sqrt(s[i])).astype(np.float32),
+             (vt[i] * np.sqrt(s[i])).astype(np.float32)) for i in range(rango)]
+
+def _tam_fft(kernel):
+    alto, ancho = kernel.shape
+    return (cv2.getOptimalDFTSize(TAM_BLOQUE + alto - 1), cv2.getOptimalDFTSize(TAM_BLOQUE + ancho - 1))
+
+def estimar_costes(kernel, rango=None):
+    """Coste relativo por píxel de salida de cada método"""
+    alto, ancho = kernel.shape
+    rango = len(descomponer(kernel)) if rango is None else rango
+    fft_alto, fft_ancho = _tam_fft(kernel)
+    # Directa + inversa de cada bloque, repartidas entre los píxeles útiles del bloque
+    por_bloque = fft_alto * fft_ancho * np.log2(fft_alto * fft_ancho)
+    fft = _COSTE_FFT * por_bloque / (TAM_BLOQUE * TAM_BLOQUE)
+    area = alto * ancho
+    directo = _COSTE_DIRECTO * area if area < _AREA_DFT_OPENCV else _COSTE_DFT_OPENCV * fft
+    return {
+        "DIRECTO": directo,
+        "SEPARABLE": max(rango, 1) * (_COSTE_PASADA + _COSTE_SEPARABLE * (alto + ancho)),
+        "FFT": fft,
+    }
+
+def elegir_metodo(kernel):
+    costes = estimar_costes(kernel)
+    return min(costes, key=costes.get)
+
+# --- Métodos ---
+def _directo(imagen, kernel):
+    return cv2.filter2D(imagen, cv2.CV_32F, kernel, borderType=cv2.BORDER_REFLECT_101)
+
+def _separable(imagen, kernel):
+    resultado = None
+    for columna, fila in descomponer(kernel):
+        parte = cv2.sepFilter2D(imagen, cv2.CV_32F, fila, columna, borderType=cv2.BORDER_REFLECT_101)
+        resultado = parte if resultado is None else cv2.add(resultado, parte, dst=resultado)
+    if resultado is None:  # Kernel nulo
+        resultado = np.zeros(imagen.shape, np.float32)
+    return resultado
+
+def _espectro_kernel(kernel, tam):
+    """Espectro (rfft2) del kernel girado 180° (correlación) a tamaño `tam`, cacheado"""
+    clave = (huella(kernel), tam)
+    with _lock:
+        espectro = _espectros.get(clave)
+        if espectro is not None:
+            _espectros.move_to_end(clave)
+            return espectro
+    espectro = scipy.fft.rfft2(kernel[::-1, ::-1].astype(np.float32), s=tam)
+    with _lock:
+        _espectros[clave] = espectro
+        while len(_espectros) > MAX_ESPECTROS:
+            _espectros.popitem(last=False)
+    return espectro
+
+def _fft_canal(canal, kernel):
+    alto, ancho = canal.shape
+    k_alto, k_ancho = kernel.shape
+    # Ancla en el centro, como filter2D
+    ay, ax = k_alto // 2, k_ancho // 2
+    ampliada = cv2.copyMakeBorder(canal.astype(np.float32), ay, k_alto - 1 - ay, ax, k_ancho - 1 - ax,
+                                  cv2.BORDER_REFLECT_101)
+    tam = _tam_fft(kernel)
+    espectro = _espectro_kernel(kernel, tam)
+
+    salida = np.empty((alto, ancho), np.float32)
+    for y0 in range(0, alto, TAM_BLOQUE):
+        for x0 in range(0, ancho, TAM_BLOQUE):
+            y1, x1 = min(y0 + TAM_BLOQUE, alto), min(x0 + TAM_BLOQUE, ancho)
+            region = ampliada[y0:y1 + k_alto - 1, x0:x1 + k_ancho - 1]
+            circular = scipy.fft.irfft2(scipy.fft.rfft2(region, s=tam) * espectro, s=tam)
+            # Overlap-save: la parte válida empieza donde el kernel ya cabe entero
+            salida[y0:y1, x0:x1] = circular[k_alto - 1:k_alto - 1 + y1 - y0, k_ancho - 1:k_ancho - 1 + x1 - x0]
+    return salida
+
+def _fft(imagen, kernel):
+    if imagen.ndim == 2:
+        return _fft_canal(imagen, kernel)
+    return cv2.merge([_fft_canal(imagen[..., c], kernel) for c in range(imagen.shape[2])])
+
+_METODOS = {"DIRECTO": _directo, "SEPARABLE": _separable, "FFT": _fft}
+
+def convolucionar(imagen, kernel, metodo="AUTO"):
+    """
+    Equivalente a cv2.filter2D(imagen, CV_32F, kernel) (resultado float32),
+    eligiendo el método más barato si metodo='AUTO'.
+    """
+    kernel = np.asarray(kernel, dtype=np.float32)
+    if metodo not in METODOS:
+        raise ValueError(f"Método de convolución desconocido: '{metodo}'")
+    if metodo == "AUTO":
+        metodo = elegir_metodo(kernel)
+    return _METODOS[metodo](imagen, kernel)
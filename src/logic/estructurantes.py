@@ -0,0 +1,154 @@
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from src.logic import extremos
+
+# ==========================================
+# ELEMENTOS ESTRUCTURANTES DESCOMPUESTOS
+# ==========================================
+# Erosionar con A ⊕ B (suma de Minkowski) es lo mismo que erosionar con A y
+# luego con B, así que un elemento grande se puede aplicar como varias pasadas
+# de elementos pequeños o de líneas, cuyo coste crece con k y no con k²:
+# - RECTANGULO: una fila y una columna (resultado idéntico al kernel denso)
+# - DIAMANTE: cruz 3x3 ⊕ línea diagonal ⊕ línea antidiagonal. Las dos
+#   diagonales dan los puntos de paridad par del rombo (una "línea periódica")
+#   y la cruz rellena los impares. Es exacto.
+# - DISCO: octágono fila ⊕ columna ⊕ diagonal ⊕ antidiagonal, con las
+#   longitudes que mejor aproximan el círculo. Por debajo de UMBRAL_DISCO se
+#   usa el disco exacto de una pasada (es barato y el octágono se nota).
+# Las líneas horizontales y verticales usan extremos.minimo/maximo (tiempo
+# constante con ventanas grandes); el resto, cv2.erode/cv2.dilate.
+#
+# Bordes: como cv2.erode/cv2.dilate, lo que cae fuera de la imagen no cuenta.
+
+FORMAS = ("RECTANGULO", "DIAMANTE", "DISCO")
+
+UMBRAL_DISCO = 15  # Diámetro desde el que el disco se aproxima con un octágono
+MAX_ELEMENTOS = 32
+
+_elementos = OrderedDict()  # (forma, tam) -> ElementoEstructurante
+_lock = threading.Lock()
+
+def _linea(longitud, direccion):
+    """Línea centrada de `longitud` (impar) píxeles: H, V, D (diagonal) o A (antidiagonal)"""
+    if direccion == "H":
+        return np.ones((1, longitud), np.uint8)
+    if direccion == "V":
+        return np.ones((longitud, 1), np.uint8)
+    diagonal = np.eye(longitud, dtype=np.uint8)
+    return diagonal if direccion == "D" else np.ascontiguousarray(diagonal[:, ::-1])
+
+_CRUZ = cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3))
+
+def _es_recta(kernel):
+    """Fila o columna de unos: se puede aplicar con extremos.minimo/maximo"""
+    return min(kernel.shape) == 1 and kernel.all()
+
+def _componer(pasadas, tam):
+    """Máscara tam x tam equivalente a encadenar las pasadas (dilatación de un punto)"""
+    mascara = np.zeros((tam, tam), np.uint8)
+    mascara[tam // 2, tam // 2] = 1
+    for kernel in pasadas:
+        mascara = cv2.dilate(mascara, kernel)
+    return mascara
+
+def _pasadas_diamante(radio):
+    if radio <= 1:
+        return [_CRUZ] if radio == 1 else []
+    if radio % 2 == 0:
+        return _pasadas_diamante(radio - 1) + [_CRUZ]
+    return [_CRUZ, _linea(radio, "D"), _linea(radio, "A")]
+
+def _pasadas_disco(radio, disco):
+    """
+    Octágono fila(a) ⊕ columna(a) ⊕ diagonal(b) ⊕ antidiagonal(b) más parecido
+    al disco. Las dos diagonales juntas llegan a b - 1 píxeles en cada eje, así
+    que (a - 1) / 2 + (b - 1) = radio.
+    """
+    tam = 2 * radio + 1
+    mejor, menor_error = None, None
+    for b in range(1, radio + 1, 2):
+        a = 2 * radio + 3 - 2 * b
+        pasadas = [_linea(a, "H"), _linea(a, "V")]
+        if b > 1:
+            pasadas += [_linea(b, "D"), _linea(b, "A")]
+        error = np.count_nonzero(_componer(pasadas, tam) != disco)
+        if menor_error is None or error < menor_error:
+            mejor, menor_error = pasadas, error
+    return mejor
+
+class ElementoEstructurante:
+    """
+    Elemento estructurante tam x tam y las pasadas con que se aplica.
+    - mascara: el elemento que se aplica de verdad (uint8 0/1, solo lectura)
+    - pasadas: kernels cuya suma de Minkowski es `mascara`
+    """
+    def __init__(self, forma, tam):
+        if forma not in FORMAS:
+            raise ValueError(f"Forma de elemento estructurante desconocida: '{forma}'")
+        self.forma = forma
+        self.tam = tam
+        if forma == "RECTANGULO":
+            # Mismo ancla que np.ones((tam, tam)) en cv2.erode, también con tam par
+            self.pasadas = [np.ones((1, tam), np.uint8), np.ones((tam, 1), np.uint8)]
+            self.mascara = np.ones((tam, tam), np.uint8)
+            self._margen = 0  # Fila y columna no necesitan ampliar la imagen
+        else:
+            # Diamante y disco son simétricos: el tamaño efectivo es impar
+            radio = tam // 2
+            lado = 2 * radio + 1
+            if forma == "DIAMANTE":
+                self.pasadas = _pasadas_diamante(radio)
+                self.mascara = _componer(self.pasadas, lado)
+            else:
+                disco = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (lado, lado))
+                self.pasadas = [disco] if lado < UMBRAL_DISCO else _pasadas_disco(radio, disco)
+                self.mascara = _componer(self.pasadas, lado)
+            # Encadenadas en una imagen ampliada con el neutro, dan lo mismo que la
+            # máscara entera también en los bordes
+            self._margen = radio if len(self.pasadas) > 1 else 0
+        self.mascara.setflags(write=False)
+
+    def _aplicar(self, imagen, es_minimo):
+        if not self.pasadas:
+            return imagen.copy()
+        resultado = imagen
+        if self._margen:
+            info = np.iinfo(imagen.dtype) if imagen.dtype.kind in "ui" else np.finfo(imagen.dtype)
+            m = self._margen
+            resultado = np.pad(imagen, [(m, m), (m, m)] + [(0, 0)] * (imagen.ndim - 2),
+                               constant_values=info.max if es_minimo else info.min)
+        for kernel in self.pasadas:
+            if _es_recta(kernel):
+                extremo = extremos.minimo if es_minimo else extremos.maximo
+                resultado = extremo(resultado, kernel.shape[0], kernel.shape[1], modo="ignorar")
+            else:
+                resultado = (cv2.erode if es_minimo else cv2.dilate)(resultado, kernel)
+        if self._margen:
+            resultado = np.ascontiguousarray(resultado[self._margen:-self._margen, self._margen:-self._margen])
+        return resultado
+
+    def erosionar(self, imagen):
+        return self._aplicar(imagen, True)
+
+    def dilatar(self, imagen):
+        return self._aplicar(imagen, False)
+
+
+def elemento(forma="RECTANGULO", tam=5):
+    """ElementoEstructurante (forma, tam), reutilizando el ya construido si existe"""
+    clave = (forma, int(tam))
+    with _lock:
+        construido = _elementos.get(clave)
+        if construido is not None:
+            _elementos.move_to_end(clave)
+            return construido
+    construido = ElementoEstructurante(forma, int(tam))
+    with _lock:
+        _elementos[clave] = construido
+        while len(_elementos) > MAX_ELEMENTOS:
+            _elementos.popitem(last=False)
+    return construido
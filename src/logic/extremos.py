@@ -0,0 +1,113 @@
+import cv2
+import numpy as np
+
+# ==========================================
+# MÍNIMO / MÁXIMO RECTANGULAR EN TIEMPO CONSTANTE (VAN HERK / GIL-WERMAN)
+# ==========================================
+# Un filtro de mínimo o máximo rectangular es separable: primero por filas y
+# luego por columnas. En 1D, van Herk/Gil-Werman parte la señal en bloques
+# del tamaño de la ventana y calcula el acumulado de cada bloque hacia
+# delante (g) y hacia atrás (h). Cualquier ventana cruza como mucho dos
+# bloques, así que su extremo es extremo(h[x], g[x + k - 1]). Son unas tres
+# comparaciones por píxel sin importar el tamaño de la ventana.
+#
+# Los canales se procesan a la vez (el eje de color no se toca), así que
+# funciona igual en gris que en color.
+
+# Bordes:
+# - "reflejar": d c b a | a b c d  (el modo por defecto de scipy.ndimage)
+# - "ignorar": el borde no cuenta (como cv2.erode/cv2.dilate por defecto)
+
+def _rellenar(imagen, eje, antes, despues, modo, funcion):
+    if modo == "reflejar":
+        ancho = [(0, 0)] * imagen.ndim
+        ancho[eje] = (antes, despues)
+        return np.pad(imagen, ancho, mode="symmetric")
+    # El elemento neutro del extremo: el mayor valor para el mínimo y viceversa
+    info = np.iinfo(imagen.dtype) if imagen.dtype.kind in "ui" else np.finfo(imagen.dtype)
+    neutro = info.max if funcion is np.minimum else info.min
+    ancho = [(0, 0)] * imagen.ndim
+    ancho[eje] = (antes, despues)
+    return np.pad(imagen, ancho, mode="constant", constant_values=neutro)
+
+def _extremo_vertical(imagen, tam, funcion, modo):
+    """Extremo en una ventana vertical de `tam` filas: [y - tam//2, y + (tam - 1) - tam//2]"""
+    n = imagen.shape[0]
+    antes = tam // 2
+    despues = tam - 1 - antes
+    # Se completa hasta un múltiplo del tamaño de bloque (el relleno extra no se lee)
+    bloques = -(-(n + tam - 1) // tam)
+    relleno = bloques * tam - (n + tam - 1)
+    g = _rellenar(imagen, 0, antes, despues + relleno, modo, funcion)
+    h = g.copy()
+
+    # Acumulados por bloque, fila a fila y en su sitio (cada fila es contigua)
+    gb = g.reshape((bloques, tam) + g.shape[1:])
+    hb = h.reshape(gb.shape)
+    for j in range(1, tam):
+        funcion(gb[:, j - 1], gb[:, j], out=gb[:, j])
+        funcion(hb[:, tam - j], hb[:, tam - j - 1], out=hb[:, tam - j - 1])
+
+    return funcion(h[:n], g[tam - 1:tam - 1 + n], out=h[:n])
+
+def _transponer(imagen):
+    # cv2.transpose es bastante más rápido que copiar la vista transpuesta de NumPy
+    if imagen.ndim == 2 or imagen.shape[2] <= 4:
+        return cv2.transpose(imagen)
+    return np.ascontiguousarray(np.swapaxes(imagen, 0, 1))
+
+def extremo_1d(imagen, tam, eje, funcion, modo="reflejar"):
+    """
+    Mínimo (funcion=np.minimum) o máximo (np.maximum) en una ventana de `tam`
+    píxeles a lo largo de `eje` (0 = vertical, 1 = horizontal).
+    """
+    if tam <= 1:
+        return imagen.copy()
+    if eje == 0:
+        return _extremo_vertical(imagen, tam, funcion, modo)
+    # En horizontal se transpone para que los bloques sean filas contiguas
+    return _transponer(_extremo_vertical(_transponer(imagen), tam, funcion, modo))
+
+def minimo_rectangular(imagen, alto, ancho=None, modo="reflejar"):
+    """Mínimo en una ventana alto x ancho (por canal si la imagen es a color)"""
+    ancho = alto if ancho is None else ancho
+    filas = extremo_1d(imagen, ancho, 1, np.minimum, modo)
+    return extremo_1d(filas, alto, 0, np.minimum, modo)
+
+def maximo_rectangular(imagen, alto, ancho=None, modo="reflejar"):
+    """Máximo en una ventana alto x ancho (por canal si la imagen es a color)"""
+    ancho = alto if ancho is None else ancho
+    filas = extremo_1d(imagen, ancho, 1, np.maximum, modo)
+    return extremo_1d(filas, alto, 0, np.maximum, modo)
+
+# --- Selección automática ---
+# cv2.erode/cv2.dilate cuestan O(k) por píxel pero están muy vectorizados: en
+# todo el rango habitual (3..101) son más rápidos y son los que se usan. El
+# coste constante solo compensa a partir de estos tamaños, medidos con
+# benchmarks/bench_extremos.py (en color OpenCV tarda más en perder). Por
+# debajo, el camino de van Herk se usa solo con tipos que OpenCV no admite.
+UMBRAL_KERNEL = 121
+UMBRAL_KERNEL_COLOR = 151
+
+_BORDES_CV = {"reflejar": cv2.BORDER_REFLECT, "ignorar": cv2.BORDER_CONSTANT}
+_TIPOS_CV = (np.uint8, np.uint16, np.int16, np.float32, np.float64)
+
+def _usar_opencv(imagen, alto, ancho):
+    umbral = UMBRAL_KERNEL if imagen.ndim == 2 else UMBRAL_KERNEL_COLOR
+    return max(alto, ancho) < umbral and imagen.dtype in _TIPOS_CV
+
+def minimo(imagen, alto, ancho=None, modo="reflejar"):
+    """Mínimo rectangular con el método más rápido para el tamaño de ventana"""
+    ancho = alto if ancho is None else ancho
+    if _usar_opencv(imagen, alto, ancho):
+        kernel = np.ones((alto, ancho), np.uint8)
+        return cv2.erode(imagen, kernel, borderType=_BORDES_CV[modo])
+    return minimo_rectangular(imagen, alto, ancho, modo)
+
+def maximo(imagen, alto, ancho=None, modo="reflejar"):
+    """Máximo rectangular con el método más rápido para el tamaño de ventana"""
+    ancho = alto if ancho is None else ancho
+    if _usar_opencv(imagen, alto, ancho):
+        kernel = np.ones((alto, ancho), np.uint8)
+        return cv2.dilate(imagen, kernel, borderType=_BORDES_CV[modo])
+    return maximo_rectangular(imagen, alto, ancho, modo)
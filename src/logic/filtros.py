@@ -1,6 +1,10 @@
 import cv2
 import numpy as np
-import scipy.ndimage as ndimage
+
+from src.logic import convolucion
+from src.logic import extremos
+from src.logic import gradientes
+from src.logic import rango
 
 def convertir_a_grises(imagen):
     """Convierte a escala de grises si es necesario"""
@@ -17,75 +21,58 @@ def filtro_promedio(imagen, kernel_size=3):
     return cv2.blur(imagen, (kernel_size, kernel_size))
 
 def filtro_mediana(imagen, kernel_size=3):
-    """Filtro de mediana (ideal para sal y pimienta)"""
+    """Filtro de mediana (ideal para sal y pimienta). Admite cualquier tipo: ver rango.py"""
     # kernel_size debe ser impar
     k = kernel_size if kernel_size % 2 == 1 else kernel_size + 1
-    return cv2.medianBlur(imagen, k)
+    return rango.filtro_rango(imagen, k)
 
 def filtro_gaussiano(imagen, kernel_size=3):
     """Filtro Gaussiano"""
     k = kernel_size if kernel_size % 2 == 1 else kernel_size + 1
     return cv2.GaussianBlur(imagen, (k, k), 0)
 
+def filtro_personalizado(imagen, kernel, metodo="AUTO"):
+    """Convolución con un kernel arbitrario (directa, separable o FFT según su tamaño y rango)"""
+    return _saturar_uint8(convolucion.convolucionar(imagen, kernel, metodo))
+
 def filtro_maximo(imagen, kernel_size=3):
-    """Filtro de máximo (elimina puntos negros/pimienta)"""
-    # Funciona mejor en escala de grises para visualizar
-    img = convertir_a_grises(imagen)
-    return ndimage.maximum_filter(img, size=kernel_size)
+    """Filtro de máximo (elimina puntos negros/pimienta). En color, canal a canal"""
+    # Mismo resultado que ndimage.maximum_filter (borde reflejado), en tiempo constante con kernels grandes
+    return extremos.maximo(imagen, kernel_size)
 
 def filtro_minimo(imagen, kernel_size=3):
-    """Filtro de mínimo (elimina puntos blancos/sal)"""
-    img = convertir_a_grises(imagen)
-    return ndimage.minimum_filter(img, size=kernel_size)
+    """Filtro de mínimo (elimina puntos blancos/sal). En color, canal a canal"""
+    return extremos.minimo(imagen, kernel_size)
 
 
 # ==========================================
 # FILTROS DE DETECCIÓN DE BORDES
 # ==========================================
 
+def magnitud_sobel(imagen):
+    """Magnitud del gradiente Sobel sin normalizar (float32, operación local, radio 1)"""
+    return gradientes.magnitud(imagen, "sobel")
+
 def filtro_sobel(imagen):
     """Operador Sobel (Magnitud de gradientes X e Y)"""
-    img = convertir_a_grises(imagen)
-    sobelx = cv2.Sobel(img, cv2.CV_64F, 1, 0, ksize=3)
-    sobely = cv2.Sobel(img, cv2.CV_64F, 0, 1, ksize=3)
-    
-    # Calcular magnitud
-    magnitud = cv2.magnitude(sobelx, sobely)
-    
     # Normalizar a 0-255 y convertir a uint8
-    magnitud = cv2.normalize(magnitud, None, 0, 255, cv2.NORM_MINMAX)
-    return np.uint8(magnitud)
+    return gradientes.normalizar_uint8(magnitud_sobel(imagen))
+
+def filtro_scharr(imagen):
+    """Operador Scharr (como Sobel pero más isotrópico)"""
+    return gradientes.normalizar_uint8(gradientes.magnitud(imagen, "scharr"))
+
+def _magnitud_saturada(imagen, operador):
+    """Magnitud en float32 (cuentan también las derivadas negativas); solo el resultado se recorta a 0-255"""
+    return _saturar_uint8(gradientes.magnitud(imagen, operador))
 
 def filtro_prewitt(imagen):
     """Operador Prewitt"""
-    img = convertir_a_grises(imagen)
-    
-    # Kernels de Prewitt
-    kernelx = np.array([[1, 0, -1], [1, 0, -1], [1, 0, -1]], dtype=np.float32)
-    kernely = np.array([[1, 1, 1], [0, 0, 0], [-1, -1, -1]], dtype=np.float32)
-    
-    # Aplicar filtros
-    prewittx = cv2.filter2D(img, -1, kernelx)
-    prewitty = cv2.filter2D(img, -1, kernely)
-    
-    # Combinar (suma ponderada aproximada o magnitud)
-    # Usamos addWeighted para simular la combinación visual
-    bordes = cv2.addWeighted(prewittx, 0.5, prewitty, 0.5, 0)
-    return bordes
+    return _magnitud_saturada(imagen, "prewitt")
 
 def filtro_roberts(imagen):
     """Operador Roberts"""
-    img = convertir_a_grises(imagen)
-    
-    # Kernels de Roberts
-    kernelx = np.array([[1, 0], [0, -1]], dtype=np.float32)
-    kernely = np.array([[0, 1], [-1, 0]], dtype=np.float32)
-    
-    robertsx = cv2.filter2D(img, -1, kernelx)
-    robertsy = cv2.filter2D(img, -1, kernely)
-    
-    bordes = cv2.addWeighted(robertsx, 0.5, robertsy, 0.5, 0)
-    return bordes
+    return _magnitud_saturada(imagen, "roberts")
 
 def filtro_canny(imagen):
     """Detector de bordes Canny"""
@@ -101,25 +88,71 @@ def filtro_laplaciano(imagen):
     lap = np.uint8(np.absolute(lap))
     return lap
 
+# ==========================================
+# OPERADORES DE BRÚJULA (KIRSCH, ROBINSON, FREI-CHEN)
+# ==========================================
+# Se aplica una máscara por dirección y se queda el máximo en cada píxel.
+# El máximo se acumula en su sitio sobre un buffer reutilizado, así que la
+# memoria pico es de unos dos cuadros sin importar cuántas direcciones haya.
+
+def _rotaciones_brujula(mascara):
+    """Las 8 rotaciones de 45° de una máscara 3x3 (N, NE, E, SE, S, SW, W, NW)"""
+    # Anillo exterior en sentido horario empezando por la esquina superior izquierda
+    anillo = [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0), (1, 0)]
+    valores = [mascara[f][c] for f, c in anillo]
+    rotaciones = []
+    for giro in range(8):
+        rotada = np.array(mascara, dtype=np.float32)
+        for i, (f, c) in enumerate(anillo):
+            rotada[f, c] = valores[(i - giro) % 8]
+        rotaciones.append(rotada)
+    return rotaciones
+
+MASCARAS_KIRSCH = _rotaciones_brujula([[5, 5, 5], [-3, 0, -3], [-3, -3, -3]])
+MASCARAS_ROBINSON = _rotaciones_brujula([[1, 2, 1], [0, 0, 0], [-1, -2, -1]])
+MASCARAS_FREI_CHEN = _rotaciones_brujula([[1, np.sqrt(2), 1], [0, 0, 0], [-1, -np.sqrt(2), -1]])
+
+def operador_brujula(imagen, mascaras, orientacion=False):
+    """
+    Respuesta máxima (con signo) de un conjunto de máscaras direccionales.
+    Si orientacion=True retorna también el índice (uint8) de la máscara ganadora.
+    """
+    img = convertir_a_grises(imagen)
+    # Máscaras enteras en int16 (sobra para 8 bits); las demás en float32
+    enteras = all(np.array_equal(m, np.round(m)) for m in mascaras)
+    profundidad = cv2.CV_16S if enteras else cv2.CV_32F
+
+    maximo = cv2.filter2D(img, profundidad, mascaras[0])
+    respuesta = np.empty_like(maximo)
+    direccion = np.zeros(img.shape, dtype=np.uint8) if orientacion else None
+    gana = np.empty(img.shape, dtype=bool) if orientacion else None
+
+    for i, mascara in enumerate(mascaras[1:], start=1):
+        cv2.filter2D(img, profundidad, mascara, dst=respuesta)
+        if orientacion:
+            np.greater(respuesta, maximo, out=gana)
+            np.putmask(direccion, gana, i)
+        np.maximum(maximo, respuesta, out=maximo)
+
+    if orientacion:
+        return maximo, direccion
+    return maximo
+
+def _saturar_uint8(respuesta):
+    """Redondea y recorta a 0-255 (como hace filter2D al escribir en uint8)"""
+    if respuesta.dtype.kind == "f":
+        np.rint(respuesta, out=respuesta)
+    np.clip(respuesta, 0, 255, out=respuesta)
+    return respuesta.astype(np.uint8)
+
 def filtro_kirsch(imagen):
     """Operador Kirsch (Máximo de 8 direcciones)"""
-    img = convertir_a_grises(imagen)
-    
-    # Las 8 máscaras de Kirsch
-    kernels = [
-        np.array([[5, 5, 5], [-3, 0, -3], [-3, -3, -3]]),      # N
-        np.array([[-3, 5, 5], [-3, 0, 5], [-3, -3, -3]]),      # NE
-        np.array([[-3, -3, 5], [-3, 0, 5], [-3, -3, 5]]),      # E
-        np.array([[-3, -3, -3], [-3, 0, 5], [-3, 5, 5]]),      # SE
-        np.array([[-3, -3, -3], [-3, 0, -3], [5, 5, 5]]),      # S
-        np.array([[-3, -3, -3], [5, 0, -3], [5, 5, -3]]),      # SW
-        np.array([[5, -3, -3], [5, 0, -3], [5, -3, -3]]),      # W
-        np.array([[5, 5, -3], [5, 0, -3], [-3, -3, -3]])       # NW
-    ]
-    
-    # Aplicar todos los kernels y tomar el máximo en cada píxel
-    respuestas = [cv2.filter2D(img, -1, k) for k in kernels]
-    
-    # Combinar tomando el máximo valor pixel a pixel
-    bordes = np.max(respuestas, axis=0)
-    return bordes
+    return _saturar_uint8(operador_brujula(imagen, MASCARAS_KIRSCH))
+
+def filtro_robinson(imagen):
+    """Operador Robinson (Sobel en 8 direcciones)"""
+    return _saturar_uint8(operador_brujula(imagen, MASCARAS_ROBINSON))
+
+def filtro_frei_chen(imagen):
+    """Operador Frei-Chen (gradiente isotrópico en 8 direcciones)"""
+    return _saturar_uint8(operador_brujula(imagen, MASCARAS_FREI_CHEN))
@@ -1,46 +1,189 @@
+import threading
+from collections import OrderedDict
+
 import cv2
 import numpy as np
+import scipy.fft
+
+from src.logic.cache import huella
+from src.logic.gradientes import normalizar_uint8
+
+# ==========================================
+# ESPECTRO CACHEADO
+# ==========================================
+# La transformada directa es lo caro y no depende del filtro: se calcula una
+# vez por imagen y se reutiliza al barrer radios o cambiar de pasa bajas a
+# pasa altas. Se usa la FFT real (solo medio espectro, float32), y la imagen
+# se amplía por reflexión hasta un tamaño que la FFT resuelve rápido
+# (cv2.getOptimalDFTSize).
+
+MAX_ESPECTROS = 2  # Espectros de imágenes distintas que se conservan
+
+_espectros = OrderedDict()  # huella -> Espectro
+_lock = threading.Lock()
+
+
+class Espectro:
+    """Medio espectro (rfft2) de una imagen en grises ampliada a un tamaño óptimo"""
+    def __init__(self, imagen):
+        gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY) if len(imagen.shape) == 3 else imagen
+        self.forma = gris.shape
+        alto, ancho = self.forma
+        self.forma_fft = (cv2.getOptimalDFTSize(alto), cv2.getOptimalDFTSize(ancho))
+        ampliada = cv2.copyMakeBorder(np.float32(gris), 0, self.forma_fft[0] - alto,
+                                      0, self.forma_fft[1] - ancho, cv2.BORDER_REFLECT)
+        self.datos = scipy.fft.rfft2(ampliada)
+
+    @property
+    def clave_mascara(self):
+        """Lo que determina la geometría de las máscaras de este espectro"""
+        return self.forma, self.forma_fft
+
+    def invertir(self, filtro):
+        """Aplica una máscara (medio espectro, sin centrar) y retorna la imagen real recortada"""
+        filtrado = self.datos * filtro
+        resultado = scipy.fft.irfft2(filtrado, s=self.forma_fft)
+        return resultado[:self.forma[0], :self.forma[1]]
+
+
+def espectro(imagen):
+    """Espectro de la imagen, reutilizando el ya calculado si existe"""
+    clave = huella(imagen)
+    with _lock:
+        calculado = _espectros.get(clave)
+        if calculado is not None:
+            _espectros.move_to_end(clave)
+            return calculado
+    calculado = Espectro(imagen)
+    with _lock:
+        _espectros[clave] = calculado
+        while len(_espectros) > MAX_ESPECTROS:
+            _espectros.popitem(last=False)
+    return calculado
+
+def _a_visualizacion(resultado):
+    # Como antes: magnitud normalizada a 0-255
+    return normalizar_uint8(np.abs(resultado).astype(np.float32))
+
+# ==========================================
+# BANCO DE FILTROS
+# ==========================================
+# Máscaras float32 de medio espectro en coordenadas sin centrar (el origen es
+# la esquina [0, 0]), así que no hacen falta fftshift/ifftshift. Cada máscara
+# se genera una vez por (forma, familia, tipo, parámetros) y se guarda en una
+# caché acotada.
+
+FAMILIAS = ("IDEAL", "BUTTERWORTH", "GAUSSIANO")
+TIPOS = ("PASA_BAJAS", "PASA_ALTAS", "PASA_BANDA", "RECHAZA_BANDA", "NOTCH_RECHAZO", "NOTCH_PASO")
+
+MAX_MASCARAS = 16
+
+_mascaras = OrderedDict()  # (forma, forma_fft, familia, tipo, parámetros) -> máscara
+_lock_mascaras = threading.Lock()
+
+def _frecuencias(forma, forma_fft):
+    """
+    Frecuencias (fy, fx) de cada posición del medio espectro, en las unidades del
+    tamaño original: así un radio de corte significa lo mismo con o sin ampliación
+    """
+    fy = scipy.fft.fftfreq(forma_fft[0]).astype(np.float32) * forma[0]
+    fx = scipy.fft.rfftfreq(forma_fft[1]).astype(np.float32) * forma[1]
+    return fy[:, None], fx[None, :]
+
+def _pasa_bajas(d2, familia, radio, orden):
+    """Respuesta pasa bajas en función de la distancia² al centro del filtro"""
+    radio2 = np.float32(radio) ** 2
+    if familia == "IDEAL":
+        return (d2 <= radio2).astype(np.float32)
+    if familia == "BUTTERWORTH":
+        return 1 / (1 + (d2 / radio2) ** orden)
+    return np.exp(-d2 / (2 * radio2))
+
+def _rechaza_banda(d2, familia, radio, ancho, orden):
+    d = np.sqrt(d2)
+    if familia == "IDEAL":
+        return (np.abs(d - radio) > ancho / 2).astype(np.float32)
+    # Distancia "normalizada" a la banda: 0 en el anillo, crece al alejarse
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = (d2 - np.float32(radio) ** 2) / (d * np.float32(ancho))
+    x[~np.isfinite(x)] = np.inf  # El origen queda siempre fuera de la banda
+    if familia == "BUTTERWORTH":
+        return 1 - 1 / (1 + x ** (2 * orden))
+    return 1 - np.exp(-x * x)
+
+def _notch_rechazo(fy, fx, familia, radio, orden, centros):
+    mascara = np.ones(np.broadcast_shapes(fy.shape, fx.shape), np.float32)
+    for v, u in centros:
+        # Cada notch va acompañado de su simétrico (el espectro de una imagen real lo es)
+        for signo in (1, -1):
+            d2 = (fy - signo * v) ** 2 + (fx - signo * u) ** 2
+            mascara *= 1 - _pasa_bajas(d2, familia, radio, orden)
+    return mascara
+
+def _generar_mascara(forma, forma_fft, familia, tipo, radio, ancho, orden, centros):
+    fy, fx = _frecuencias(forma, forma_fft)
+    if tipo in ("NOTCH_RECHAZO", "NOTCH_PASO"):
+        mascara = _notch_rechazo(fy, fx, familia, radio, orden, centros)
+        return mascara if tipo == "NOTCH_RECHAZO" else 1 - mascara
+
+    d2 = fy ** 2 + fx ** 2
+    if tipo in ("PASA_BAJAS", "PASA_ALTAS"):
+        mascara = _pasa_bajas(d2, familia, radio, orden)
+        return mascara if tipo == "PASA_BAJAS" else 1 - mascara
+    mascara = _rechaza_banda(d2, familia, radio, ancho, orden)
+    return mascara if tipo == "RECHAZA_BANDA" else 1 - mascara
+
+def mascara(esp, familia="IDEAL", tipo="PASA_BAJAS", radio=30, ancho=10, orden=2, centros=()):
+    """
+    Máscara float32 (medio espectro, sin centrar) para el espectro `esp`.
+    - radio: corte (o centro de la banda, o radio de cada notch)
+    - ancho: anchura de la banda (PASA_BANDA / RECHAZA_BANDA)
+    - orden: orden del Butterworth
+    - centros: frecuencias (fila, columna) de los notch respecto a la frecuencia cero
+    """
+    if familia not in FAMILIAS:
+        raise ValueError(f"Familia de filtro desconocida: '{familia}'")
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de filtro desconocido: '{tipo}'")
+    centros = tuple(tuple(c) for c in centros)
+    clave = esp.clave_mascara + (familia, tipo, float(radio), float(ancho), int(orden), centros)
+    with _lock_mascaras:
+        generada = _mascaras.get(clave)
+        if generada is not None:
+            _mascaras.move_to_end(clave)
+            return generada
+    generada = _generar_mascara(*esp.clave_mascara, familia, tipo, radio, ancho, orden, centros)
+    generada = np.ascontiguousarray(generada, dtype=np.float32)
+    generada.setflags(write=False)
+    with _lock_mascaras:
+        _mascaras[clave] = generada
+        while len(_mascaras) > MAX_MASCARAS:
+            _mascaras.popitem(last=False)
+    return generada
+
+def aplicar_filtro(imagen, familia="IDEAL", tipo="PASA_BAJAS", radio_corte=30,
+                   ancho_banda=10, orden=2, centros=()):
+    """Filtro del banco (familia x tipo) aplicado en frecuencia; retorna la imagen normalizada"""
+    esp = espectro(imagen)
+    return _a_visualizacion(esp.invertir(mascara(esp, familia, tipo, radio_corte, ancho_banda, orden, centros)))
+
+def aplicar_filtro_cortes(imagen, familia="IDEAL", tipo="PASA_BAJAS", radios=(10, 30, 60),
+                          ancho_banda=10, orden=2, centros=()):
+    """El mismo filtro con varios radios de corte y una sola transformada directa"""
+    esp = espectro(imagen)
+    return [_a_visualizacion(esp.invertir(mascara(esp, familia, tipo, r, ancho_banda, orden, centros)))
+            for r in radios]
+
+# ==========================================
+# FILTRO IDEAL
+# ==========================================
 
 def aplicar_filtro_ideal(imagen, tipo="PASA_BAJAS", radio_corte=30):
     """
     Aplica filtros en el dominio de la frecuencia usando FFT.
     """
-    # 1. Convertir a grises si es necesario
-    if len(imagen.shape) == 3:
-        img_gray = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
-    else:
-        img_gray = imagen
-
-    # 2. Transformada de Fourier 2D
-    dft = cv2.dft(np.float32(img_gray), flags=cv2.DFT_COMPLEX_OUTPUT)
-    dft_shift = np.fft.fftshift(dft)
-
-    # 3. Crear la máscara (Filtro Ideal: Círculo blanco o negro)
-    filas, cols = img_gray.shape
-    centro_filas, centro_cols = filas // 2, cols // 2
-    
-    # Máscara base
-    mascara = np.zeros((filas, cols, 2), np.uint8)
-    
-    # Definir el círculo
-    x, y = np.ogrid[:filas, :cols]
-    mask_area = (x - centro_filas)**2 + (y - centro_cols)**2 <= radio_corte**2
-    
-    if tipo == "PASA_BAJAS":
-        # Pasa Bajas: Deja pasar el centro (bajas frecuencias) -> Círculo Blanco
-        mascara[mask_area] = 1
-    else: 
-        # Pasa Altas: Bloquea el centro -> Invertir máscara
-        mascara[:, :] = 1
-        mascara[mask_area] = 0
-
-    # 4. Aplicar máscara y Transformada Inversa
-    fshift = dft_shift * mascara
-    f_ishift = np.fft.ifftshift(fshift)
-    img_back = cv2.idft(f_ishift)
-    img_back = cv2.magnitude(img_back[:,:,0], img_back[:,:,1])
-
-    # 5. Normalizar para visualización (0-255)
-    cv2.normalize(img_back, img_back, 0, 255, cv2.NORM_MINMAX)
-    
-    return np.uint8(img_back)
\ No newline at end of file
+    return aplicar_filtro(imagen, "IDEAL", tipo, radio_corte)
+
+def aplicar_filtro_ideal_cortes(imagen, tipo="PASA_BAJAS", radios=(10, 30, 60)):
+    """Filtro ideal para varios radios de corte con una sola transformada directa"""
+    return aplicar_filtro_cortes(imagen, "IDEAL", tipo, radios)
@@ -1,41 +1,408 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.logic.inmutable import congelar
+
+# Presupuesto por defecto del historial en RAM: el mayor entre PRESUPUESTO_BASE y
+# FOTOGRAMAS_PRESUPUESTO fotogramas crudos del tamaño de la última imagen guardada.
+# Con fotogramas grandes (100 MP = 300 MB) un presupuesto fijo solo dejaría 1-2 pasos.
+PRESUPUESTO_BASE = 512 * 1024**2
+FOTOGRAMAS_PRESUPUESTO = 8
+# Fracción del tamaño crudo que se supone a las compresiones aún pendientes hasta
+# que termine la primera (luego se usa la última medida)
+RATIO_INICIAL = 0.5
+
+
+class Instantanea:
+    """
+    Imagen guardada en el historial.
+    Empieza en RAM tal cual y puede comprimirse (zlib, sin pérdida) en segundo plano;
+    solo se descomprime cuando deshacer/rehacer la necesita.
+    """
+    def __init__(self, imagen):
+        self.forma = imagen.shape
+        self.tipo = imagen.dtype
+        self._imagen = imagen
+        self._comprimida = None
+        self._lock = threading.Lock()
+        # Tamaño actual: se fija al crearla y al terminar de archivarla. Se lee sin
+        # el lock para no esperar a una compresión en curso desde la interfaz
+        self._nbytes = imagen.nbytes
+        self.nbytes_crudos = imagen.nbytes
+
+    @property
+    def archivada(self):
+        return self._comprimida is not None
+
+    @property
+    def nbytes(self):
+        """Bytes que ocupa ahora mismo (crudos o comprimidos)"""
+        return self._nbytes
+
+    def archivar(self):
+        """Comprime la imagen y libera la copia cruda"""
+        with self._lock:
+            if self._imagen is None: return
+            datos = np.ascontiguousarray(self._imagen)
+            # Nivel 1: casi todo el ahorro de zlib a una fracción del coste
+            self._comprimida = zlib.compress(datos.data, 1)
+            self._nbytes = len(self._comprimida)
+            self._imagen = None
+
+    def obtener(self):
+        """Retorna la imagen (descomprimiéndola si hace falta)"""
+        with self._lock:
+            if self._imagen is not None:
+                return self._imagen
+            datos = zlib.decompress(self._comprimida)
+        return np.frombuffer(datos, dtype=self.tipo).reshape(self.forma)
+
+    def descartar(self):
+        """Libera lo que no sea memoria de Python (aquí no hay nada)"""
+        pass
+
+
+class InstantaneaDisco(Instantanea):
+    """
+    Instantánea que al archivarse se vuelca a disco como un np.memmap crudo.
+    Al recuperarla se mapea el archivo de nuevo (solo lectura), sin decodificar nada.
+    """
+    def __init__(self, imagen, ruta):
+        super().__init__(imagen)
+        self.ruta = ruta
+        self._en_disco = False
+
+    @property
+    def archivada(self):
+        return self._en_disco
+
+    def archivar(self):
+        with self._lock:
+            if self._imagen is None: return
+            mapa = np.memmap(self.ruta, dtype=self.tipo, mode="w+", shape=self.forma)
+            mapa[...] = self._imagen
+            mapa.flush()
+            del mapa
+            self._nbytes = os.path.getsize(self.ruta)
+            self._en_disco = True
+            self._imagen = None
+
+    def obtener(self):
+        with self._lock:
+            if self._imagen is not None:
+                return self._imagen
+            return np.memmap(self.ruta, dtype=self.tipo, mode="r", shape=self.forma)
+
+    def descartar(self):
+        # En Windows no se puede borrar un archivo aún mapeado; se limpia en reiniciar()
+        try:
+            os.remove(self.ruta)
+        except OSError:
+            pass
+
+
 class GestorEstado:
-    def __init__(self):
-        self.historial = []  # Pila de imágenes pasadas
+    def __init__(self, presupuesto_bytes=None, recientes=2):
+        self.historial = []  # Pila de imágenes pasadas (Instantanea)
         self.rehacer_stack = [] # Pila para "Adelante"
-        self.max_pasos = 20  # Límite para no llenar la RAM
+        self.presupuesto_bytes = presupuesto_bytes  # Límite de memoria del historial (None: según el fotograma)
+        self.recientes = recientes  # Cuántas instantáneas se quedan sin comprimir
+
+        # Un solo hilo basta: zlib libera el GIL y así no competimos con la UI
+        self._compresor = ThreadPoolExecutor(max_workers=1)
+        self._pendientes = {}  # Instantanea -> Future
+        self._fotograma = 0  # Bytes crudos de la última imagen guardada
+        self._ratio = RATIO_INICIAL  # Comprimido / crudo de la última compresión
+
+    @property
+    def presupuesto(self):
+        """Presupuesto efectivo en bytes (ver PRESUPUESTO_BASE)"""
+        if self.presupuesto_bytes is not None:
+            return self.presupuesto_bytes
+        return max(PRESUPUESTO_BASE, FOTOGRAMAS_PRESUPUESTO * self._fotograma)
+
+    @property
+    def bytes_historial(self):
+        """Tamaño actual del historial (deshacer + rehacer) en bytes"""
+        return sum(inst.nbytes for inst in self.historial + self.rehacer_stack)
+
+    @property
+    def bytes_previstos(self):
+        """Tamaño del historial contando las compresiones pendientes por su tamaño estimado"""
+        return sum(self._previsto(inst) for inst in self.historial + self.rehacer_stack)
 
     def guardar_estado(self, imagen_nueva):
         """Llama a esto ANTES de modificar la imagen actual"""
         if imagen_nueva is None: return
-        
-        self.historial.append(imagen_nueva.copy())
-        if len(self.historial) > self.max_pasos:
-            self.historial.pop(0) # Borra el más viejo
-        
-        self.rehacer_stack.clear() # Al hacer algo nuevo, se borra el futuro
+
+        # La imagen se congela en vez de copiarse: historial y visor comparten el buffer
+        self._fotograma = imagen_nueva.nbytes
+        self.historial.append(self._nueva_instantanea(congelar(imagen_nueva)))
+        self._vaciar(self.rehacer_stack) # Al hacer algo nuevo, se borra el futuro
+        # Primero se encolan las compresiones para que _recortar las cuente por lo estimado
+        self._programar_compresion()
+        self._recortar()
+
+    def registrar(self, imagen_previa, resultado, funcion, *args):
+        """Registra una operación ya aplicada (aquí basta con guardar la imagen previa)"""
+        self.guardar_estado(imagen_previa)
 
     def deshacer(self, imagen_actual):
         """Retorna la imagen anterior y guarda la actual en rehacer"""
         if not self.historial:
             return None
-        
+
         # Guardamos la actual en rehacer por si queremos volver
         if imagen_actual is not None:
-            self.rehacer_stack.append(imagen_actual)
+            self.rehacer_stack.append(self._nueva_instantanea(congelar(imagen_actual)))
 
-        return self.historial.pop()
+        imagen = self._extraer(self.historial)
+        self._programar_compresion()
+        return imagen
 
     def rehacer(self, imagen_actual):
         """Retorna la imagen siguiente"""
         if not self.rehacer_stack:
             return None
-        
+
         # Guardamos la actual en historial
         if imagen_actual is not None:
-            self.historial.append(imagen_actual)
-            
-        return self.rehacer_stack.pop()
+            self.historial.append(self._nueva_instantanea(congelar(imagen_actual)))
+
+        imagen = self._extraer(self.rehacer_stack)
+        self._programar_compresion()
+        self._recortar()
+        return imagen
 
     def reiniciar(self):
-        self.historial.clear()
-        self.rehacer_stack.clear()
+        for futuro in self._pendientes.values():
+            futuro.cancel()
+        self._pendientes.clear()
+        self._vaciar(self.historial)
+        self._vaciar(self.rehacer_stack)
+
+    # --- Internos ---
+    def _nueva_instantanea(self, imagen):
+        return Instantanea(imagen)
+
+    def _vaciar(self, pila):
+        for inst in pila:
+            inst.descartar()
+        pila.clear()
+
+    def _extraer(self, pila):
+        inst = pila.pop()
+        futuro = self._pendientes.pop(inst, None)
+        if futuro is not None:
+            futuro.cancel()
+        imagen = inst.obtener()
+        inst.descartar()
+        return imagen
+
+    def _programar_compresion(self):
+        """Comprime en segundo plano todo lo que no sea de lo más reciente"""
+        self._pendientes = {k: f for k, f in self._pendientes.items() if not f.done()}
+        for pila in (self.historial, self.rehacer_stack):
+            antiguas = pila[:-self.recientes] if self.recientes > 0 else pila
+            for inst in antiguas:
+                if inst.archivada or inst in self._pendientes:
+                    continue
+                futuro = self._compresor.submit(inst.archivar)
+                futuro.add_done_callback(lambda _, inst=inst: self._medir_ratio(inst))
+                self._pendientes[inst] = futuro
+
+    def _medir_ratio(self, inst):
+        if inst.archivada and inst.nbytes_crudos:
+            self._ratio = inst.nbytes / inst.nbytes_crudos
+
+    def _previsto(self, inst):
+        """Tamaño que tendrá la instantánea: si ya está en la cola de compresión, el estimado"""
+        if inst in self._pendientes and not inst.archivada:
+            return int(inst.nbytes_crudos * self._ratio)
+        return inst.nbytes
+
+    def _recortar(self):
+        """
+        Borra los pasos más viejos hasta entrar en el presupuesto de memoria.
+        No espera a las compresiones en curso: las que están en cola cuentan por
+        su tamaño estimado (ratio de la última compresión) y no por el crudo, que
+        durante una ráfaga de operaciones dejaría el historial en 1-3 pasos.
+        El resto (los `recientes` crudos y lo ya archivado) cuenta por su tamaño real.
+        """
+        presupuesto = self.presupuesto
+        total = self.bytes_previstos
+        # Siempre conservamos al menos el paso más reciente
+        while len(self.historial) > 1 and total > presupuesto:
+            inst = self.historial.pop(0) # Borra el más viejo
+            total -= self._previsto(inst)
+            futuro = self._pendientes.pop(inst, None)
+            if futuro is not None and not futuro.cancel():
+                # Se está archivando: se descarta cuando termine, sin bloquear aquí
+                futuro.add_done_callback(lambda _, inst=inst: inst.descartar())
+            else:
+                inst.descartar()
+
+
+class GestorEstadoDisco(GestorEstado):
+    """
+    Variante para imágenes enormes: las instantáneas que no son de las más recientes
+    se vuelcan como np.memmap a un directorio temporal en lugar de quedarse en RAM.
+    El presupuesto cuenta los bytes en disco además de los de RAM.
+    """
+    def __init__(self, presupuesto_bytes=16 * 1024**3, recientes=1, directorio=None):
+        super().__init__(presupuesto_bytes, recientes)
+        self.directorio = tempfile.mkdtemp(prefix="historial_", dir=directorio)
+        self._contador = 0
+        atexit.register(self.cerrar)  # Se quita en cerrar(): si no, atexit retendría el gestor
+
+    def reiniciar(self):
+        super().reiniciar()
+        # Lo que no se pudo borrar antes (archivos aún mapeados) se borra aquí
+        for nombre in os.listdir(self.directorio):
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except OSError:
+                pass
+
+    def cerrar(self):
+        """Borra el directorio temporal (se llama sola al salir si no se llamó antes)"""
+        atexit.unregister(self.cerrar)
+        if not os.path.isdir(self.directorio): return
+        self.reiniciar()
+        self._compresor.shutdown(wait=True)
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _nueva_instantanea(self, imagen):
+        self._contador += 1
+        ruta = os.path.join(self.directorio, f"paso_{self._contador:06d}.raw")
+        return InstantaneaDisco(imagen, ruta)
+
+
+class Paso:
+    """Un estado del registro: la operación que lo produjo y, si toca, su imagen completa"""
+    def __init__(self, funcion, args, checkpoint=None):
+        self.funcion = funcion
+        self.args = args
+        self.checkpoint = checkpoint
+
+    @property
+    def nbytes(self):
+        total = self.checkpoint.nbytes if self.checkpoint is not None else 0
+        # Los parámetros también pueden ser imágenes (p. ej. la segunda imagen de un AND)
+        total += sum(a.nbytes for a in self.args if isinstance(a, np.ndarray))
+        return total
+
+
+class GestorOperaciones:
+    """
+    Historial como registro de operaciones (función + parámetros).
+    Solo se guarda la imagen completa cada `intervalo_checkpoint` pasos; para volver
+    a un estado se parte del checkpoint más cercano y se re-ejecutan los pasos.
+    Requiere que las operaciones sean deterministas.
+    """
+    def __init__(self, intervalo_checkpoint=5):
+        self.intervalo_checkpoint = intervalo_checkpoint
+        self._pasos = []   # _pasos[0] es siempre la imagen base (checkpoint)
+        self._actual = -1  # Índice del estado que se está mostrando
+
+    @property
+    def historial(self):
+        """Pasos a los que se puede volver con deshacer"""
+        return self._pasos[:max(self._actual, 0)]
+
+    @property
+    def rehacer_stack(self):
+        return self._pasos[self._actual + 1:]
+
+    @property
+    def bytes_historial(self):
+        return sum(paso.nbytes for paso in self._pasos)
+
+    def guardar_estado(self, imagen_nueva):
+        """Sin operación asociada solo se puede guardar como checkpoint"""
+        if imagen_nueva is None: return
+        self._agregar(Paso(None, (), congelar(imagen_nueva)))
+
+    def registrar(self, imagen_previa, resultado, funcion, *args):
+        """Llama a esto DESPUÉS de aplicar funcion(imagen_previa, *args) -> resultado"""
+        if imagen_previa is None or resultado is None: return
+        if self._actual < 0:
+            self._agregar(Paso(None, (), congelar(imagen_previa)))
+
+        indice = self._actual + 1
+        checkpoint = congelar(resultado) if indice % self.intervalo_checkpoint == 0 else None
+        self._agregar(Paso(funcion, args, checkpoint))
+
+    def deshacer(self, imagen_actual):
+        """Retorna la imagen anterior reconstruyéndola desde el último checkpoint"""
+        return self._ir(self.indice_deshacer())
+
+    def rehacer(self, imagen_actual):
+        """Retorna la imagen siguiente"""
+        return self._ir(self.indice_rehacer())
+
+    def indice_deshacer(self):
+        return self._actual - 1 if self._actual > 0 else None
+
+    def indice_rehacer(self):
+        return self._actual + 1 if self._actual < len(self._pasos) - 1 else None
+
+    def plan(self, indice):
+        """
+        (checkpoint, pasos) para reconstruir el estado `indice` con reproducir().
+        No cambia el estado: la reconstrucción puede ir en otro hilo y confirmarse
+        después con ir_a(indice) (o descartarse si se cancela).
+        """
+        inicio = indice
+        while self._pasos[inicio].checkpoint is None:
+            inicio -= 1
+        return self._pasos[inicio].checkpoint, tuple(self._pasos[inicio + 1:indice + 1])
+
+    def ir_a(self, indice):
+        """Marca `indice` como el estado mostrado (tras reconstruirlo)"""
+        self._actual = indice
+
+    def reiniciar(self):
+        self._pasos.clear()
+        self._actual = -1
+
+    # --- Internos ---
+    def _agregar(self, paso):
+        del self._pasos[self._actual + 1:]  # Al hacer algo nuevo, se borra el futuro
+        self._pasos.append(paso)
+        self._actual = len(self._pasos) - 1
+
+    def _ir(self, indice):
+        if indice is None:
+            return None
+        imagen = reproducir(*self.plan(indice))
+        self.ir_a(indice)
+        return imagen
+
+
+def reproducir(checkpoint, pasos):
+    """Re-ejecuta los pasos sobre el checkpoint; el resultado se congela como cualquier estado"""
+    imagen = checkpoint
+    for paso in pasos:
+        imagen = paso.funcion(imagen, *paso.args)
+    return congelar(imagen)
+
+
+def crear_gestor(modo="IMAGENES"):
+    """
+    Crea el gestor de historial.
+    modos: 'IMAGENES' (instantáneas comprimidas), 'DISCO' (instantáneas en memmap),
+           'OPERACIONES' (registro + checkpoints)
+    """
+    if modo == "OPERACIONES":
+        return GestorOperaciones()
+    if modo == "DISCO":
+        return GestorEstadoDisco()
+    return GestorEstado()
@@ -0,0 +1,112 @@
+import threading
+
+import cv2
+import numpy as np
+
+# ==========================================
+# MOTOR DE GRADIENTES (SOBEL, SCHARR, PREWITT, ROBERTS)
+# ==========================================
+# Derivadas X/Y en float32 (con signo) escritas en buffers reutilizables, y a
+# partir de ellas magnitud y orientación. Sobel, Scharr y Prewitt son
+# separables (una pasada por filas y otra por columnas); Roberts es un 2x2 y va
+# con filter2D. Los filtros de filtros.py son envoltorios finos de este módulo.
+
+OPERADORES = ("sobel", "scharr", "prewitt", "roberts")
+
+# Prewitt como producto de un vector de columnas por uno de filas (correlación)
+_PREWITT_X = (np.array([1, 0, -1], np.float32), np.array([1, 1, 1], np.float32))
+_PREWITT_Y = (np.array([1, 1, 1], np.float32), np.array([1, 0, -1], np.float32))
+_ROBERTS_X = np.array([[1, 0], [0, -1]], dtype=np.float32)
+_ROBERTS_Y = np.array([[0, 1], [-1, 0]], dtype=np.float32)
+
+# Buffers de derivadas por hilo, reutilizados mientras no cambie la forma.
+# Solo se conservan hasta MAX_PIXELES_BUFFERS (16 MP = 128 MB por hilo): para
+# imágenes mayores se reservan en cada llamada y se liberan al terminar, en
+# vez de quedarse 8 bytes por píxel retenidos en cada hilo que las haya usado.
+MAX_PIXELES_BUFFERS = 4096 * 4096
+_buffers = threading.local()
+
+def buffers_derivadas(forma):
+    """Pareja de buffers float32 del hilo actual para derivadas (se reutiliza entre llamadas)"""
+    if forma[0] * forma[1] > MAX_PIXELES_BUFFERS:
+        return np.empty(forma, np.float32), np.empty(forma, np.float32)
+    pareja = getattr(_buffers, "pareja", None)
+    if pareja is None or pareja[0].shape != forma:
+        _buffers.pareja = None  # Suelta la anterior antes de reservar la nueva
+        pareja = (np.empty(forma, np.float32), np.empty(forma, np.float32))
+        _buffers.pareja = pareja
+    return pareja
+
+def _a_grises(imagen):
+    if imagen.ndim == 3:
+        return cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    return imagen
+
+def derivadas(imagen, operador="sobel", out=None):
+    """
+    Derivadas (gx, gy) en float32 con signo.
+    out: pareja de arrays float32 (alto, ancho) donde escribirlas; si no se da se reservan.
+    """
+    img = _a_grises(imagen)
+    profundidad = cv2.CV_32F
+    if out is None:
+        out = (np.empty(img.shape, np.float32), np.empty(img.shape, np.float32))
+    gx, gy = out
+
+    if operador == "sobel":
+        cv2.Sobel(img, profundidad, 1, 0, dst=gx, ksize=3)
+        cv2.Sobel(img, profundidad, 0, 1, dst=gy, ksize=3)
+    elif operador == "scharr":
+        cv2.Scharr(img, profundidad, 1, 0, dst=gx)
+        cv2.Scharr(img, profundidad, 0, 1, dst=gy)
+    elif operador == "prewitt":
+        cv2.sepFilter2D(img, profundidad, *_PREWITT_X, dst=gx)
+        cv2.sepFilter2D(img, profundidad, *_PREWITT_Y, dst=gy)
+    elif operador == "roberts":
+        cv2.filter2D(img, profundidad, _ROBERTS_X, dst=gx)
+        cv2.filter2D(img, profundidad, _ROBERTS_Y, dst=gy)
+    else:
+        raise ValueError(f"Operador de gradiente desconocido: '{operador}'")
+    return gx, gy
+
+def magnitud(imagen, operador="sobel", out=None):
+    """Magnitud del gradiente (float32). out: array float32 donde escribirla"""
+    img = _a_grises(imagen)
+    gx, gy = derivadas(img, operador, buffers_derivadas(img.shape))
+    return cv2.magnitude(gx, gy, out)
+
+def orientacion(imagen, operador="sobel", out=None, grados=False):
+    """Orientación del gradiente (float32, 0..2π o 0..360 si grados=True)"""
+    img = _a_grises(imagen)
+    gx, gy = derivadas(img, operador, buffers_derivadas(img.shape))
+    return cv2.phase(gx, gy, out, angleInDegrees=grados)
+
+def gradiente(imagen, operador="sobel", out=None, grados=False):
+    """
+    Magnitud y orientación con una sola pasada de derivadas.
+    out: pareja (magnitud, orientacion) de arrays float32 donde escribirlas.
+    """
+    img = _a_grises(imagen)
+    gx, gy = derivadas(img, operador, buffers_derivadas(img.shape))
+    mag, ang = out if out is not None else (None, None)
+    return cv2.cartToPolar(gx, gy, mag, ang, angleInDegrees=grados)
+
+# --- Conversión a 8 bits ---
+def escala_minmax(minimo, maximo):
+    """Escala y desplazamiento que llevan [minimo, maximo] a [0, 255] (como NORM_MINMAX)"""
+    escala = 255.0 * (1.0 / (maximo - minimo) if maximo - minimo > np.finfo(float).eps else 0.0)
+    return escala, -minimo * escala
+
+def escalar_a_uint8(valores, escala, desplazamiento, out=None):
+    """valores * escala + desplazamiento truncado a uint8 (valores es float32 y se modifica)"""
+    np.multiply(valores, np.float32(escala), out=valores)
+    np.add(valores, np.float32(desplazamiento), out=valores)
+    if out is None:
+        return valores.astype(np.uint8)
+    out[...] = valores
+    return out
+
+def normalizar_uint8(valores):
+    """Normaliza a 0-255 con el mínimo/máximo del array (lo modifica) y retorna uint8"""
+    minimo, maximo, _, _ = cv2.minMaxLoc(valores)
+    return escalar_a_uint8(valores, *escala_minmax(minimo, maximo))
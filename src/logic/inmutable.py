@@ -0,0 +1,26 @@
+import numpy as np
+
+# ==========================================
+# ESTADO DE IMAGEN INMUTABLE (COPY-ON-WRITE)
+# ==========================================
+# Las imágenes que circulan entre el visor, el historial y las operaciones se
+# marcan como solo lectura, así todos pueden compartir el mismo buffer sin copiarlo.
+# Quien necesite escribir sobre una imagen pide una versión editable y solo
+# entonces se hace la copia.
+
+def congelar(imagen):
+    """Marca la imagen como solo lectura (sin copiarla) y la retorna"""
+    if imagen is None: return None
+    if imagen.flags.writeable:
+        imagen.setflags(write=False)
+    return imagen
+
+def es_inmutable(imagen):
+    return imagen is not None and not imagen.flags.writeable
+
+def editable(imagen):
+    """Retorna una versión escribible: la misma si ya lo es, o una copia si está congelada"""
+    if imagen is None: return None
+    if imagen.flags.writeable:
+        return imagen
+    return np.array(imagen, copy=True)
@@ -0,0 +1,171 @@
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from src.logic.cache import huella
+from src.logic.inmutable import es_inmutable
+
+# ==========================================
+# IMAGEN INTEGRAL (TABLAS DE ÁREAS SUMADAS)
+# ==========================================
+# Con la tabla de sumas y la de sumas de cuadrados, la suma de cualquier
+# ventana rectangular sale de 4 lecturas, así que la media, la varianza y la
+# desviación locales cuestan O(1) por píxel sea cual sea el tamaño de ventana.
+# Las tablas se calculan una vez por imagen y se guardan: recorrer varios
+# tamaños de ventana sobre la misma imagen no las vuelve a construir.
+# Ocupan ~16 B por píxel (dos tablas float64), así que la caché se limita en
+# bytes y solo guarda imágenes congeladas completas: las bandas y teselas de
+# teselado.py (vistas de una imagen mayor, o copias editables) se calculan
+# sin guardarse, porque ninguna se vuelve a pedir.
+#
+# En los bordes la ventana se recorta a la imagen (se promedian solo los
+# píxeles que existen).
+
+MAX_BYTES_TABLAS = 1024**3  # Memoria máxima de las tablas guardadas
+MARGEN = 128    # Media ventana máxima sin ampliar las tablas (ventanas de hasta 255)
+
+_tablas = OrderedDict()  # huella -> TablaIntegral
+_lock = threading.Lock()
+
+def _limites(n, tam):
+    """Inicio y fin (exclusivo) de la ventana centrada en cada posición, recortada a [0, n]"""
+    posiciones = np.arange(n)
+    inicio = np.clip(posiciones - tam // 2, 0, n)
+    fin = np.clip(posiciones + (tam - 1 - tam // 2) + 1, 0, n)
+    return inicio, fin
+
+
+class TablaIntegral:
+    def __init__(self, imagen):
+        if len(imagen.shape) == 3:
+            imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+        self.forma = imagen.shape
+        # float64: la suma de cuadrados de una imagen grande no cabe en 32 bits
+        suma, cuadrados = cv2.integral2(imagen, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        self._ampliadas = self._ampliar(suma, cuadrados, MARGEN)
+
+    @staticmethod
+    def _ampliar(suma, cuadrados, margen):
+        # Las tablas se amplían repitiendo la primera/última fila y columna: así
+        # leer fuera equivale a recortar la ventana y cada ventana es un simple slice.
+        # Se guardan juntas en una tupla para que otro hilo nunca vea una mezcla.
+        return margen, np.pad(suma, margen, mode="edge"), np.pad(cuadrados, margen, mode="edge")
+
+    @property
+    def nbytes(self):
+        _, suma, cuadrados = self._ampliadas
+        return suma.nbytes + cuadrados.nbytes
+
+    @property
+    def suma(self):
+        m, suma, _ = self._ampliadas
+        return suma[m:-m, m:-m]
+
+    @property
+    def suma_cuadrados(self):
+        m, _, cuadrados = self._ampliadas
+        return cuadrados[m:-m, m:-m]
+
+    def _por_ventana(self, cuadrados, alto, ancho):
+        """Suma (o suma de cuadrados) de la ventana centrada en cada píxel"""
+        necesario = max(alto, ancho) // 2 + 1
+        if necesario > self._ampliadas[0]:
+            self._ampliadas = self._ampliar(self.suma, self.suma_cuadrados, necesario)
+        m, suma, tabla_cuadrados = self._ampliadas
+        tabla = tabla_cuadrados if cuadrados else suma
+
+        alto_img, ancho_img = self.forma
+        y0, y1 = m - alto // 2, m + (alto - 1 - alto // 2) + 1
+        x0, x1 = m - ancho // 2, m + (ancho - 1 - ancho // 2) + 1
+        arriba = tabla[y0:y0 + alto_img]
+        abajo = tabla[y1:y1 + alto_img]
+        resultado = abajo[:, x1:x1 + ancho_img] - abajo[:, x0:x0 + ancho_img]
+        resultado -= arriba[:, x1:x1 + ancho_img]
+        resultado += arriba[:, x0:x0 + ancho_img]
+        return resultado
+
+    def _cuenta(self, alto, ancho):
+        y0, y1 = _limites(self.forma[0], alto)
+        x0, x1 = _limites(self.forma[1], ancho)
+        return np.outer(y1 - y0, x1 - x0).astype(np.float64)
+
+    def suma_local(self, alto, ancho=None):
+        ancho = alto if ancho is None else ancho
+        return self._por_ventana(False, alto, ancho)
+
+    def media(self, alto, ancho=None):
+        """Media de la ventana alto x ancho centrada en cada píxel (float64)"""
+        ancho = alto if ancho is None else ancho
+        return self.suma_local(alto, ancho) / self._cuenta(alto, ancho)
+
+    def media_y_varianza(self, alto, ancho=None):
+        ancho = alto if ancho is None else ancho
+        cuenta = self._cuenta(alto, ancho)
+        media = self._por_ventana(False, alto, ancho)
+        media /= cuenta
+        varianza = self._por_ventana(True, alto, ancho)
+        varianza /= cuenta
+        varianza -= media * media
+        # El redondeo puede dejar varianzas levemente negativas en zonas planas
+        np.maximum(varianza, 0, out=varianza)
+        return media, varianza
+
+    def varianza(self, alto, ancho=None):
+        return self.media_y_varianza(alto, ancho)[1]
+
+    def desviacion(self, alto, ancho=None):
+        return np.sqrt(self.varianza(alto, ancho))
+
+
+def _cacheable(imagen):
+    """Solo imágenes congeladas que no sean un trozo (vista) de otra mayor"""
+    base = imagen.base
+    return es_inmutable(imagen) and not (isinstance(base, np.ndarray) and base.size > imagen.size)
+
+def tabla_integral(imagen):
+    """TablaIntegral de la imagen, reutilizando la ya calculada si existe"""
+    if not _cacheable(imagen):
+        return TablaIntegral(imagen)
+    clave = huella(imagen)
+    with _lock:
+        tabla = _tablas.get(clave)
+        if tabla is not None:
+            _tablas.move_to_end(clave)
+            return tabla
+    tabla = TablaIntegral(imagen)
+    if tabla.nbytes > MAX_BYTES_TABLAS:
+        return tabla
+    with _lock:
+        _tablas[clave] = tabla
+        # Las tablas pueden haber crecido (ventanas mayores que MARGEN): se suman al expulsar
+        total = sum(t.nbytes for t in _tablas.values())
+        while total > MAX_BYTES_TABLAS and len(_tablas) > 1:
+            _, expulsada = _tablas.popitem(last=False)
+            total -= expulsada.nbytes
+    return tabla
+
+def estadisticas_locales(imagen, ventana):
+    """Media y desviación estándar locales (float64) en ventanas ventana x ventana"""
+    media, varianza = tabla_integral(imagen).media_y_varianza(ventana)
+    return media, np.sqrt(varianza, out=varianza)
+
+
+# ==========================================
+# BINARIZACIÓN ADAPTATIVA
+# ==========================================
+
+def _binarizar(imagen, umbral):
+    gris = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY) if len(imagen.shape) == 3 else imagen
+    return np.where(gris > umbral, 255, 0).astype(np.uint8)
+
+def umbral_niblack(imagen, ventana=25, k=-0.2):
+    """Niblack: T = media + k * desviación"""
+    media, desviacion = estadisticas_locales(imagen, ventana)
+    return _binarizar(imagen, media + k * desviacion)
+
+def umbral_sauvola(imagen, ventana=25, k=0.5, r=128.0):
+    """Sauvola: T = media * (1 + k * (desviación / r - 1)). Más robusto que Niblack en el fondo"""
+    media, desviacion = estadisticas_locales(imagen, ventana)
+    return _binarizar(imagen, media * (1 + k * (desviacion / r - 1)))
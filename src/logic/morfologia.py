@@ -1,21 +1,36 @@
 import cv2
 import numpy as np
 
+from src.logic import estructurantes
+from src.logic.binaria import ImagenBinaria
+
 def convertir_a_grises(imagen):
     if len(imagen.shape) == 3:
         return cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
     return imagen
 
 # --- Operaciones Básicas ---
-def erosion(imagen, kernel_size=5):
+# El elemento estructurante se aplica descompuesto en pasadas (fila + columna
+# para el rectángulo, líneas para diamante y disco): ver estructurantes.py
+def erosion(imagen, kernel_size=5, forma="RECTANGULO"):
+    if isinstance(imagen, ImagenBinaria):
+        return _binaria(imagen, kernel_size, forma, True)
     img = convertir_a_grises(imagen)
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.erode(img, kernel, iterations=1)
+    return estructurantes.elemento(forma, kernel_size).erosionar(img)
 
-def dilatacion(imagen, kernel_size=5):
+def dilatacion(imagen, kernel_size=5, forma="RECTANGULO"):
+    if isinstance(imagen, ImagenBinaria):
+        return _binaria(imagen, kernel_size, forma, False)
     img = convertir_a_grises(imagen)
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.dilate(img, kernel, iterations=1)
+    return estructurantes.elemento(forma, kernel_size).dilatar(img)
+
+def _binaria(imagen, kernel_size, forma, es_erosion):
+    """Imagen binaria empaquetada: el rectángulo se aplica sobre las palabras de bits"""
+    if forma == "RECTANGULO":
+        return imagen.erosionar(kernel_size) if es_erosion else imagen.dilatar(kernel_size)
+    # Las demás formas pasan por uint8
+    operacion = erosion if es_erosion else dilatacion
+    return ImagenBinaria.desde_uint8(operacion(imagen.a_uint8(), kernel_size, forma))
 
 # --- Operaciones Compuestas (Manuales) ---
 def apertura_manual(imagen, kernel_size=5):
@@ -36,15 +51,15 @@ def cierre_manual(imagen, kernel_size=5):
     # Paso 2: Erosión
     return cv2.erode(dilated, kernel, iterations=1)
 
-# --- Operaciones EX (OpenCV optimizado) ---
-def apertura_ex(imagen, kernel_size=5):
-    """Apertura usando morphologyEx"""
+# --- Operaciones EX (elemento descompuesto) ---
+def apertura_ex(imagen, kernel_size=5, forma="RECTANGULO"):
+    """Apertura (como morphologyEx MORPH_OPEN) con el elemento descompuesto"""
     img = convertir_a_grises(imagen)
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.morphologyEx(img, cv2.MORPH_OPEN, kernel)
+    elemento = estructurantes.elemento(forma, kernel_size)
+    return elemento.dilatar(elemento.erosionar(img))
 
-def cierre_ex(imagen, kernel_size=5):
-    """Cierre usando morphologyEx"""
+def cierre_ex(imagen, kernel_size=5, forma="RECTANGULO"):
+    """Cierre (como morphologyEx MORPH_CLOSE) con el elemento descompuesto"""
     img = convertir_a_grises(imagen)
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.morphologyEx(img, cv2.MORPH_CLOSE, kernel)
+    elemento = estructurantes.elemento(forma, kernel_size)
+    return elemento.erosionar(elemento.dilatar(img))
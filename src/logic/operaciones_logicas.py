@@ -1,6 +1,8 @@
 import cv2
 import numpy as np
 
+from src.logic.binaria import ImagenBinaria
+
 def _preparar_para_logica(img_base, img_secundaria):
     """
     Ajusta la img_secundaria para que coincida en dimensiones y canales
@@ -30,22 +32,34 @@ def _preparar_para_logica(img_base, img_secundaria):
 
     return img_base, img_sec_final
 
+def _empaquetadas(img_base, img_secundaria):
+    # Dos imágenes binarias empaquetadas se combinan palabra a palabra, sin desempaquetar
+    return isinstance(img_base, ImagenBinaria) and isinstance(img_secundaria, ImagenBinaria)
+
 def operacion_and(img_base, img_secundaria):
     """Operación lógica AND: Mantiene píxeles activos en ambas imágenes."""
+    if _empaquetadas(img_base, img_secundaria):
+        return img_base & img_secundaria
     img1, img2 = _preparar_para_logica(img_base, img_secundaria)
     return cv2.bitwise_and(img1, img2)
 
 def operacion_or(img_base, img_secundaria):
     """Operación lógica OR: Mantiene píxeles activos si están en alguna de las dos."""
+    if _empaquetadas(img_base, img_secundaria):
+        return img_base | img_secundaria
     img1, img2 = _preparar_para_logica(img_base, img_secundaria)
     return cv2.bitwise_or(img1, img2)
 
 def operacion_xor(img_base, img_secundaria):
     """Operación lógica XOR: Mantiene píxeles donde uno es activo y el otro no."""
+    if _empaquetadas(img_base, img_secundaria):
+        return img_base ^ img_secundaria
     img1, img2 = _preparar_para_logica(img_base, img_secundaria)
     return cv2.bitwise_xor(img1, img2)
 
 def operacion_not(img_base):
     """Operación lógica NOT: Invierte los valores de los píxeles (negativo)."""
+    if isinstance(img_base, ImagenBinaria):
+        return ~img_base
     return cv2.bitwise_not(img_base)
 
@@ -0,0 +1,185 @@
+import cv2
+import numpy as np
+
+from src.logic import registro
+from src.logic import teselado
+
+# ==========================================
+# PIPELINE DE OPERACIONES
+# ==========================================
+# Cadena ordenada de operaciones del registro. Antes de ejecutar se arma un
+# plan (lista de etapas); es el punto donde se aplican optimizaciones que
+# dependen de los metadatos de las operaciones.
+
+class Paso:
+    def __init__(self, operacion, params):
+        self.operacion = operacion
+        self.params = params
+
+    def __repr__(self):
+        args = ", ".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.operacion.nombre}({args})"
+
+    def __call__(self, imagen):
+        return self.operacion.ejecutar(imagen, self.params, cache=None)
+
+
+def _canales(imagen):
+    return 1 if imagen.ndim == 2 else imagen.shape[2]
+
+
+class EtapaLUT:
+    """
+    Varias operaciones puntuales uint8 -> uint8 fusionadas en una sola tabla.
+    La tabla se obtiene pasando una rampa 0..255 por las operaciones originales,
+    así el resultado es idéntico bit a bit a ejecutarlas una por una.
+    """
+    def __init__(self, pasos, canales):
+        self.pasos = pasos
+        self.canales = canales
+        self._lut = None
+
+    def __repr__(self):
+        return f"LUT[{' -> '.join(map(repr, self.pasos))}]"
+
+    def _secuencial(self, imagen):
+        for paso in self.pasos:
+            imagen = paso(imagen)
+        return imagen
+
+    def construir_lut(self):
+        """Retorna la tabla (256 o 256x1xC), o None si alguna operación no da uint8"""
+        if self._lut is None:
+            rampa = np.arange(256, dtype=np.uint8).reshape(1, 256)
+            if self.canales > 1:
+                rampa = np.repeat(rampa[:, :, None], self.canales, axis=2)
+            tabla = self._secuencial(rampa)
+            if tabla.dtype != np.uint8:
+                return None
+            self._lut = tabla.reshape(256, 1, -1) if tabla.ndim == 3 else tabla.reshape(256)
+        return self._lut
+
+    def __call__(self, imagen):
+        lut = None
+        if imagen.dtype == np.uint8 and _canales(imagen) == self.canales:
+            lut = self.construir_lut()
+        if lut is None:
+            return self._secuencial(imagen)
+
+        if self.canales == 1 and lut.ndim == 3:
+            # Gris -> color (p. ej. mapas de color): OpenCV acepta la tabla como mapa propio
+            return cv2.applyColorMap(imagen, lut)
+        return cv2.LUT(imagen, lut)
+
+
+class Pipeline:
+    def __init__(self):
+        self.pasos = []
+
+    def agregar(self, nombre, *args, **kwargs):
+        """Añade una operación del registro. Retorna el pipeline para encadenar."""
+        operacion = registro.obtener(nombre)
+        self.pasos.append(Paso(operacion, operacion.resolver_parametros(*args, **kwargs)))
+        return self
+
+    @classmethod
+    def desde_texto(cls, textos):
+        """
+        Crea un pipeline desde una lista de textos 'operacion:arg1,clave=valor'.
+        Ej: ['filtro_gaussiano:5', 'aplicar_modelo:modelo=GRAY']
+        """
+        pipeline = cls()
+        for texto in textos:
+            nombre, args, kwargs = parsear_paso(texto)
+            pipeline.agregar(nombre, *args, **kwargs)
+        return pipeline
+
+    def planificar(self, canales=None, fusionar=True):
+        """
+        Retorna la lista de etapas que se ejecutarán (cada una: imagen -> imagen).
+        Si se conocen los canales de entrada, las operaciones puntuales consecutivas
+        se fusionan en una sola EtapaLUT.
+        """
+        if not fusionar or canales is None:
+            return list(self.pasos)
+
+        etapas = []
+        grupo, canales_grupo = [], canales
+        for paso in self.pasos:
+            if canales is not None and paso.operacion.admite_lut(paso.params, canales):
+                if not grupo: canales_grupo = canales
+                grupo.append(paso)
+            else:
+                etapas.extend(self._cerrar_grupo(grupo, canales_grupo))
+                grupo = []
+                etapas.append(paso)
+            if canales is not None:
+                canales = paso.operacion.canales_resultado(paso.params, canales)
+        etapas.extend(self._cerrar_grupo(grupo, canales_grupo))
+        return etapas
+
+    @staticmethod
+    def _cerrar_grupo(grupo, canales):
+        # Una operación sola se deja tal cual; la fusión compensa a partir de dos
+        if len(grupo) >= 2:
+            return [EtapaLUT(grupo, canales)]
+        return grupo
+
+    def ejecutar(self, imagen, fusionar=True):
+        for etapa in self.planificar(_canales(imagen), fusionar):
+            imagen = etapa(imagen)
+        return imagen
+
+    def es_teselable(self):
+        return all(paso.operacion.es_teselable(paso.params) for paso in self.pasos)
+
+    def _cadena_teselable(self, imagen):
+        """Retorna (función que aplica toda la cadena, halo total)"""
+        for paso in self.pasos:
+            if not paso.operacion.es_teselable(paso.params):
+                raise ValueError(f"{paso.operacion.nombre} no se puede ejecutar por teselas")
+        radio = sum(paso.operacion.halo(paso.params) for paso in self.pasos)
+        etapas = self.planificar(_canales(imagen))
+
+        def cadena(region):
+            for etapa in etapas:
+                region = etapa(region)
+            return region
+        return cadena, radio
+
+    def ejecutar_por_teselas(self, imagen, salida=None, ruta_salida=None,
+                             tam_tesela=teselado.TAM_TESELA, progreso=None, trabajadores=1):
+        """
+        Ejecuta toda la cadena tesela a tesela (para imágenes que no caben en RAM).
+        El halo es la suma de los radios de todos los pasos, así el resultado es
+        idéntico al de ejecutar la cadena sobre la imagen completa.
+        """
+        cadena, radio = self._cadena_teselable(imagen)
+        return teselado.ejecutar_teselado(cadena, imagen, radio, salida, ruta_salida,
+                                          tam_tesela, progreso, trabajadores)
+
+    def ejecutar_en_paralelo(self, imagen, trabajadores=None):
+        """Ejecuta la cadena repartiendo bandas horizontales entre varios hilos"""
+        cadena, radio = self._cadena_teselable(imagen)
+        return teselado.ejecutar_en_bandas(cadena, imagen, radio, trabajadores)
+
+    def __call__(self, imagen):
+        return self.ejecutar(imagen)
+
+    def __len__(self):
+        return len(self.pasos)
+
+
+def parsear_paso(texto):
+    """'modulo.operacion:5,modelo=GRAY' -> ('operacion', ('5',), {'modelo': 'GRAY'})"""
+    nombre, _, params = texto.partition(":")
+    # Se acepta el prefijo del módulo (filtros.filtro_gaussiano) por comodidad
+    nombre = nombre.rpartition(".")[2]
+    args, kwargs = [], {}
+    for p in params.split(",") if params else []:
+        clave, igual, valor = p.partition("=")
+        if igual:
+            kwargs[clave.strip()] = valor.strip()
+        else:
+            args.append(p.strip())
+    return nombre, tuple(args), kwargs
@@ -0,0 +1,162 @@
+import cv2
+import numpy as np
+
+from src.logic import teselado
+
+# ==========================================
+# FILTROS DE RANGO (MEDIANA / PERCENTIL) CON HISTOGRAMAS DESLIZANTES
+# ==========================================
+# Perreault-Hébert: cada columna guarda el histograma de sus k píxeles de la
+# ventana. Al bajar una fila, cada histograma de columna resta el píxel que
+# sale por arriba y suma el que entra por abajo (2 operaciones por columna,
+# sea cual sea el radio). El histograma de la ventana de cada píxel es la
+# suma de k histogramas de columna; aquí se saca para toda la fila a la vez
+# con sumas acumuladas a lo largo de las columnas (restando dos prefijos),
+# que tampoco depende del radio.
+#
+# Los valores se pasan antes a niveles densos 0..U-1 (los valores distintos
+# que hay en la imagen), así que sirve para cualquier tipo: uint8, uint16,
+# enteros con signo, float. Los histogramas van en dos niveles de ~sqrt(U)
+# bins: primero se busca el bin grueso que contiene el rango pedido y luego,
+# solo dentro de ese bin, el nivel fino.
+# Coste: el nivel grueso es O(sqrt(U)) por píxel. El fino se hace por cada bin
+# grueso distinto elegido en la fila, sobre el tramo de columnas que va del
+# primer al último píxel que lo eligió: O(sqrt(U)) por columna del tramo. En
+# imágenes normales los vecinos caen en pocos bins y los tramos son cortos,
+# así que se queda cerca de O(sqrt(U)) por píxel; en el peor caso (una fila
+# que salta entre los ~sqrt(U) bins gruesos a lo largo de todo el ancho) es
+# O(U) por píxel, con un bucle en Python de ~sqrt(U) vueltas por fila.
+#
+# La mediana con los tipos y tamaños que cv2.medianBlur admite (uint8 con
+# cualquier k; uint16 y float32 con k = 3 o 5) se deja a OpenCV, que usa el
+# mismo algoritmo en C. El borde se replica, como en cv2.medianBlur.
+
+MAX_NIVELES = 65536          # Valores distintos admitidos por canal
+BYTES_HISTOGRAMAS = 32 * 2**20  # Los histogramas finos se hacen por tiras de columnas que quepan aquí
+
+def _niveles(canal):
+    """(valores distintos ordenados, índice denso de cada píxel)"""
+    if canal.dtype.kind in "ui" and canal.dtype.itemsize <= 2:
+        # Enteros pequeños: sin ordenar, con una tabla de todos los valores posibles
+        minimo = int(canal.min())
+        desplazado = (canal.astype(np.int32) - minimo) if minimo else canal
+        presentes = np.bincount(desplazado.ravel()) > 0
+        tabla = np.cumsum(presentes, dtype=np.int32) - 1
+        return np.flatnonzero(presentes).astype(canal.dtype) + canal.dtype.type(minimo), tabla[desplazado]
+    valores, indices = np.unique(canal, return_inverse=True)
+    return valores, indices.reshape(canal.shape).astype(np.int32)
+
+def _ventana(histogramas, k, ancho):
+    """Suma de k histogramas de columna consecutivos para cada una de las `ancho` posiciones"""
+    prefijo = np.zeros((histogramas.shape[0] + 1, histogramas.shape[1]), np.int32)
+    np.cumsum(histogramas, axis=0, dtype=np.int32, out=prefijo[1:])
+    return prefijo[k:k + ancho] - prefijo[:ancho]
+
+def _seleccionar(histograma, rango):
+    """Por fila de `histograma`: (bin que contiene el elemento `rango`, elementos en bins anteriores)"""
+    acumulado = np.cumsum(histograma, axis=1, dtype=np.int32)
+    bins = np.count_nonzero(acumulado <= rango[:, None], axis=1)
+    antes = np.where(bins > 0, acumulado[np.arange(len(bins)), np.maximum(bins - 1, 0)], 0)
+    return bins, antes
+
+def _rango_tira(indices, kernel_size, rango, fino, num_gruesos, num_niveles):
+    """Índice denso del valor de rango para la tira (ya ampliada con el borde)"""
+    alto = indices.shape[0] - kernel_size + 1
+    ancho = indices.shape[1] - kernel_size + 1
+    columnas = np.arange(indices.shape[1])
+    gruesos = indices // fino
+    hist_grueso = np.zeros((indices.shape[1], num_gruesos), np.uint8)  # Cuentas <= k <= 255
+    hist_fino = np.zeros((indices.shape[1], num_niveles), np.uint8)
+    for y in range(kernel_size - 1):
+        hist_grueso[columnas, gruesos[y]] += 1
+        hist_fino[columnas, indices[y]] += 1
+
+    resultado = np.empty((alto, ancho), np.int32)
+    rangos = np.full(ancho, rango)
+    for y in range(alto):
+        # Entra la fila de abajo de la ventana...
+        abajo = y + kernel_size - 1
+        hist_grueso[columnas, gruesos[abajo]] += 1
+        hist_fino[columnas, indices[abajo]] += 1
+
+        grueso, antes = _seleccionar(_ventana(hist_grueso, kernel_size, ancho), rangos)
+        resto = rango - antes
+        fila = resultado[y]
+        # Nivel fino: por cada bin grueso elegido en la fila, solo los píxeles que lo eligieron
+        for g in np.unique(grueso):
+            sel = np.flatnonzero(grueso == g)
+            x0, x1 = sel[0], sel[-1] + kernel_size
+            tramo = hist_fino[x0:x1, g * fino:min((g + 1) * fino, num_niveles)]
+            ventana = _ventana(tramo, kernel_size, x1 - x0 - kernel_size + 1)[sel - x0]
+            bins, _ = _seleccionar(ventana, resto[sel])
+            fila[sel] = g * fino + bins
+
+        # ...y sale la de arriba
+        hist_grueso[columnas, gruesos[y]] -= 1
+        hist_fino[columnas, indices[y]] -= 1
+    return resultado
+
+def _rango_canal(canal, kernel_size, rango):
+    """Filtro de rango sobre un canal de cualquier tipo numérico"""
+    valores, indices = _niveles(canal)
+    num_niveles = len(valores)
+    if num_niveles > MAX_NIVELES:
+        raise ValueError(f"Demasiados valores distintos para el filtro de rango: {num_niveles} "
+                         f"(máximo {MAX_NIVELES}); cuantiza la imagen antes")
+    if num_niveles == 1:
+        return canal.copy()
+    fino = int(np.ceil(np.sqrt(num_niveles)))
+    num_gruesos = -(-num_niveles // fino)
+
+    antes = kernel_size // 2
+    despues = kernel_size - 1 - antes
+    ampliada = np.pad(indices, ((antes, despues), (antes, despues)), mode="edge")
+    resultado = np.empty(canal.shape, np.int32)
+    ancho_tira = max(64, BYTES_HISTOGRAMAS // num_niveles - kernel_size + 1)
+    for x in range(0, canal.shape[1], ancho_tira):
+        fin = min(x + ancho_tira, canal.shape[1])
+        resultado[:, x:fin] = _rango_tira(ampliada[:, x:fin + kernel_size - 1], kernel_size, rango,
+                                          fino, num_gruesos, num_niveles)
+    return valores[resultado]
+
+def _admite_opencv(imagen, kernel_size):
+    if kernel_size % 2 == 0 or kernel_size < 3:
+        return False
+    if imagen.dtype == np.uint8:
+        return True
+    return imagen.dtype in (np.uint16, np.float32) and kernel_size <= 5
+
+def _rango(imagen, kernel_size, rango):
+    if kernel_size > 255:
+        raise ValueError("El filtro de rango admite ventanas de hasta 255 píxeles de lado")
+    if rango == (kernel_size * kernel_size) // 2 and _admite_opencv(imagen, kernel_size):
+        return cv2.medianBlur(imagen, kernel_size)
+    if imagen.ndim == 2:
+        return _rango_canal(imagen, kernel_size, rango)
+    # Color: cada canal por separado
+    canales = [_rango_canal(np.ascontiguousarray(imagen[..., c]), kernel_size, rango)
+               for c in range(imagen.shape[2])]
+    return np.dstack(canales)
+
+def filtro_rango(imagen, kernel_size=3, rango=None, trabajadores=1):
+    """
+    Filtro de rango: el valor en la posición `rango` (0 = mínimo) de la ventana
+    ordenada. Por defecto la mediana. trabajadores > 1 reparte la imagen en bandas.
+    """
+    n = kernel_size * kernel_size
+    rango = n // 2 if rango is None else rango
+    if not 0 <= rango < n:
+        raise ValueError(f"'rango' debe estar entre 0 y {n - 1}")
+    if n == 1:
+        return imagen.copy()
+    funcion = lambda region: _rango(region, kernel_size, rango)
+    if trabajadores == 1:
+        return funcion(imagen)
+    return teselado.ejecutar_en_bandas(funcion, imagen, kernel_size // 2, trabajadores)
+
+def filtro_percentil(imagen, kernel_size=3, percentil=50.0, trabajadores=1):
+    """Percentil (0 = mínimo, 50 = mediana, 100 = máximo) de cada ventana"""
+    n = kernel_size * kernel_size
+    # Mismo criterio que scipy.ndimage.percentile_filter
+    rango = min(int(n * percentil / 100.0), n - 1)
+    return filtro_rango(imagen, kernel_size, rango, trabajadores)
@@ -0,0 +1,252 @@
+import cv2
+import numpy as np
+
+from src.logic import estructurantes
+
+# ==========================================
+# RECONSTRUCCIÓN MORFOLÓGICA (HÍBRIDA: BARRIDOS + COLA)
+# ==========================================
+# La reconstrucción por dilatación de un marcador bajo una máscara repite
+# J = min(dilatación(J), máscara) hasta que no cambia. Hacerlo así cuesta
+# una pasada completa por cada píxel de longitud del camino geodésico más
+# largo. Aquí se combinan tres mecanismos (la idea híbrida de Vincent):
+# 1. Unas pocas dilataciones geodésicas con cv2.dilate (ITERACIONES_DIRECTAS).
+#    Mientras casi toda la imagen cambia en cada paso son lo más barato.
+# 2. Cola FIFO: a partir de ahí solo se tocan los píxeles que cambian. Se
+#    procesa por oleadas (todos los de la misma distancia a la vez), que es
+#    el mismo orden FIFO con operaciones vectorizadas.
+# 3. Barridos de raster: si la cola se queda en oleadas diminutas durante
+#    mucho tiempo, es que queda un camino largo y estrecho (un pasillo, una
+#    espiral). Barridos fila a fila (de arriba abajo y de abajo arriba) y
+#    columna a columna (de izquierda a derecha y al revés) propagan de una vez
+#    todo lo que va "a favor" de cada barrido; después la cola sigue con lo
+#    que quede. Cada giro del camino en contra de los cuatro barridos cuesta
+#    una ronda más, así que una espiral de n vueltas necesita del orden de n rondas.
+# Dentro de cada fila la propagación es secuencial (x depende de x - 1). Se
+# resuelve sin bucle por píxel: cada posición es la función "recortar a
+# [valor, máscara]", su composición es asociativa y el recorrido entero sale
+# por duplicación en log2(ancho) pasos vectorizados.
+#
+# La reconstrucción por erosión es la dual: se invierte, se reconstruye por
+# dilatación y se vuelve a invertir.
+
+CONECTIVIDADES = (4, 8)
+ITERACIONES_DIRECTAS = 32
+FRENTE_PEQUENO = 256    # Oleada "diminuta" (píxeles)
+OLEADAS_ANTES_DE_BARRER = 256  # Oleadas diminutas seguidas antes de pasar a los barridos
+
+_TIPOS_CV = (np.uint8, np.uint16, np.int16, np.float32, np.float64)
+
+def _invertir(imagen):
+    """Inversión que da la vuelta al orden sin desbordar (255 - x en uint8)"""
+    if imagen.dtype.kind == "f":
+        return -imagen
+    return np.invert(imagen)
+
+def _minimo_tipo(dtype):
+    return np.iinfo(dtype).min if dtype.kind in "ui" else -np.inf
+
+# --- Barridos ---
+def _propagar_fila(fila, tope):
+    """fila[x] = min(max(fila[x], fila[x - 1]), tope[x]) de izquierda a derecha, en su sitio"""
+    alto = tope.copy()
+    n = len(fila)
+    paso = 1
+    while paso < n:
+        # Composición de los tramos [x - 2·paso, x - paso) y [x - paso, x)
+        bajo_nuevo = np.maximum(fila[:-paso], fila[paso:])
+        np.minimum(bajo_nuevo, alto[paso:], out=bajo_nuevo)
+        alto_nuevo = np.maximum(alto[:-paso], fila[paso:])
+        np.minimum(alto_nuevo, alto[paso:], out=alto_nuevo)
+        fila[paso:] = bajo_nuevo
+        alto[paso:] = alto_nuevo
+        paso *= 2
+
+def _vecinos_fila(anterior, conectividad):
+    """Máximo de los vecinos que cada píxel tiene en la fila anterior"""
+    if conectividad == 4:
+        return anterior
+    vecinos = anterior.copy()
+    np.maximum(vecinos[..., 1:], anterior[..., :-1], out=vecinos[..., 1:])
+    np.maximum(vecinos[..., :-1], anterior[..., 1:], out=vecinos[..., :-1])
+    return vecinos
+
+def _barrido(J, I, conectividad):
+    """Barrido de raster hacia delante: cada fila recibe la anterior ya procesada y se propaga a lo largo"""
+    # Solo se tocan las filas que pueden subir: las que sus propios vecinos de
+    # fila todavía pueden subir, las que la fila anterior (tal como está) puede
+    # subir y las que siguen a una fila que ha cambiado en este barrido
+    horizontal = _vecinos_fila(J, 8)
+    np.minimum(horizontal, I, out=horizontal)
+    pendientes = (horizontal > J).any(axis=1)
+    desde_arriba = np.zeros_like(pendientes)
+    desde_arriba[1:] = (np.minimum(_vecinos_fila(J[:-1], conectividad), I[1:]) > J[1:]).any(axis=1)
+
+    cambio_anterior = False
+    for y in range(J.shape[0]):
+        fila, tope = J[y], I[y]
+        pendiente = pendientes[y]
+        cambio = pendiente  # Una fila pendiente siempre sube algún píxel
+        if cambio_anterior or desde_arriba[y]:
+            candidato = np.minimum(_vecinos_fila(J[y - 1], conectividad), tope)
+            sube = candidato > fila
+            if sube.any():
+                np.maximum(fila, candidato, out=fila)
+                cambio = True
+                # Lo que ha subido solo hay que propagarlo si algún vecino de fila puede seguirlo
+                # (al cruzar un pasillo vertical no hace falta)
+                if not pendiente:
+                    pendiente = (np.minimum(_vecinos_fila(fila, 8), tope) > fila).any()
+        if pendiente:
+            # En los dos sentidos: así un camino que gira dentro de la fila no espera a la cola
+            _propagar_fila(fila, tope)
+            _propagar_fila(fila[::-1], tope[::-1])
+        cambio_anterior = cambio
+
+def _barridos(J, I, conectividad):
+    """
+    Barridos por filas (de arriba abajo y de abajo arriba) y por columnas (los
+    mismos sobre la traspuesta): un tramo recto de pasillo avanza de una vez sea
+    horizontal o vertical. Se trabaja sobre copias contiguas giradas o traspuestas:
+    recorrer vistas con pasos negativos o por columnas es más lento
+    """
+    for traspuesta in (False, True):
+        Jv, Iv = (J.T, I.T) if traspuesta else (J, I)
+        for orden in (slice(None), slice(None, None, -1)):
+            vista = (orden, orden)
+            girada = np.ascontiguousarray(Jv[vista])
+            _barrido(girada, np.ascontiguousarray(Iv[vista]), conectividad)
+            Jv[vista] = girada
+
+# --- Cola FIFO por oleadas ---
+def _desplazamientos(ancho, conectividad):
+    cruz = [-ancho, -1, 1, ancho]
+    if conectividad == 4:
+        return cruz
+    return cruz + [-ancho - 1, -ancho + 1, ancho - 1, ancho + 1]
+
+def _cola(J, I, conectividad):
+    """
+    Propaga hasta la estabilidad (retorna True) o hasta que conviene barrer
+    (False). J e I llevan un marco de 1 píxel con el mínimo del tipo.
+    """
+    desplazamientos = _desplazamientos(J.shape[1], conectividad)
+    j, i = J.ravel(), I.ravel()
+
+    # Cola inicial: los píxeles que algún vecino todavía puede subir
+    objetivo = j.copy()
+    interior = slice(J.shape[1] + 1, j.size - J.shape[1] - 1)
+    for d in desplazamientos:
+        np.maximum(objetivo[interior], j[interior.start + d:interior.stop + d], out=objetivo[interior])
+    np.minimum(objetivo, i, out=objetivo)
+    frente = np.flatnonzero(objetivo > j)
+    j[frente] = objetivo[frente]
+
+    # Para quitar repetidos de cada oleada sin ordenar: cada píxel apunta a su
+    # última aparición y solo esa se queda
+    ultima = np.empty(j.size, dtype=np.intp)
+    diminutas = 0
+    while frente.size:
+        diminutas = diminutas + 1 if frente.size < FRENTE_PEQUENO else 0
+        if diminutas > OLEADAS_ANTES_DE_BARRER:
+            return False
+        cambiados = []
+        for d in desplazamientos:
+            vecinos = frente + d
+            candidato = np.minimum(j[frente], i[vecinos])
+            sube = j[vecinos] < candidato
+            if sube.any():
+                vecinos = vecinos[sube]
+                j[vecinos] = candidato[sube]
+                cambiados.append(vecinos)
+        if not cambiados:
+            break
+        frente = np.concatenate(cambiados)
+        posiciones = np.arange(frente.size)
+        ultima[frente] = posiciones
+        frente = frente[ultima[frente] == posiciones]
+    return True
+
+def reconstruccion_dilatacion(marcador, mascara, conectividad=8):
+    """Reconstrucción por dilatación del marcador bajo la máscara (mismo tipo y forma)"""
+    if conectividad not in CONECTIVIDADES:
+        raise ValueError(f"Conectividad no soportada: {conectividad} (4 u 8)")
+    if marcador.shape != mascara.shape:
+        raise ValueError("El marcador y la máscara deben tener la misma forma")
+    marcador = np.minimum(marcador.astype(mascara.dtype, copy=False), mascara)
+    if mascara.dtype in _TIPOS_CV:
+        kernel = np.ones((3, 3), np.uint8) if conectividad == 8 else cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3))
+        for _ in range(ITERACIONES_DIRECTAS):
+            siguiente = np.minimum(cv2.dilate(marcador, kernel), mascara)
+            if np.array_equal(siguiente, marcador):
+                return siguiente
+            marcador = siguiente
+    # El marco con el mínimo del tipo nunca sube (su máscara es el mínimo): evita comprobar bordes
+    minimo = _minimo_tipo(mascara.dtype)
+    J = np.pad(marcador, 1, constant_values=minimo)
+    I = np.pad(mascara, 1, constant_values=minimo)
+    while not _cola(J, I, conectividad):
+        _barridos(J[1:-1, 1:-1], I[1:-1, 1:-1], conectividad)
+    return J[1:-1, 1:-1].copy()
+
+def reconstruccion_erosion(marcador, mascara, conectividad=8):
+    """Reconstrucción por erosión (dual): el marcador baja hasta la máscara"""
+    return _invertir(reconstruccion_dilatacion(_invertir(marcador), _invertir(mascara), conectividad))
+
+# ==========================================
+# OPERADORES GEODÉSICOS
+# ==========================================
+# Trabajan en grises (uint8); los que devuelven una selección de píxeles la
+# dan como máscara 0/255.
+
+def _gris(imagen):
+    if len(imagen.shape) == 3:
+        return cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+    return imagen
+
+def apertura_reconstruccion(imagen, kernel_size=5, forma="RECTANGULO", conectividad=8):
+    """
+    Apertura por reconstrucción: la erosión quita lo que no contiene al
+    elemento y la reconstrucción devuelve intacto todo lo demás (sin redondear bordes).
+    """
+    img = _gris(imagen)
+    marcador = estructurantes.elemento(forma, kernel_size).erosionar(img)
+    return reconstruccion_dilatacion(marcador, img, conectividad)
+
+def cierre_reconstruccion(imagen, kernel_size=5, forma="RECTANGULO", conectividad=8):
+    """Cierre por reconstrucción (dual de la apertura)"""
+    img = _gris(imagen)
+    marcador = estructurantes.elemento(forma, kernel_size).dilatar(img)
+    return reconstruccion_erosion(marcador, img, conectividad)
+
+def rellenar_huecos(imagen, conectividad=8):
+    """
+    Rellena las regiones oscuras que no tocan el borde de la imagen. En una
+    imagen binaria son los agujeros de los objetos; en grises, los valles cerrados.
+    """
+    img = _gris(imagen)
+    # El marcador es el máximo salvo en el borde: al reconstruir por erosión solo baja lo alcanzable desde fuera
+    marcador = np.full_like(img, np.iinfo(img.dtype).max if img.dtype.kind in "ui" else np.inf)
+    marcador[0, :], marcador[-1, :] = img[0, :], img[-1, :]
+    marcador[:, 0], marcador[:, -1] = img[:, 0], img[:, -1]
+    return reconstruccion_erosion(marcador, img, conectividad)
+
+def _con_signo(imagen):
+    # Restar h sin saturar en 0: así las mesetas a nivel 0 también cuentan
+    return imagen.astype(np.int16) if imagen.dtype == np.uint8 else imagen
+
+def h_domos(imagen, h=20, conectividad=8):
+    """Domos de altura h: imagen - reconstrucción(imagen - h). Resalta los picos de contraste h"""
+    img = _con_signo(_gris(imagen))
+    domos = img - reconstruccion_dilatacion(img - h, img, conectividad)
+    return np.clip(domos, 0, 255).astype(np.uint8)
+
+def maximos_regionales(imagen, conectividad=8):
+    """Mesetas rodeadas solo por valores menores (máscara 0/255)"""
+    img = _con_signo(_gris(imagen))
+    picos = img > reconstruccion_dilatacion(img - 1, img, conectividad)
+    return picos.astype(np.uint8) * 255
+
+def minimos_regionales(imagen, conectividad=8):
+    """Mesetas rodeadas solo por valores mayores (máscara 0/255)"""
+    return maximos_regionales(_invertir(_gris(imagen)), conectividad)
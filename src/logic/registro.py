@@ -0,0 +1,339 @@
+import numpy as np
+
+from src.logic import analisis
+from src.logic import colores
+from src.logic import estructurantes
+from src.logic import filtros
+from src.logic import frecuencia
+from src.logic import mapas
+from src.logic import morfologia
+from src.logic import operaciones_aritmeticas
+from src.logic import operaciones_logicas
+from src.logic import rango
+from src.logic import reconstruccion
+from src.logic import suavizado
+
+# ==========================================
+# REGISTRO DE OPERACIONES
+# ==========================================
+# Un único catálogo de las operaciones de src.logic con sus parámetros tipados
+# y metadatos. La interfaz, el modo por lotes y los benchmarks lo usan para
+# no repetir cadenas if/elif, y el pipeline lo usa para planificar optimizaciones.
+
+# Canales de entrada/salida
+CUALQUIERA = "CUALQUIERA"
+IGUAL = "IGUAL"   # La salida tiene los mismos canales que la entrada
+GRIS = "GRIS"
+BGR = "BGR"
+
+class Parametro:
+    """
+    Parámetro tipado de una operación.
+    espacial: se mide en píxeles (p. ej. un kernel), así que al trabajar sobre
+              una versión reducida de la imagen hay que escalarlo.
+    impar: ventana centrada; al escalarla se mantiene impar.
+    """
+    def __init__(self, nombre, tipo, defecto=None, minimo=None, maximo=None, opciones=None,
+                 espacial=False, impar=False):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.defecto = defecto
+        self.minimo = minimo
+        self.maximo = maximo
+        self.opciones = opciones
+        self.espacial = espacial
+        self.impar = impar
+
+    def escalar(self, valor, escala):
+        """
+        Valor equivalente sobre la imagen reducida por `escala` (solo si es
+        espacial), dentro de los límites del parámetro y con su paridad.
+        """
+        if not self.espacial:
+            return valor
+        valor = max(1, round(valor * escala))
+        if self.minimo is not None: valor = max(valor, int(np.ceil(self.minimo)))
+        if self.maximo is not None: valor = min(valor, int(self.maximo))
+        if self.impar and valor % 2 == 0:
+            valor += 1 if self.maximo is None or valor + 1 <= self.maximo else -1
+        return valor
+
+    def convertir(self, valor):
+        """Convierte y valida un valor (p. ej. el texto que llega desde la línea de comandos)"""
+        if self.tipo is np.ndarray:
+            if not isinstance(valor, np.ndarray):
+                raise ValueError(f"'{self.nombre}' debe ser una imagen")
+            return valor
+        try:
+            valor = self.tipo(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{self.nombre}' debe ser {self.tipo.__name__}, no '{valor}'")
+        if self.minimo is not None and valor < self.minimo:
+            raise ValueError(f"'{self.nombre}' debe ser >= {self.minimo}")
+        if self.maximo is not None and valor > self.maximo:
+            raise ValueError(f"'{self.nombre}' debe ser <= {self.maximo}")
+        if self.opciones is not None and valor not in self.opciones:
+            raise ValueError(f"'{self.nombre}' debe ser uno de {', '.join(map(str, self.opciones))}")
+        return valor
+
+
+class Operacion:
+    """
+    Operación registrada.
+    - canales_entrada / canales_salida: CUALQUIERA, IGUAL, GRIS o BGR
+                                        (la salida también puede ser función de los parámetros)
+    - puntual: cada píxel de salida depende solo del mismo píxel de entrada
+               (bool o función de los parámetros)
+    - por_canal: además cada canal de salida depende solo del mismo canal de entrada
+    - teselable: se puede calcular por teselas (bool o función de los parámetros)
+    - radio: vecindad que necesita cada píxel (int o función de los parámetros)
+    - cacheable: el resultado depende solo de la imagen y los parámetros (se puede reutilizar)
+    """
+    def __init__(self, nombre, funcion, parametros=(), descripcion="",
+                 canales_entrada=CUALQUIERA, canales_salida=IGUAL,
+                 puntual=False, por_canal=False, teselable=False, radio=0, cacheable=True):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.parametros = list(parametros)
+        self.descripcion = descripcion
+        self.canales_entrada = canales_entrada
+        self.canales_salida = canales_salida
+        self.puntual = puntual
+        self.por_canal = por_canal
+        self.teselable = teselable
+        self.radio = radio
+        self.cacheable = cacheable
+
+    def __repr__(self):
+        return f"Operacion({self.nombre})"
+
+    def resolver_parametros(self, *args, **kwargs):
+        """Combina posicionales, nombrados y valores por defecto en un dict validado"""
+        if len(args) > len(self.parametros):
+            raise ValueError(f"{self.nombre} acepta {len(self.parametros)} parámetros")
+        valores = {}
+        for param, valor in zip(self.parametros, args):
+            valores[param.nombre] = valor
+        for nombre, valor in kwargs.items():
+            if not any(p.nombre == nombre for p in self.parametros):
+                raise ValueError(f"{self.nombre} no tiene el parámetro '{nombre}'")
+            valores[nombre] = valor
+
+        resueltos = {}
+        for param in self.parametros:
+            if param.nombre in valores:
+                resueltos[param.nombre] = param.convertir(valores[param.nombre])
+            elif param.defecto is not None:
+                resueltos[param.nombre] = param.defecto
+            else:
+                raise ValueError(f"Falta el parámetro '{param.nombre}' de {self.nombre}")
+        return resueltos
+
+    def es_puntual(self, params):
+        return self.puntual(params) if callable(self.puntual) else self.puntual
+
+    def admite_lut(self, params, canales):
+        """
+        ¿Se puede expresar como tabla de 256 entradas sobre una imagen de `canales` canales?
+        En grises basta con que sea puntual; en color cada canal debe ser independiente.
+        """
+        if not self.es_puntual(params):
+            return False
+        if any(isinstance(v, np.ndarray) for v in params.values()):
+            return False  # Depende de otra imagen, no solo del valor del píxel
+        return canales == 1 or self.por_canal
+
+    def canales_resultado(self, params, canales):
+        """Canales de la salida dada la entrada (None si no se puede saber)"""
+        salida = self.canales_salida(params) if callable(self.canales_salida) else self.canales_salida
+        if salida == IGUAL: return canales
+        if salida == GRIS: return 1
+        if salida == BGR: return 3
+        return None
+
+    def es_teselable(self, params):
+        return self.teselable(params) if callable(self.teselable) else self.teselable
+
+    def halo(self, params):
+        return self.radio(params) if callable(self.radio) else self.radio
+
+    def ejecutar(self, imagen, params, cache=None):
+        """
+        Aplica la operación con parámetros ya resueltos. Con `cache` (la
+        interfaz pasa CACHE) reutiliza resultados; por defecto no se usa: teselas,
+        bandas y lotes no se repiten y solo pagarían el hash.
+        """
+        if cache is None or not self.cacheable:
+            return self.funcion(imagen, **params)
+        return cache.ejecutar(self.nombre, self.funcion, imagen, params)
+
+    def __call__(self, imagen, *args, **kwargs):
+        params = self.resolver_parametros(*args, **kwargs)
+        return self.ejecutar(imagen, params)
+
+
+OPERACIONES = {}
+
+def registrar(nombre, funcion, *parametros, **metadatos):
+    OPERACIONES[nombre] = Operacion(nombre, funcion, parametros, **metadatos)
+    return OPERACIONES[nombre]
+
+def obtener(nombre):
+    if nombre not in OPERACIONES:
+        raise ValueError(f"Operación desconocida: '{nombre}'")
+    return OPERACIONES[nombre]
+
+def _radio_kernel(params):
+    return params["kernel_size"] // 2
+
+def _radio_compuesto(params):
+    # Apertura/cierre encadenan dos pasadas del mismo kernel
+    return 2 * (params["kernel_size"] // 2)
+
+# --- Parámetros comunes ---
+def _kernel(defecto):
+    return Parametro("kernel_size", int, defecto, minimo=1, maximo=255, espacial=True)
+
+def _forma():
+    return Parametro("forma", str, "RECTANGULO", opciones=estructurantes.FORMAS)
+
+def _conectividad():
+    return Parametro("conectividad", int, 8, opciones=reconstruccion.CONECTIVIDADES)
+
+def _escalar():
+    return Parametro("valor", float, 1.0, minimo=-255, maximo=255)
+
+def _secundaria():
+    return Parametro("img_secundaria", np.ndarray)
+
+# --- Operaciones puntuales ---
+registrar("suma_escalar", operaciones_aritmeticas.suma_escalar, _escalar(),
+          descripcion="Aumenta el brillo", puntual=True, por_canal=True, teselable=True)
+registrar("resta_escalar", operaciones_aritmeticas.resta_escalar, _escalar(),
+          descripcion="Disminuye el brillo", puntual=True, por_canal=True, teselable=True)
+registrar("multiplicacion_escalar", operaciones_aritmeticas.multiplicacion_escalar, _escalar(),
+          descripcion="Aumenta el contraste", puntual=True, por_canal=True, teselable=True)
+registrar("division_escalar", operaciones_aritmeticas.division_escalar, _escalar(),
+          descripcion="Disminuye el contraste", puntual=True, por_canal=True, teselable=True)
+registrar("inversion_aritmetica", operaciones_aritmeticas.inversion_aritmetica,
+          descripcion="Negativo (255 - pixel)", puntual=True, por_canal=True, teselable=True)
+registrar("operacion_not", operaciones_logicas.operacion_not,
+          descripcion="NOT bit a bit", puntual=True, por_canal=True, teselable=True)
+registrar("aplicar_mapa_color", mapas.aplicar_mapa_color,
+          Parametro("nombre_mapa", str, "JET",
+                    opciones=("JET", "HOT", "OCEAN", "BONE", "PINK", "PROPIO 1", "PROPIO 2")),
+          descripcion="Mapa de color sobre la intensidad", canales_salida=BGR,
+          puntual=True, teselable=True)
+registrar("aplicar_modelo", colores.aplicar_modelo,
+          Parametro("modelo", str, "GRAY",
+                    opciones=("RGB", "GRAY", "BINARY", "NIBLACK", "SAUVOLA", "HSV", "CMYK")),
+          Parametro("ventana", int, 25, minimo=3, maximo=255, espacial=True, impar=True),
+          descripcion="Cambio de modelo de color",
+          canales_salida=lambda p: GRIS if p["modelo"] in ("GRAY", "BINARY", "NIBLACK", "SAUVOLA") else BGR,
+          # BINARY usa un umbral de Otsu global; NIBLACK/SAUVOLA miran una vecindad
+          puntual=lambda p: p["modelo"] not in ("BINARY", "NIBLACK", "SAUVOLA"),
+          teselable=lambda p: p["modelo"] != "BINARY",
+          radio=lambda p: p["ventana"] // 2 if p["modelo"] in ("NIBLACK", "SAUVOLA") else 0)
+
+# --- Operaciones con dos imágenes ---
+registrar("suma_imagenes", operaciones_aritmeticas.suma_imagenes, _secundaria(), puntual=True)
+registrar("resta_imagenes", operaciones_aritmeticas.resta_imagenes, _secundaria(), puntual=True)
+registrar("multiplicacion_imagenes", operaciones_aritmeticas.multiplicacion_imagenes, _secundaria(), puntual=True)
+registrar("division_imagenes", operaciones_aritmeticas.division_imagenes, _secundaria(), puntual=True)
+registrar("operacion_and", operaciones_logicas.operacion_and, _secundaria(), puntual=True)
+registrar("operacion_or", operaciones_logicas.operacion_or, _secundaria(), puntual=True)
+registrar("operacion_xor", operaciones_logicas.operacion_xor, _secundaria(), puntual=True)
+
+# --- Histograma ---
+registrar("ecualizar_histograma", analisis.ecualizar_histograma,
+          descripcion="Ecualización de histograma", canales_salida=GRIS)
+
+# --- Filtros de suavizado ---
+registrar("filtro_promedio", filtros.filtro_promedio, _kernel(3),
+          descripcion="Media (Blur)", teselable=True, radio=_radio_kernel)
+registrar("filtro_mediana", filtros.filtro_mediana, _kernel(3),
+          descripcion="Mediana", teselable=True, radio=_radio_kernel)
+registrar("filtro_gaussiano", filtros.filtro_gaussiano, _kernel(3),
+          descripcion="Gaussiano", teselable=True, radio=_radio_kernel)
+registrar("filtro_guiado", suavizado.filtro_guiado,
+          Parametro("radio", int, 8, minimo=1, maximo=255, espacial=True),
+          Parametro("eps", float, 0.01, minimo=1e-6, maximo=1.0),
+          descripcion="Guiado (preserva bordes)", teselable=True,
+          # Dos niveles de filtros de caja: la salida depende de 2 * radio píxeles
+          radio=lambda p: 2 * p["radio"])
+registrar("filtro_bilateral_rejilla", suavizado.filtro_bilateral_rejilla,
+          Parametro("sigma_espacial", int, 16, minimo=2, maximo=255, espacial=True),
+          Parametro("sigma_rango", float, 25.0, minimo=1, maximo=255),
+          # Las celdas de la rejilla dependen del origen de la imagen: no es teselable
+          descripcion="Bilateral (rejilla, preserva bordes)")
+registrar("filtro_maximo", filtros.filtro_maximo, _kernel(3),
+          descripcion="Máximo", canales_salida=IGUAL, teselable=True, radio=_radio_kernel)
+registrar("filtro_minimo", filtros.filtro_minimo, _kernel(3),
+          descripcion="Mínimo", canales_salida=IGUAL, teselable=True, radio=_radio_kernel)
+registrar("filtro_percentil", rango.filtro_percentil, _kernel(3),
+          Parametro("percentil", float, 50.0, minimo=0, maximo=100),
+          descripcion="Percentil (0 = mínimo, 50 = mediana, 100 = máximo)",
+          teselable=True, radio=_radio_kernel)
+
+# --- Filtros de bordes ---
+registrar("filtro_sobel", filtros.filtro_sobel,
+          descripcion="Sobel (normalizado a la imagen completa)", canales_salida=GRIS)
+registrar("filtro_scharr", filtros.filtro_scharr,
+          descripcion="Scharr (normalizado a la imagen completa)", canales_salida=GRIS)
+registrar("filtro_prewitt", filtros.filtro_prewitt,
+          descripcion="Prewitt", canales_salida=GRIS, teselable=True, radio=1)
+registrar("filtro_roberts", filtros.filtro_roberts,
+          descripcion="Roberts", canales_salida=GRIS, teselable=True, radio=1)
+registrar("filtro_canny", filtros.filtro_canny,
+          descripcion="Canny (la histéresis es global)", canales_salida=GRIS)
+registrar("filtro_laplaciano", filtros.filtro_laplaciano,
+          descripcion="Laplaciano", canales_salida=GRIS, teselable=True, radio=1)
+registrar("filtro_kirsch", filtros.filtro_kirsch,
+          descripcion="Kirsch (8 direcciones)", canales_salida=GRIS, teselable=True, radio=1)
+registrar("filtro_robinson", filtros.filtro_robinson,
+          descripcion="Robinson (8 direcciones)", canales_salida=GRIS, teselable=True, radio=1)
+registrar("filtro_frei_chen", filtros.filtro_frei_chen,
+          descripcion="Frei-Chen (8 direcciones)", canales_salida=GRIS, teselable=True, radio=1)
+
+# --- Morfología ---
+registrar("erosion", morfologia.erosion, _kernel(5), _forma(),
+          descripcion="Erosión", canales_salida=GRIS, teselable=True, radio=_radio_kernel)
+registrar("dilatacion", morfologia.dilatacion, _kernel(5), _forma(),
+          descripcion="Dilatación", canales_salida=GRIS, teselable=True, radio=_radio_kernel)
+registrar("apertura_manual", morfologia.apertura_manual, _kernel(5),
+          descripcion="Apertura (manual)", canales_salida=GRIS, teselable=True, radio=_radio_compuesto)
+registrar("cierre_manual", morfologia.cierre_manual, _kernel(5),
+          descripcion="Cierre (manual)", canales_salida=GRIS, teselable=True, radio=_radio_compuesto)
+registrar("apertura_ex", morfologia.apertura_ex, _kernel(5), _forma(),
+          descripcion="Apertura", canales_salida=GRIS, teselable=True, radio=_radio_compuesto)
+registrar("cierre_ex", morfologia.cierre_ex, _kernel(5), _forma(),
+          descripcion="Cierre", canales_salida=GRIS, teselable=True, radio=_radio_compuesto)
+# Geodésicas: la reconstrucción propaga por toda la imagen, no son teselables
+registrar("apertura_reconstruccion", reconstruccion.apertura_reconstruccion, _kernel(5), _forma(), _conectividad(),
+          descripcion="Apertura por reconstrucción", canales_salida=GRIS)
+registrar("cierre_reconstruccion", reconstruccion.cierre_reconstruccion, _kernel(5), _forma(), _conectividad(),
+          descripcion="Cierre por reconstrucción", canales_salida=GRIS)
+registrar("rellenar_huecos", reconstruccion.rellenar_huecos, _conectividad(),
+          descripcion="Rellenar huecos", canales_salida=GRIS)
+registrar("maximos_regionales", reconstruccion.maximos_regionales, _conectividad(),
+          descripcion="Máximos regionales (máscara)", canales_salida=GRIS)
+registrar("minimos_regionales", reconstruccion.minimos_regionales, _conectividad(),
+          descripcion="Mínimos regionales (máscara)", canales_salida=GRIS)
+registrar("h_domos", reconstruccion.h_domos,
+          Parametro("h", int, 20, minimo=1, maximo=255), _conectividad(),
+          descripcion="H-domos (picos de contraste h)", canales_salida=GRIS)
+
+# --- Frecuencia ---
+registrar("aplicar_filtro_ideal", frecuencia.aplicar_filtro_ideal,
+          Parametro("tipo", str, "PASA_BAJAS", opciones=("PASA_BAJAS", "PASA_ALTAS")),
+          # El radio se mide en el espectro (ciclos por imagen): no depende de la resolución
+          Parametro("radio_corte", int, 30, minimo=1, maximo=1000),
+          descripcion="Filtro ideal (FFT)", canales_salida=GRIS)
+registrar("aplicar_filtro_frecuencia", frecuencia.aplicar_filtro,
+          Parametro("familia", str, "GAUSSIANO", opciones=frecuencia.FAMILIAS),
+          Parametro("tipo", str, "PASA_BAJAS",
+                    opciones=("PASA_BAJAS", "PASA_ALTAS", "PASA_BANDA", "RECHAZA_BANDA")),
+          Parametro("radio_corte", int, 30, minimo=1, maximo=1000),
+          Parametro("ancho_banda", int, 10, minimo=1, maximo=1000),
+          Parametro("orden", int, 2, minimo=1, maximo=10),
+          descripcion="Banco de filtros (FFT)", canales_salida=GRIS)
@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+import scipy.ndimage as ndimage
+
+# ==========================================
+# SUAVIZADO QUE PRESERVA BORDES (COSTE INDEPENDIENTE DEL RADIO)
+# ==========================================
+# - Filtro guiado (He et al.): en cada ventana la salida es un modelo lineal
+#   a * guía + b. Todo se reduce a filtros de caja (cv2.boxFilter), que cuestan
+#   lo mismo con cualquier radio.
+# - Rejilla bilateral (Paris y Durand / Chen et al.): la imagen se reparte en
+#   una rejilla 3D submuestreada (espacio x intensidad), se suaviza ahí y se
+#   vuelve a leer interpolando. El coste depende del tamaño de la imagen y de
+#   la rejilla, no del radio espacial.
+# Las dos funcionan en grises y en BGR (cada canal por separado).
+
+def _por_canal(funcion, imagen):
+    if imagen.ndim == 2:
+        return funcion(imagen)
+    return cv2.merge([funcion(np.ascontiguousarray(imagen[..., c])) for c in range(imagen.shape[2])])
+
+def _a_uint8(valores):
+    np.rint(valores, out=valores)
+    np.clip(valores, 0, 255, out=valores)
+    return valores.astype(np.uint8)
+
+# --- Filtro guiado ---
+def _guiado_canal(canal, radio, eps):
+    caja = lambda x: cv2.boxFilter(x, -1, (2 * radio + 1, 2 * radio + 1))
+    guia = canal.astype(np.float32)
+    media = caja(guia)
+    varianza = caja(guia * guia)
+    varianza -= media * media
+    # a = var / (var + eps): cerca de 1 en los bordes (se conservan) y de 0 en zonas planas
+    a = varianza / (varianza + eps)
+    b = media - a * media
+    salida = caja(a)
+    salida *= guia
+    salida += caja(b)
+    return _a_uint8(salida)
+
+def filtro_guiado(imagen, radio=8, eps=0.01):
+    """
+    Filtro guiado con la propia imagen como guía.
+    - radio: radio de la ventana (coste constante)
+    - eps: regularización en escala 0-1; mayor = suaviza también bordes más fuertes
+    """
+    eps_255 = np.float32(eps * 255.0 * 255.0)
+    return _por_canal(lambda c: _guiado_canal(c, radio, eps_255), imagen)
+
+# --- Rejilla bilateral ---
+_NUCLEO_REJILLA = np.array([1, 4, 6, 4, 1], dtype=np.float32) / 16  # Gaussiana binomial, sigma = 1 celda
+
+def _bilateral_canal(canal, sigma_espacial, sigma_rango):
+    alto, ancho = canal.shape
+    valores = canal.astype(np.float32)
+
+    # Coordenadas de cada píxel en la rejilla (una celda = un sigma)
+    gy = np.arange(alto, dtype=np.float32) / sigma_espacial
+    gx = np.arange(ancho, dtype=np.float32) / sigma_espacial
+    gz = valores / sigma_rango
+    forma = (int(gy[-1]) + 3, int(gx[-1]) + 3, int(255 / sigma_rango) + 3)
+
+    # Reparto (splat) a la celda más cercana: suma de valores y cuenta de píxeles
+    iy = np.rint(gy).astype(np.intp)[:, None]
+    ix = np.rint(gx).astype(np.intp)[None, :]
+    iz = np.rint(gz).astype(np.intp)
+    indice = ((iy * forma[1] + ix) * forma[2] + iz).ravel()
+    tam = forma[0] * forma[1] * forma[2]
+    suma = np.bincount(indice, weights=valores.ravel(), minlength=tam).reshape(forma).astype(np.float32)
+    peso = np.bincount(indice, minlength=tam).reshape(forma).astype(np.float32)
+
+    # Suavizado en la rejilla: la misma gaussiana pequeña en los tres ejes
+    for eje in range(3):
+        ndimage.convolve1d(suma, _NUCLEO_REJILLA, axis=eje, output=suma, mode="constant")
+        ndimage.convolve1d(peso, _NUCLEO_REJILLA, axis=eje, output=peso, mode="constant")
+
+    # Lectura (slice) con interpolación trilineal en la posición de cada píxel
+    coords = np.empty((3, alto, ancho), dtype=np.float32)
+    coords[0] = gy[:, None]
+    coords[1] = gx[None, :]
+    coords[2] = gz
+    num = ndimage.map_coordinates(suma, coords, order=1, mode="nearest")
+    den = ndimage.map_coordinates(peso, coords, order=1, mode="nearest")
+    salida = np.divide(num, den, out=valores, where=den > 1e-6)
+    return _a_uint8(salida)
+
+def filtro_bilateral_rejilla(imagen, sigma_espacial=16, sigma_rango=25.0):
+    """
+    Filtro bilateral aproximado con una rejilla bilateral.
+    - sigma_espacial: en píxeles (un mayor valor no encarece el filtro, lo abarata)
+    - sigma_rango: en niveles de gris
+    """
+    return _por_canal(lambda c: _bilateral_canal(c, sigma_espacial, sigma_rango), imagen)
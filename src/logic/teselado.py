@@ -0,0 +1,170 @@
+import math
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.logic import filtros
+from src.logic import gradientes
+
+# ==========================================
+# PROCESAMIENTO POR TESELAS (OUT-OF-CORE)
+# ==========================================
+# Recorre una imagen enorme (por ejemplo un np.memmap) por teselas. Cada tesela
+# se lee con un halo del tamaño del radio de la operación, se procesa, se recorta
+# el halo y se escribe en la salida (otra memmap o un array). Como cada píxel
+# conservado ve toda su vecindad real, el resultado en las costuras es idéntico
+# al de procesar la imagen completa.
+#
+# Las teselas también se pueden repartir entre hilos: NumPy, SciPy y OpenCV
+# liberan el GIL, así que filtros que corren en un solo núcleo escalan con
+# el número de trabajadores.
+
+TAM_TESELA = 1024
+_trabajadores = os.cpu_count() or 1
+
+def configurar_trabajadores(n):
+    """Número de hilos por defecto para la ejecución en paralelo"""
+    global _trabajadores
+    _trabajadores = max(1, int(n))
+
+def obtener_trabajadores():
+    return _trabajadores
+
+def abrir_npy(ruta):
+    """Abre un .npy como memmap de solo lectura (no lo carga en RAM)"""
+    return np.load(ruta, mmap_mode="r")
+
+def crear_salida(forma, tipo, ruta=None):
+    """Array de salida: en RAM, o un .npy mapeado a disco si se indica ruta"""
+    if ruta is None:
+        return np.empty(forma, dtype=tipo)
+    return np.lib.format.open_memmap(ruta, mode="w+", dtype=tipo, shape=forma)
+
+def generar_teselas(alto, ancho, tam_tesela=TAM_TESELA):
+    """Genera las ventanas (y0, y1, x0, x1) que cubren la imagen. tam_tesela: int o (alto, ancho)"""
+    alto_t, ancho_t = tam_tesela if isinstance(tam_tesela, tuple) else (tam_tesela, tam_tesela)
+    for y0 in range(0, alto, alto_t):
+        for x0 in range(0, ancho, ancho_t):
+            yield y0, min(y0 + alto_t, alto), x0, min(x0 + ancho_t, ancho)
+
+def procesar_tesela(funcion, imagen, ventana, radio):
+    """Aplica `funcion` a la ventana ampliada con el halo y retorna solo la parte útil"""
+    alto, ancho = imagen.shape[:2]
+    y0, y1, x0, x1 = ventana
+    # El halo se recorta en los bordes reales: ahí la operación usa su propio borde
+    ya, yb = max(y0 - radio, 0), min(y1 + radio, alto)
+    xa, xb = max(x0 - radio, 0), min(x1 + radio, ancho)
+    region = np.ascontiguousarray(imagen[ya:yb, xa:xb])
+    resultado = funcion(region)
+    return resultado[y0 - ya:y1 - ya, x0 - xa:x1 - xa]
+
+def ejecutar_teselado(funcion, imagen, radio, salida=None, ruta_salida=None,
+                      tam_tesela=TAM_TESELA, progreso=None, trabajadores=1):
+    """
+    Aplica `funcion` (imagen -> imagen del mismo alto/ancho) tesela a tesela.
+    - radio: píxeles de vecindad que necesita la operación (halo)
+    - salida: array ya reservado; si no se da se crea (en RAM o en `ruta_salida`)
+    - progreso: callback opcional progreso(hechas, total)
+    - trabajadores: hilos que procesan teselas a la vez (None = valor configurado)
+    """
+    alto, ancho = imagen.shape[:2]
+    ventanas = list(generar_teselas(alto, ancho, tam_tesela))
+    trabajadores = trabajadores or _trabajadores
+
+    def escribir(ventana, parte):
+        y0, y1, x0, x1 = ventana
+        salida[y0:y1, x0:x1] = parte
+
+    # La forma y el tipo de la salida se conocen al procesar la primera tesela
+    parte = procesar_tesela(funcion, imagen, ventanas[0], radio)
+    if salida is None:
+        salida = crear_salida((alto, ancho) + parte.shape[2:], parte.dtype, ruta_salida)
+    escribir(ventanas[0], parte)
+    if progreso is not None:
+        progreso(1, len(ventanas))
+
+    if trabajadores <= 1:
+        for i, ventana in enumerate(ventanas[1:], start=2):
+            escribir(ventana, procesar_tesela(funcion, imagen, ventana, radio))
+            if progreso is not None:
+                progreso(i, len(ventanas))
+    else:
+        # Cada hilo escribe en su propia ventana de la salida: no hace falta bloqueo
+        def tarea(ventana):
+            escribir(ventana, procesar_tesela(funcion, imagen, ventana, radio))
+
+        with ThreadPoolExecutor(max_workers=trabajadores) as pool:
+            futuros = [pool.submit(tarea, v) for v in ventanas[1:]]
+            try:
+                for i, futuro in enumerate(futuros, start=2):
+                    futuro.result()
+                    if progreso is not None:
+                        progreso(i, len(ventanas))
+            except BaseException:
+                # Si falla una tesela (o el callback de progreso cancela) no seguimos con el resto
+                for futuro in futuros:
+                    futuro.cancel()
+                raise
+
+    if isinstance(salida, np.memmap):
+        salida.flush()
+    return salida
+
+def ejecutar_en_bandas(funcion, imagen, radio, trabajadores=None, salida=None, bandas_por_hilo=2):
+    """
+    Parte la imagen en bandas horizontales (ancho completo) con halo y las procesa
+    en paralelo. Pensado para imágenes que caben en RAM pero cuyo filtro usa un solo núcleo.
+    """
+    trabajadores = trabajadores or _trabajadores
+    alto, ancho = imagen.shape[:2]
+    if trabajadores <= 1:
+        return funcion(imagen)
+    # Bandas no demasiado finas: el halo se recalcula en cada una
+    alto_banda = max(math.ceil(alto / (trabajadores * bandas_por_hilo)), 4 * radio + 1, 16)
+    return ejecutar_teselado(funcion, imagen, radio, salida, tam_tesela=(alto_banda, ancho),
+                             trabajadores=trabajadores)
+
+def normalizar_teselado(entrada, salida=None, ruta_salida=None, tam_tesela=TAM_TESELA):
+    """
+    Equivalente por teselas de gradientes.normalizar_uint8 (NORM_MINMAX a uint8):
+    una pasada para el mínimo/máximo global y otra para escalar.
+    """
+    minimo, maximo = np.inf, -np.inf
+    alto, ancho = entrada.shape[:2]
+    for y0, y1, x0, x1 in generar_teselas(alto, ancho, tam_tesela):
+        parte = entrada[y0:y1, x0:x1]
+        minimo = min(minimo, float(parte.min()))
+        maximo = max(maximo, float(parte.max()))
+
+    escala, desplazamiento = gradientes.escala_minmax(minimo, maximo)
+
+    if salida is None:
+        salida = crear_salida(entrada.shape, np.uint8, ruta_salida)
+    for y0, y1, x0, x1 in generar_teselas(alto, ancho, tam_tesela):
+        parte = entrada[y0:y1, x0:x1].astype(np.float32)
+        gradientes.escalar_a_uint8(parte, escala, desplazamiento, out=salida[y0:y1, x0:x1])
+    if isinstance(salida, np.memmap):
+        salida.flush()
+    return salida
+
+def filtro_sobel_teselado(imagen, salida=None, ruta_salida=None, tam_tesela=TAM_TESELA):
+    """
+    filtros.filtro_sobel por teselas. La magnitud es local, pero la normalización
+    usa el mínimo/máximo de toda la imagen, así que va en dos fases con un
+    intermedio temporal en disco.
+    """
+    fd, ruta_tmp = tempfile.mkstemp(suffix=".npy")
+    os.close(fd)
+    try:
+        magnitud = ejecutar_teselado(filtros.magnitud_sobel, imagen, 1,
+                                     ruta_salida=ruta_tmp, tam_tesela=tam_tesela)
+        salida = normalizar_teselado(magnitud, salida, ruta_salida, tam_tesela)
+        del magnitud
+    finally:
+        try:
+            os.remove(ruta_tmp)
+        except OSError:
+            pass  # En Windows puede seguir mapeado; queda en la carpeta temporal
+    return salida
@@ -0,0 +1,100 @@
+import math
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from src.logic import teselado
+from src.logic.cache import CACHE
+
+# ==========================================
+# EJECUCIÓN EN SEGUNDO PLANO
+# ==========================================
+# Las operaciones corren en un QThreadPool para no congelar la ventana.
+# Las que son teselables se ejecutan por bandas: así hay progreso real y se
+# pueden cancelar entre banda y banda (el resultado es idéntico).
+
+BANDAS_PROGRESO = 16
+
+class TrabajoCancelado(Exception):
+    pass
+
+class SenalesTrabajo(QObject):
+    progreso = pyqtSignal(int, int)       # (id del trabajo, porcentaje)
+    terminado = pyqtSignal(int, object)   # (id del trabajo, resultado)
+    fallo = pyqtSignal(int, str)          # (id del trabajo, mensaje)
+
+class TrabajoOperacion(QRunnable):
+    def __init__(self, id_trabajo, operacion, imagen, args=()):
+        super().__init__()
+        self.id = id_trabajo
+        self.operacion = operacion
+        self.imagen = imagen  # Congelada: se puede leer desde el hilo sin copiarla
+        self.args = args
+        self.senales = SenalesTrabajo()
+        self._cancelado = threading.Event()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    def _progreso(self, hechas, total):
+        if self._cancelado.is_set():
+            raise TrabajoCancelado()
+        self.senales.progreso.emit(self.id, int(100 * hechas / total))
+
+    def run(self):
+        try:
+            params = self.operacion.resolver_parametros(*self.args)
+            clave = CACHE.clave(self.imagen, self.operacion.nombre, params)
+            resultado = CACHE.obtener(clave) if self.operacion.cacheable else None
+            if resultado is not None:
+                self.senales.terminado.emit(self.id, resultado)
+                return
+
+            if self.operacion.es_teselable(params):
+                alto, ancho = self.imagen.shape[:2]
+                resultado = teselado.ejecutar_teselado(
+                    lambda region: self.operacion.funcion(region, **params),
+                    self.imagen, self.operacion.halo(params),
+                    tam_tesela=(max(math.ceil(alto / BANDAS_PROGRESO), 1), ancho),
+                    progreso=self._progreso, trabajadores=None)
+            else:
+                # Sin teselas no hay progreso intermedio; cancelar solo descarta el resultado
+                self.senales.progreso.emit(self.id, 0)
+                resultado = self.operacion.funcion(self.imagen, **params)
+            if self.operacion.cacheable:
+                resultado = CACHE.guardar(clave, resultado)
+            if not self._cancelado.is_set():
+                self.senales.terminado.emit(self.id, resultado)
+        except TrabajoCancelado:
+            pass
+        except Exception as e:
+            if not self._cancelado.is_set():
+                self.senales.fallo.emit(self.id, str(e))
+
+
+class TrabajoCalculo(QRunnable):
+    """Cálculo suelto en segundo plano, fuera del historial y de la caché (p. ej. un análisis)"""
+    def __init__(self, id_trabajo, funcion, *args):
+        super().__init__()
+        self.id = id_trabajo
+        self.funcion = funcion
+        self.args = args
+        self.senales = SenalesTrabajo()
+        self._cancelado = threading.Event()
+
+    def cancelar(self):
+        """No interrumpe el cálculo: solo evita que se emita su resultado"""
+        self._cancelado.set()
+
+    def run(self):
+        try:
+            resultado = self.funcion(*self.args)
+            if not self._cancelado.is_set():
+                self.senales.terminado.emit(self.id, resultado)
+        except Exception as e:
+            if not self._cancelado.is_set():
+                self.senales.fallo.emit(self.id, str(e))
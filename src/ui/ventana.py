@@ -15,25 +15,53 @@ from datetime import datetime
 from PyQt6.QtWidgets import (
     QMainWindow, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, 
     QWidget, QFileDialog, QMessageBox, QSizePolicy, QInputDialog,
-    QFrame, QToolBox, QMenu  # <--- AÑADIDO QMenu AQUÍ
+    QFrame, QToolBox, QMenu, QProgressBar, QComboBox, QSpinBox  # <--- AÑADIDO QMenu AQUÍ
 )
 from PyQt6.QtGui import QImage, QPixmap, QIcon
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThreadPool
 
 # Importamos módulos de lógica
-from src.logic.gestor_estado import GestorEstado
-from src.ui.ventanas_aux import VentanaHistograma, VentanaCanales
+from src.logic.gestor_estado import crear_gestor, reproducir, GestorOperaciones
+from src.logic.inmutable import congelar
+from src.logic.cache import CACHE
+from src.ui.ventanas_aux import VentanaHistograma, VentanaCanales, VentanaVistaPrevia
+from src.ui.trabajador import TrabajoOperacion, TrabajoCalculo
 from src.logic import analisis
-from src.logic import operaciones_aritmeticas
-from src.logic import operaciones_logicas
-from src.logic import colores
-from src.logic import mapas
-from src.logic import filtros
-from src.logic import morfologia
-from src.logic import frecuencia
+from src.logic import registro
+from src.logic import teselado
+
+# Modo del historial: "IMAGENES" (instantáneas), "DISCO" (memmap) u "OPERACIONES" (registro).
+# MODO_HISTORIAL es el de arranque; se cambia desde el selector del panel lateral
+MODO_HISTORIAL = "IMAGENES"
+MODOS_HISTORIAL_UI = {
+    "IMAGENES": "Instantáneas (RAM)", "DISCO": "Instantáneas en disco (imágenes enormes)",
+    "OPERACIONES": "Registro de operaciones",
+}
+
+# Botones de la interfaz -> operación del registro (los parámetros por defecto
+# de cada operación, p. ej. el tamaño de kernel, vienen del propio registro)
+FILTROS_UI = {
+    "Promedio": "filtro_promedio", "Mediana": "filtro_mediana", "Gaussiano": "filtro_gaussiano",
+    "Máximo": "filtro_maximo", "Mínimo": "filtro_minimo", "Sobel": "filtro_sobel",
+    "Scharr": "filtro_scharr", "Prewitt": "filtro_prewitt", "Canny": "filtro_canny", "Laplaciano": "filtro_laplaciano",
+    "Guiado": "filtro_guiado", "Bilateral": "filtro_bilateral_rejilla",
+}
+MORFOLOGIA_UI = {
+    "Erosión": "erosion", "Dilatación": "dilatacion", "Apertura": "apertura_ex", "Cierre": "cierre_ex",
+    "Apertura por Reconstrucción": "apertura_reconstruccion", "Cierre por Reconstrucción": "cierre_reconstruccion",
+    "Rellenar Huecos": "rellenar_huecos", "Máximos Regionales": "maximos_regionales",
+    "Mínimos Regionales": "minimos_regionales", "H-Domos": "h_domos",
+}
+LOGICAS_UI = {
+    "NOT": "operacion_not", "AND": "operacion_and", "OR": "operacion_or", "XOR": "operacion_xor",
+}
+ARITMETICA_UI = {
+    "INV": "inversion_aritmetica", "SUMA": "suma_escalar",
+    "MULT": "multiplicacion_escalar", "RESTA": "resta_escalar",
+}
 
 class VentanaPrincipal(QMainWindow):
-    def __init__(self):
+    def __init__(self, modo_historial=MODO_HISTORIAL):
         super().__init__()
         self.setWindowTitle("Visión Artificial Studio - [Tu Apellido]") # ¡Personaliza esto!
         self.resize(1200, 800)
@@ -105,10 +133,16 @@ class VentanaPrincipal(QMainWindow):
         os.makedirs(self.ruta_salidas, exist_ok=True)
         
         # Estado
-        self.gestor = GestorEstado()
+        self.modo_historial = modo_historial
+        self.gestor = crear_gestor(modo_historial)
         self.imagen_original = None
         self.imagen_mostrada = None
 
+        # Trabajos en segundo plano (solo se aplica el resultado del más reciente)
+        self.pool = QThreadPool.globalInstance()
+        self.trabajo_actual = None
+        self._id_trabajo = 0
+
         # Inicializar UI
         self.init_ui_moderna()
 
@@ -157,6 +191,25 @@ class VentanaPrincipal(QMainWindow):
         layout_hist.addWidget(btn_redo)
         layout_lateral.addLayout(layout_hist)
 
+        # Modo del historial (cambiarlo vacía el historial actual)
+        layout_modo = QHBoxLayout()
+        layout_modo.addWidget(QLabel("Historial:"))
+        self.combo_historial = QComboBox()
+        for modo, etiqueta in MODOS_HISTORIAL_UI.items():
+            self.combo_historial.addItem(etiqueta, modo)
+        self.combo_historial.setCurrentIndex(max(self.combo_historial.findData(self.modo_historial), 0))
+        self.combo_historial.currentIndexChanged.connect(
+            lambda _: self.cambiar_modo_historial(self.combo_historial.currentData()))
+        layout_modo.addWidget(self.combo_historial, stretch=1)
+        # Hilos de las operaciones teselables (se reparten por bandas)
+        layout_modo.addWidget(QLabel("Hilos:"))
+        self.spin_hilos = QSpinBox()
+        self.spin_hilos.setRange(1, max(os.cpu_count() or 1, teselado.obtener_trabajadores()))
+        self.spin_hilos.setValue(teselado.obtener_trabajadores())
+        self.spin_hilos.valueChanged.connect(teselado.configurar_trabajadores)
+        layout_modo.addWidget(self.spin_hilos)
+        layout_lateral.addLayout(layout_modo)
+
         # --- TOOLBOX (Menú Acordeón) ---
         self.toolbox = QToolBox()
         self.toolbox.setStyleSheet("QToolBox { background-color: #181818; }")
@@ -175,6 +228,7 @@ class VentanaPrincipal(QMainWindow):
         lay_punt.addWidget(lbl_conv)
         self.crear_boton("Escala de Grises", lambda: self.aplicar_modelo("GRAY"), lay_punt)
         self.crear_boton("Binarización (Otsu)", lambda: self.aplicar_modelo("BINARY"), lay_punt)
+        self.crear_boton("Binarización Local", self.menu_binarizacion_popup, lay_punt)
         self.crear_boton("Modelos Color (HSV/CMYK)", self.menu_color_popup, lay_punt) # Movido aquí
         
         lbl_log = QLabel("Lógicas"); lbl_log.setObjectName("TituloSeccion")
@@ -217,6 +271,7 @@ class VentanaPrincipal(QMainWindow):
         lay_vec.addWidget(lbl_nolin)
         self.crear_boton("Mediana (Sal/Pimienta)", lambda: self.aplicar_filtro("Mediana"), lay_vec)
         self.crear_boton("Mínimo / Máximo", self.menu_min_max_popup, lay_vec)
+        self.crear_boton("Ajustar Kernel (Vista Previa)", self.menu_vista_previa_popup, lay_vec)
         
         lay_vec.addStretch()
         self.toolbox.addItem(page_vec, "3. Operaciones de Vecindad")
@@ -234,6 +289,13 @@ class VentanaPrincipal(QMainWindow):
         lay_morfo.addWidget(lbl_compuestas)
         self.crear_boton("Apertura (Limpiar Ruido)", lambda: self.aplicar_morfologia("Apertura"), lay_morfo)
         self.crear_boton("Cierre (Cerrar Huecos)", lambda: self.aplicar_morfologia("Cierre"), lay_morfo)
+        self.crear_boton("Ajustar Kernel (Vista Previa)", self.menu_vista_previa_morfo_popup, lay_morfo)
+
+        lbl_geodesicas = QLabel("Geodésicas (Reconstrucción)"); lbl_geodesicas.setObjectName("TituloSeccion")
+        lay_morfo.addWidget(lbl_geodesicas)
+        for etiqueta in ("Apertura por Reconstrucción", "Cierre por Reconstrucción", "Rellenar Huecos",
+                         "Máximos Regionales", "Mínimos Regionales", "H-Domos"):
+            self.crear_boton(etiqueta, lambda _=False, e=etiqueta: self.aplicar_morfologia(e), lay_morfo)
         
         lay_morfo.addStretch()
         self.toolbox.addItem(page_morfo, "4. Morfología Matemática")
@@ -243,6 +305,8 @@ class VentanaPrincipal(QMainWindow):
         lay_freq = QVBoxLayout(page_freq)
         self.crear_boton("Pasa Bajas Ideal (FFT)", lambda: self.aplicar_filtro_frec("PASA_BAJAS"), lay_freq)
         self.crear_boton("Pasa Altas Ideal (FFT)", lambda: self.aplicar_filtro_frec("PASA_ALTAS"), lay_freq)
+        self.crear_boton("Banco de Filtros (Butterworth/Gauss)", self.menu_banco_frec_popup, lay_freq)
+        self.crear_boton("Ajustar Radio de Corte (Vista Previa)", self.menu_vista_previa_frec_popup, lay_freq)
         lay_freq.addStretch()
         self.toolbox.addItem(page_freq, "5. Filtros Frecuenciales")
         
@@ -253,6 +317,24 @@ class VentanaPrincipal(QMainWindow):
         self.lbl_info.setStyleSheet("color: #666; font-size: 11px; margin-top: 10px;")
         layout_lateral.addWidget(self.lbl_info)
 
+        # Memoria ocupada por el historial de deshacer/rehacer
+        self.lbl_memoria = QLabel("Historial: 0.0 MB")
+        self.lbl_memoria.setStyleSheet("color: #666; font-size: 11px;")
+        layout_lateral.addWidget(self.lbl_memoria)
+
+        # Progreso de la operación en curso (oculto si no hay ninguna)
+        layout_progreso = QHBoxLayout()
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setRange(0, 100)
+        self.barra_progreso.setFixedHeight(14)
+        self.btn_cancelar = QPushButton("Cancelar")
+        self.btn_cancelar.clicked.connect(self.cancelar_trabajo)
+        layout_progreso.addWidget(self.barra_progreso)
+        layout_progreso.addWidget(self.btn_cancelar)
+        layout_lateral.addLayout(layout_progreso)
+        self.barra_progreso.hide()
+        self.btn_cancelar.hide()
+
         layout_principal.addWidget(panel_lateral)
 
         # --- 2. ZONA DE VISORES (Derecha) ---
@@ -318,11 +400,24 @@ class VentanaPrincipal(QMainWindow):
         menu.addAction("Modelo CMYK", lambda: self.aplicar_modelo("CMYK"))
         menu.exec(QIcon(), self.cursor().pos())
 
+    def menu_binarizacion_popup(self):
+        menu = QMenu(self)
+        self.estilizar_menu(menu)
+        menu.addAction("Niblack", lambda: self.aplicar_modelo("NIBLACK"))
+        menu.addAction("Sauvola", lambda: self.aplicar_modelo("SAUVOLA"))
+        menu.addSeparator()
+        menu.addAction("Niblack (ajustar ventana)", lambda: self.abrir_vista_previa("aplicar_modelo", "ventana", "NIBLACK"))
+        menu.addAction("Sauvola (ajustar ventana)", lambda: self.abrir_vista_previa("aplicar_modelo", "ventana", "SAUVOLA"))
+        menu.exec(QIcon(), self.cursor().pos())
+
     def menu_paso_bajas_popup(self):
         menu = QMenu(self)
         self.estilizar_menu(menu)
         menu.addAction("Promedio (Media)", lambda: self.aplicar_filtro("Promedio"))
         menu.addAction("Gaussiano", lambda: self.aplicar_filtro("Gaussiano"))
+        menu.addSeparator()
+        menu.addAction("Guiado (preserva bordes)", lambda: self.aplicar_filtro("Guiado"))
+        menu.addAction("Bilateral (preserva bordes)", lambda: self.aplicar_filtro("Bilateral"))
         menu.exec(QIcon(), self.cursor().pos())
 
     def menu_paso_altas_popup(self):
@@ -330,6 +425,7 @@ class VentanaPrincipal(QMainWindow):
         self.estilizar_menu(menu)
         menu.addAction("Canny (Óptimo)", lambda: self.aplicar_filtro("Canny"))
         menu.addAction("Sobel", lambda: self.aplicar_filtro("Sobel"))
+        menu.addAction("Scharr", lambda: self.aplicar_filtro("Scharr"))
         menu.addAction("Prewitt", lambda: self.aplicar_filtro("Prewitt"))
         menu.addAction("Laplaciano", lambda: self.aplicar_filtro("Laplaciano"))
         menu.exec(QIcon(), self.cursor().pos())
@@ -341,6 +437,31 @@ class VentanaPrincipal(QMainWindow):
         menu.addAction("Máximo", lambda: self.aplicar_filtro("Máximo"))
         menu.exec(QIcon(), self.cursor().pos())
 
+    def menu_vista_previa_popup(self):
+        menu = QMenu(self)
+        self.estilizar_menu(menu)
+        for etiqueta in ("Promedio", "Mediana", "Gaussiano", "Mínimo", "Máximo"):
+            menu.addAction(etiqueta, lambda e=etiqueta: self.abrir_vista_previa(FILTROS_UI[e], "kernel_size"))
+        menu.addAction("Guiado", lambda: self.abrir_vista_previa("filtro_guiado", "radio"))
+        menu.addAction("Bilateral", lambda: self.abrir_vista_previa("filtro_bilateral_rejilla", "sigma_espacial"))
+        menu.exec(QIcon(), self.cursor().pos())
+
+    def menu_vista_previa_morfo_popup(self):
+        menu = QMenu(self)
+        self.estilizar_menu(menu)
+        for etiqueta, nombre in MORFOLOGIA_UI.items():
+            # Solo las que tienen kernel (rellenar huecos, máximos regionales... no)
+            if any(p.nombre == "kernel_size" for p in registro.obtener(nombre).parametros):
+                menu.addAction(etiqueta, lambda n=nombre: self.abrir_vista_previa(n, "kernel_size"))
+        menu.exec(QIcon(), self.cursor().pos())
+
+    def menu_vista_previa_frec_popup(self):
+        menu = QMenu(self)
+        self.estilizar_menu(menu)
+        menu.addAction("Pasa Bajas Ideal", lambda: self.abrir_vista_previa("aplicar_filtro_ideal", "radio_corte", "PASA_BAJAS"))
+        menu.addAction("Pasa Altas Ideal", lambda: self.abrir_vista_previa("aplicar_filtro_ideal", "radio_corte", "PASA_ALTAS"))
+        menu.exec(QIcon(), self.cursor().pos())
+
     def estilizar_menu(self, menu):
         menu.setStyleSheet("""
             QMenu { background-color: #2d2d2d; color: white; border: 1px solid #444; }
@@ -352,20 +473,89 @@ class VentanaPrincipal(QMainWindow):
     #              LÓGICA (MÉTODOS)
     # ==========================================
 
+    def ejecutar_operacion(self, nombre, *args, al_terminar=None):
+        """
+        Lanza la operación `nombre` del registro sobre imagen_mostrada en segundo plano.
+        Cuando termina, se registra en el historial, pasa a ser la imagen mostrada
+        y se llama al_terminar(resultado) para actualizar la interfaz.
+        Un trabajo anterior que siga en curso se cancela y su resultado se descarta.
+        """
+        self.cancelar_trabajo()
+        operacion = registro.obtener(nombre)
+        previa = self.imagen_mostrada
+
+        self._id_trabajo += 1
+        trabajo = TrabajoOperacion(self._id_trabajo, operacion, previa, args)
+
+        def terminado(id_trabajo, resultado):
+            if id_trabajo != self._id_trabajo: return  # Trabajo cancelado o reemplazado
+            self._fin_trabajo()
+            if resultado is None: return
+            congelar(resultado)
+            self.gestor.registrar(previa, resultado, operacion, *args)
+            self.imagen_mostrada = resultado
+            if al_terminar is not None: al_terminar(resultado)
+            self.actualizar_visores()
+
+        def fallo(id_trabajo, mensaje):
+            if id_trabajo != self._id_trabajo: return
+            self._fin_trabajo()
+            QMessageBox.critical(self, "Error", mensaje)
+
+        trabajo.senales.terminado.connect(terminado)
+        trabajo.senales.fallo.connect(fallo)
+        trabajo.senales.progreso.connect(self._progreso_trabajo)
+        self.trabajo_actual = trabajo
+        self.barra_progreso.setValue(0)
+        self.barra_progreso.show()
+        self.btn_cancelar.show()
+        self.lbl_info.setText(f"Procesando: {operacion.descripcion or nombre}...")
+        self.pool.start(trabajo)
+
+    def cancelar_trabajo(self):
+        """Cancela el trabajo en curso (su resultado, si llega, se ignora)"""
+        if self.trabajo_actual is None: return
+        self.trabajo_actual.cancelar()
+        self._id_trabajo += 1
+        self._fin_trabajo()
+        self.lbl_info.setText("Operación cancelada")
+
+    def _progreso_trabajo(self, id_trabajo, porcentaje):
+        if id_trabajo == self._id_trabajo:
+            self.barra_progreso.setValue(porcentaje)
+
+    def _fin_trabajo(self):
+        self.trabajo_actual = None
+        self.barra_progreso.hide()
+        self.btn_cancelar.hide()
+
+    def abrir_vista_previa(self, nombre, nombre_parametro, *args_fijos):
+        """
+        Ajusta un parámetro con vista previa sobre un proxy del tamaño del visor.
+        Solo al pulsar Aplicar se ejecuta a resolución completa (y entra al historial).
+        """
+        if self.imagen_mostrada is None: return
+        operacion = registro.obtener(nombre)
+        parametro = next(p for p in operacion.parametros if p.nombre == nombre_parametro)
+        dialogo = VentanaVistaPrevia(self.imagen_mostrada, operacion, parametro, args_fijos,
+                                     tam_proxy=(self.visor_der.width(), self.visor_der.height()),
+                                     parent=self)
+        if not dialogo.exec(): return
+        valor = dialogo.valor()
+
+        def listo(resultado):
+            if len(resultado.shape) == 2: self.modelo_actual = "GRAY"
+            self.lbl_info.setText(f"{operacion.descripcion or nombre} ({nombre_parametro}={valor})")
+        self.ejecutar_operacion(nombre, *args_fijos, valor, al_terminar=listo)
+
     def ecualizar_histograma(self):
         if self.imagen_mostrada is None: return
-        self.gestor.guardar_estado(self.imagen_mostrada)
-        
-        if len(self.imagen_mostrada.shape) == 3:
-            img_gray = cv2.cvtColor(self.imagen_mostrada, cv2.COLOR_BGR2GRAY)
-            res = cv2.equalizeHist(img_gray)
-            self.imagen_mostrada = res
-            self.modelo_actual = "GRAY"
-        else:
-            self.imagen_mostrada = cv2.equalizeHist(self.imagen_mostrada)
-        
-        self.actualizar_visores()
-        self.lbl_info.setText("Info: Histograma ecualizado.")
+        era_color = len(self.imagen_mostrada.shape) == 3
+
+        def listo(resultado):
+            if era_color: self.modelo_actual = "GRAY"
+            self.lbl_info.setText("Info: Histograma ecualizado.")
+        self.ejecutar_operacion("ecualizar_histograma", al_terminar=listo)
 
     def mostrar_histograma_simple(self):
         self._mostrar_hist(con_stats=False)
@@ -382,20 +572,29 @@ class VentanaPrincipal(QMainWindow):
         stats = None
         if con_stats:
             stats = analisis.calcular_estadisticas(self.imagen_mostrada)
-        dialogo = VentanaHistograma(fig, stats)
+        # La imagen está congelada: el espectro se puede calcular en otro hilo sin copiarla
+        dialogo = VentanaHistograma(fig, stats, self.imagen_mostrada if con_stats else None)
         dialogo.exec() 
 
+    def menu_banco_frec_popup(self):
+        menu = QMenu(self)
+        self.estilizar_menu(menu)
+        for familia, etiqueta_familia in (("BUTTERWORTH", "Butterworth"), ("GAUSSIANO", "Gaussiano")):
+            for tipo, etiqueta_tipo in (("PASA_BAJAS", "Pasa Bajas"), ("PASA_ALTAS", "Pasa Altas"),
+                                        ("PASA_BANDA", "Pasa Banda"), ("RECHAZA_BANDA", "Rechaza Banda")):
+                menu.addAction(f"{etiqueta_tipo} {etiqueta_familia}",
+                               lambda f=familia, t=tipo: self.abrir_vista_previa(
+                                   "aplicar_filtro_frecuencia", "radio_corte", f, t))
+            menu.addSeparator()
+        menu.exec(QIcon(), self.cursor().pos())
+
     def aplicar_filtro_frec(self, tipo):
         if self.imagen_mostrada is None: return
-        self.gestor.guardar_estado(self.imagen_mostrada)
-        try:
-            res = frecuencia.aplicar_filtro_ideal(self.imagen_mostrada, tipo, radio_corte=40)
-            self.imagen_mostrada = res
+
+        def listo(resultado):
             self.modelo_actual = "GRAY"
-            self.actualizar_visores()
             self.lbl_info.setText(f"Info: Filtro Frecuencial {tipo} aplicado.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.ejecutar_operacion("aplicar_filtro_ideal", tipo, 40, al_terminar=listo)
 
     def cargar_imagen(self):
         archivo, _ = QFileDialog.getOpenFileName(self, "Abrir imagen", self.ruta_data, "Imagenes (*.png *.jpg *.bmp *.tif)")
@@ -404,10 +603,12 @@ class VentanaPrincipal(QMainWindow):
             if img is None:
                 QMessageBox.critical(self, "Error", "No se pudo leer la imagen.")
                 return
+            self.cancelar_trabajo()
             self.gestor.reiniciar()
             self.modelo_actual = "RGB"
-            self.imagen_original = img
-            self.imagen_mostrada = img.copy()
+            # Original y mostrada comparten buffer: está congelado, nadie lo modifica
+            self.imagen_original = congelar(img)
+            self.imagen_mostrada = img
             self.actualizar_visores()
             self.lbl_info.setText(f"Cargado: {os.path.basename(archivo)}")
 
@@ -418,24 +619,79 @@ class VentanaPrincipal(QMainWindow):
         cv2.imwrite(ruta_completa, self.imagen_mostrada)
         QMessageBox.information(self, "Guardado", f"Imagen guardada en:\n{ruta_completa}")
 
+    def cambiar_modo_historial(self, modo):
+        if modo == self.modo_historial: return
+        self.cancelar_trabajo()
+        self.gestor.reiniciar()
+        if hasattr(self.gestor, "cerrar"): self.gestor.cerrar()  # Borra su directorio temporal
+        self.gestor = crear_gestor(modo)
+        self.modo_historial = modo
+        self.actualizar_visores()
+        self.lbl_info.setText(f"Historial: {MODOS_HISTORIAL_UI.get(modo, modo)} (vacío)")
+
     def accion_atras(self):
-        imagen_anterior = self.gestor.deshacer(self.imagen_mostrada)
-        if imagen_anterior is not None:
-            self.imagen_mostrada = imagen_anterior
-            self.modelo_actual = "RGB"
-            self.actualizar_visores()
-            self.lbl_info.setText("Acción deshecha")
+        self._navegar_historial(rehacer=False)
 
     def accion_adelante(self):
-        imagen_siguiente = self.gestor.rehacer(self.imagen_mostrada)
-        if imagen_siguiente is not None:
-            self.imagen_mostrada = imagen_siguiente
-            self.modelo_actual = "RGB"
-            self.actualizar_visores()
-            self.lbl_info.setText("Acción rehecha")
+        self._navegar_historial(rehacer=True)
+
+    def _navegar_historial(self, rehacer):
+        """
+        Deshacer/rehacer. Con el registro de operaciones, volver a un estado que no
+        es checkpoint re-ejecuta pasos: eso va en segundo plano como cualquier
+        operación y el historial solo se mueve cuando termina (cancelarlo no cambia nada).
+        """
+        self.cancelar_trabajo()
+        texto = "Acción rehecha" if rehacer else "Acción deshecha"
+        if not isinstance(self.gestor, GestorOperaciones):
+            imagen = self.gestor.rehacer(self.imagen_mostrada) if rehacer else self.gestor.deshacer(self.imagen_mostrada)
+            self._mostrar_estado(imagen, texto)
+            return
+
+        indice = self.gestor.indice_rehacer() if rehacer else self.gestor.indice_deshacer()
+        if indice is None: return
+        checkpoint, pasos = self.gestor.plan(indice)
+        if not pasos:
+            self.gestor.ir_a(indice)
+            self._mostrar_estado(checkpoint, texto)
+            return
+
+        self._id_trabajo += 1
+        trabajo = TrabajoCalculo(self._id_trabajo, reproducir, checkpoint, pasos)
+        gestor = self.gestor
+
+        def terminado(id_trabajo, imagen):
+            if id_trabajo != self._id_trabajo: return
+            self._fin_trabajo()
+            gestor.ir_a(indice)
+            self._mostrar_estado(imagen, texto)
+
+        def fallo(id_trabajo, mensaje):
+            if id_trabajo != self._id_trabajo: return
+            self._fin_trabajo()
+            QMessageBox.critical(self, "Error", mensaje)
+
+        trabajo.senales.terminado.connect(terminado)
+        trabajo.senales.fallo.connect(fallo)
+        self.trabajo_actual = trabajo
+        self.barra_progreso.setValue(0)
+        self.barra_progreso.show()
+        self.btn_cancelar.show()
+        self.lbl_info.setText(f"Reconstruyendo ({len(pasos)} pasos)...")
+        self.pool.start(trabajo)
+
+    def _mostrar_estado(self, imagen, texto):
+        if imagen is None: return
+        self.imagen_mostrada = imagen
+        self.modelo_actual = "RGB"
+        self.actualizar_visores()
+        self.lbl_info.setText(texto)
 
     def actualizar_visores(self):
         if self.imagen_mostrada is None: return
+        self.lbl_memoria.setText(
+            f"Historial: {self.gestor.bytes_historial / 1024**2:.1f} MB | "
+            f"Caché: {CACHE.bytes / 1024**2:.1f} MB ({CACHE.aciertos} aciertos, {CACHE.fallos} fallos)")
         
         # Si hay historial, mostramos ambos. Si no, solo el de trabajo.
         if not self.gestor.historial:
@@ -474,6 +730,12 @@ class VentanaPrincipal(QMainWindow):
         self.actualizar_visores()
         super().resizeEvent(event)
 
+    def closeEvent(self, event):
+        # El historial en disco borra su directorio temporal al cerrar la ventana
+        self.cancelar_trabajo()
+        if hasattr(self.gestor, "cerrar"): self.gestor.cerrar()
+        super().closeEvent(event)
+
     def mostrar_canales(self):
         if self.imagen_mostrada is None: return
         if not hasattr(self, 'modelo_actual'): self.modelo_actual = "RGB"
@@ -491,94 +753,50 @@ class VentanaPrincipal(QMainWindow):
 
     def aplicar_modelo(self, modelo):
         if self.imagen_mostrada is None: return
-        self.gestor.guardar_estado(self.imagen_mostrada)
-        self.modelo_actual = modelo 
-        resultado = colores.aplicar_modelo(self.imagen_mostrada, modelo)
-        self.imagen_mostrada = resultado
-        self.actualizar_visores()
-        self.lbl_info.setText(f"Modelo aplicado: {modelo}")
+
+        def listo(resultado):
+            # Las binarizaciones locales dan una imagen en grises
+            self.modelo_actual = "GRAY" if modelo in ("NIBLACK", "SAUVOLA") else modelo
+            self.lbl_info.setText(f"Modelo aplicado: {modelo}")
+        self.ejecutar_operacion("aplicar_modelo", modelo, al_terminar=listo)
 
     def aplicar_morfologia(self, operacion):
         if self.imagen_mostrada is None: return
-        self.gestor.guardar_estado(self.imagen_mostrada)
-        KERNEL_FIJO = 5  
-        resultado = None
-        if operacion == "Erosión": resultado = morfologia.erosion(self.imagen_mostrada, KERNEL_FIJO)
-        elif operacion == "Dilatación": resultado = morfologia.dilatacion(self.imagen_mostrada, KERNEL_FIJO)
-        elif operacion == "Apertura": resultado = morfologia.apertura_ex(self.imagen_mostrada, KERNEL_FIJO)
-        elif operacion == "Cierre": resultado = morfologia.cierre_ex(self.imagen_mostrada, KERNEL_FIJO)
-
-        if resultado is not None:
-            self.imagen_mostrada = resultado
+
+        def listo(resultado):
             self.modelo_actual = "GRAY"
-            self.actualizar_visores()
             self.lbl_info.setText(f"Morfología: {operacion}")
+        self.ejecutar_operacion(MORFOLOGIA_UI[operacion], al_terminar=listo)
 
     def aplicar_filtro(self, nombre_filtro):
         if self.imagen_mostrada is None: return
-        self.gestor.guardar_estado(self.imagen_mostrada)
-        KERNEL_STD = 3
-        resultado = None
-        try:
-            if nombre_filtro == "Promedio": resultado = filtros.filtro_promedio(self.imagen_mostrada, KERNEL_STD)
-            elif nombre_filtro == "Mediana": resultado = filtros.filtro_mediana(self.imagen_mostrada, KERNEL_STD)
-            elif nombre_filtro == "Gaussiano": resultado = filtros.filtro_gaussiano(self.imagen_mostrada, KERNEL_STD)
-            elif nombre_filtro == "Máximo": resultado = filtros.filtro_maximo(self.imagen_mostrada, KERNEL_STD)
-            elif nombre_filtro == "Mínimo": resultado = filtros.filtro_minimo(self.imagen_mostrada, KERNEL_STD)
-            elif nombre_filtro == "Sobel": resultado = filtros.filtro_sobel(self.imagen_mostrada)
-            elif nombre_filtro == "Prewitt": resultado = filtros.filtro_prewitt(self.imagen_mostrada)
-            elif nombre_filtro == "Canny": resultado = filtros.filtro_canny(self.imagen_mostrada)
-            elif nombre_filtro == "Laplaciano": resultado = filtros.filtro_laplaciano(self.imagen_mostrada)
-
-            if resultado is not None:
-                self.imagen_mostrada = resultado
-                if len(resultado.shape) == 2: self.modelo_actual = "GRAY"
-                self.actualizar_visores()
-                self.lbl_info.setText(f"Filtro: {nombre_filtro}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+
+        def listo(resultado):
+            if len(resultado.shape) == 2: self.modelo_actual = "GRAY"
+            self.lbl_info.setText(f"Filtro: {nombre_filtro}")
+        self.ejecutar_operacion(FILTROS_UI[nombre_filtro], al_terminar=listo)
     
     def aplicar_logica(self, tipo_operacion):
         if self.imagen_mostrada is None: return
         if tipo_operacion == "NOT":
-            self.gestor.guardar_estado(self.imagen_mostrada)
-            self.imagen_mostrada = operaciones_logicas.operacion_not(self.imagen_mostrada)
-            self.actualizar_visores()
-            self.lbl_info.setText("Lógica: NOT")
+            self.ejecutar_operacion(LOGICAS_UI["NOT"],
+                                    al_terminar=lambda r: self.lbl_info.setText("Lógica: NOT"))
             return
         archivo, _ = QFileDialog.getOpenFileName(self, f"Imagen para {tipo_operacion}", "", "Img (*.png *.jpg *.bmp)")
         if not archivo: return
         img_sec = cv2.imread(archivo)
         if img_sec is None: return
-        self.gestor.guardar_estado(self.imagen_mostrada)
-        res = None
-        if tipo_operacion == "AND": res = operaciones_logicas.operacion_and(self.imagen_mostrada, img_sec)
-        elif tipo_operacion == "OR": res = operaciones_logicas.operacion_or(self.imagen_mostrada, img_sec)
-        elif tipo_operacion == "XOR": res = operaciones_logicas.operacion_xor(self.imagen_mostrada, img_sec)
-        
-        if res is not None:
-            self.imagen_mostrada = res
-            self.actualizar_visores()
-            self.lbl_info.setText(f"Lógica: {tipo_operacion}")
+        self.ejecutar_operacion(LOGICAS_UI[tipo_operacion], img_sec,
+                                al_terminar=lambda r: self.lbl_info.setText(f"Lógica: {tipo_operacion}"))
 
     def gestionar_aritmetica(self, operacion):
         if self.imagen_mostrada is None: return
         if operacion == "INV":
-            self.gestor.guardar_estado(self.imagen_mostrada)
-            self.imagen_mostrada = operaciones_aritmeticas.inversion_aritmetica(self.imagen_mostrada)
-            self.actualizar_visores()
-            self.lbl_info.setText("Invertido")
+            self.ejecutar_operacion(ARITMETICA_UI["INV"],
+                                    al_terminar=lambda r: self.lbl_info.setText("Invertido"))
             return
         
         val, ok = QInputDialog.getDouble(self, "Valor", "Introduce valor (ej. 50 suma, 1.5 mult):", 1.0, -255, 255, 2)
         if not ok: return
-        self.gestor.guardar_estado(self.imagen_mostrada)
-        res = None
-        if operacion == "SUMA": res = operaciones_aritmeticas.suma_escalar(self.imagen_mostrada, val)
-        elif operacion == "MULT": res = operaciones_aritmeticas.multiplicacion_escalar(self.imagen_mostrada, val)
-        elif operacion == "RESTA": res = operaciones_aritmeticas.resta_escalar(self.imagen_mostrada, val)
-        
-        if res is not None:
-            self.imagen_mostrada = res
-            self.actualizar_visores()
-            self.lbl_info.setText(f"Aritmética: {operacion} ({val})")
\ No newline at end of file
+        self.ejecutar_operacion(ARITMETICA_UI[operacion], val,
+                                al_terminar=lambda r: self.lbl_info.setText(f"Aritmética: {operacion} ({val})"))
\ No newline at end of file
@@ -1,11 +1,19 @@
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QGroupBox, QFormLayout
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QGroupBox, QFormLayout, QSlider, QDialogButtonBox, QTabWidget
+)
 from PyQt6.QtGui import QImage, QPixmap
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, QThreadPool
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 import cv2
+import numpy as np
+
+from src.logic import analisis
+from src.logic import granulometria
+from src.logic.inmutable import congelar
+from src.ui.trabajador import TrabajoCalculo
 
 class VentanaHistograma(QDialog):
-    def __init__(self, figura_matplotlib, estadisticas=None):
+    def __init__(self, figura_matplotlib, estadisticas=None, imagen_espectro=None):
         super().__init__()
         self.setWindowTitle("Histograma y Propiedades")
         self.resize(800, 500)
@@ -13,9 +21,22 @@ class VentanaHistograma(QDialog):
         # Layout Principal Horizontal: Gráfico a la izq, Datos a la der
         layout_main = QHBoxLayout()
         
-        # 1. Canvas Matplotlib
+        # 1. Canvas Matplotlib (con el espectro de patrones en otra pestaña si se da la imagen)
         canvas = FigureCanvas(figura_matplotlib)
-        layout_main.addWidget(canvas, stretch=2) # El gráfico ocupa más espacio
+        self.imagen_espectro = imagen_espectro
+        self.trabajo_espectro = None
+        if imagen_espectro is not None:
+            # El espectro son decenas de aperturas/cierres a resolución completa:
+            # se calcula en segundo plano y solo si se abre su pestaña
+            self.pestanas = QTabWidget()
+            self.pestanas.addTab(canvas, "Histograma")
+            self.lbl_espectro = QLabel("Calculando el espectro de patrones...")
+            self.lbl_espectro.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.pestanas.addTab(self.lbl_espectro, "Espectro de Patrones")
+            self.pestanas.currentChanged.connect(self._pestana_cambiada)
+            layout_main.addWidget(self.pestanas, stretch=2)
+        else:
+            layout_main.addWidget(canvas, stretch=2) # El gráfico ocupa más espacio
         
         # 2. Panel de Estadísticas (Si se proveen)
         if estadisticas:
@@ -41,6 +62,22 @@ class VentanaHistograma(QDialog):
 
         self.setLayout(layout_main)
 
+    def _pestana_cambiada(self, indice):
+        if indice != 1 or self.trabajo_espectro is not None: return
+        self.trabajo_espectro = TrabajoCalculo(0, granulometria.espectro_patron, self.imagen_espectro)
+        self.trabajo_espectro.senales.terminado.connect(self._espectro_listo)
+        self.trabajo_espectro.senales.fallo.connect(self._espectro_fallo)
+        QThreadPool.globalInstance().start(self.trabajo_espectro)
+
+    def _espectro_listo(self, _, resultado):
+        canvas = FigureCanvas(analisis.figura_espectro_patron(*resultado))
+        self.pestanas.removeTab(1)
+        self.pestanas.insertTab(1, canvas, "Espectro de Patrones")
+        self.pestanas.setCurrentIndex(1)
+
+    def _espectro_fallo(self, _, mensaje):
+        self.lbl_espectro.setText(f"No se pudo calcular el espectro: {mensaje}")
+
 class VentanaCanales(QDialog):
     def __init__(self, lista_canales):
         super().__init__()
@@ -74,4 +111,90 @@ class VentanaCanales(QDialog):
             v_box.addWidget(lbl_img)
             layout.addLayout(v_box)
             
-        self.setLayout(layout)
\ No newline at end of file
+        self.setLayout(layout)
+
+def _a_pixmap(img):
+    if len(img.shape) == 2:
+        h, w = img.shape
+        q_img = QImage(img.data, w, h, img.strides[0], QImage.Format.Format_Grayscale8)
+    else:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        h, w, _ = img.shape
+        q_img = QImage(img.data, w, h, img.strides[0], QImage.Format.Format_RGB888)
+    return QPixmap.fromImage(q_img)
+
+class VentanaVistaPrevia(QDialog):
+    """
+    Vista previa en vivo de una operación mientras se mueve un parámetro.
+    Trabaja sobre una copia reducida (proxy) del tamaño del visor y recalcula con
+    un pequeño retardo (debounce). No toca el historial: la ventana principal
+    ejecuta la operación a resolución completa solo si el usuario pulsa Aplicar.
+    """
+    RETARDO_MS = 120
+
+    def __init__(self, imagen, operacion, parametro, args_fijos=(), valor_inicial=None,
+                 tam_proxy=(400, 400), parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Vista previa: {operacion.descripcion or operacion.nombre}")
+        self.resize(tam_proxy[0] + 40, tam_proxy[1] + 120)
+        self.operacion = operacion
+        self.parametro = parametro
+        self.args_fijos = tuple(args_fijos)
+
+        # Proxy: la imagen reducida para que quepa en el visor
+        h, w = imagen.shape[:2]
+        self.escala = min(1.0, tam_proxy[0] / w, tam_proxy[1] / h)
+        if self.escala < 1.0:
+            tam = (max(1, round(w * self.escala)), max(1, round(h * self.escala)))
+            # Congelado: las cachés por imagen (p. ej. la tabla integral) sirven entre recálculos
+            self.proxy = congelar(cv2.resize(imagen, tam, interpolation=cv2.INTER_AREA))
+        else:
+            self.proxy = imagen
+
+        layout = QVBoxLayout()
+        self.lbl_img = QLabel()
+        self.lbl_img.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.lbl_img.setMinimumSize(*tam_proxy)
+        layout.addWidget(self.lbl_img)
+
+        fila = QHBoxLayout()
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setRange(int(parametro.minimo or 1), int(min(parametro.maximo or 100, 101)))
+        self.slider.setValue(int(valor_inicial if valor_inicial is not None else parametro.defecto))
+        self.lbl_valor = QLabel()
+        self.lbl_valor.setMinimumWidth(110)
+        fila.addWidget(self.slider)
+        fila.addWidget(self.lbl_valor)
+        layout.addLayout(fila)
+
+        botones = QDialogButtonBox(QDialogButtonBox.StandardButton.Apply | QDialogButtonBox.StandardButton.Cancel)
+        botones.button(QDialogButtonBox.StandardButton.Apply).clicked.connect(self.accept)
+        botones.rejected.connect(self.reject)
+        layout.addWidget(botones)
+        self.setLayout(layout)
+
+        # Debounce: cada movimiento reinicia el temporizador, solo se calcula al parar
+        self.temporizador = QTimer(self)
+        self.temporizador.setSingleShot(True)
+        self.temporizador.setInterval(self.RETARDO_MS)
+        self.temporizador.timeout.connect(self.recalcular)
+        self.slider.valueChanged.connect(self._valor_cambiado)
+        self._valor_cambiado(self.slider.value())
+        self.recalcular()
+
+    def valor(self):
+        return self.slider.value()
+
+    def _valor_cambiado(self, valor):
+        self.lbl_valor.setText(f"{self.parametro.nombre}: {valor}")
+        self.temporizador.start()
+
+    def recalcular(self):
+        # Un kernel de k píxeles en la imagen completa equivale a k*escala en el proxy
+        valor = self.parametro.escalar(self.valor(), self.escala)
+        try:
+            resultado = self.operacion(self.proxy, *self.args_fijos, valor)
+        except Exception as e:
+            self.lbl_img.setText(str(e))
+            return
+        self.lbl_img.setPixmap(_a_pixmap(np.ascontiguousarray(resultado)))
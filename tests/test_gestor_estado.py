@@ -0,0 +1,127 @@
+"""
+El historial no debe bloquear el hilo de la interfaz esperando a las
+compresiones en segundo plano, ni al medir su tamaño ni al recortarlo, y una
+ráfaga de operaciones sobre fotogramas grandes no debe dejarlo en 1-3 pasos.
+Uso (desde la raíz del proyecto):  python -m pytest -q tests
+"""
+import gc
+import os
+import threading
+import time
+import weakref
+
+import numpy as np
+
+from src.logic import gestor_estado
+from src.logic.gestor_estado import GestorEstado, GestorEstadoDisco, GestorOperaciones, reproducir
+from src.logic.inmutable import es_inmutable
+
+FOTOGRAMA = 1000 * 1000
+
+def _imagen(valor):
+    return np.full((1000, 1000), valor, np.uint8)
+
+def _compresion_bloqueada(monkeypatch):
+    """Hace que archivar() se quede dentro del lock hasta que se suelte el evento"""
+    soltar = threading.Event()
+    dentro = threading.Event()
+    original = gestor_estado.Instantanea.archivar
+
+    def archivar(self):
+        with self._lock:
+            dentro.set()
+            soltar.wait(10)
+        original(self)
+    monkeypatch.setattr(gestor_estado.Instantanea, "archivar", archivar)
+    return dentro, soltar
+
+def _esperar_compresiones(gestor):
+    for futuro in list(gestor._pendientes.values()):
+        futuro.result()
+
+def test_medir_y_recortar_no_esperan_a_la_compresion(monkeypatch):
+    dentro, soltar = _compresion_bloqueada(monkeypatch)
+    gestor = GestorEstado(presupuesto_bytes=3 * FOTOGRAMA, recientes=1)
+    try:
+        gestor.guardar_estado(_imagen(1))
+        gestor.guardar_estado(_imagen(2))  # La primera empieza a comprimirse
+        assert dentro.wait(5)
+
+        inicio = time.perf_counter()
+        for valor in range(3, 8):
+            gestor.guardar_estado(_imagen(valor))
+            assert gestor.bytes_previstos <= gestor.presupuesto_bytes
+        assert time.perf_counter() - inicio < 1.0
+        # Se conserva lo más reciente
+        assert gestor.historial[-1].obtener()[0, 0] == 7
+    finally:
+        soltar.set()
+        gestor._compresor.shutdown(wait=True)
+
+def test_tamano_comprimido_al_terminar():
+    gestor = GestorEstado(recientes=1)
+    gestor.guardar_estado(_imagen(1))
+    gestor.guardar_estado(_imagen(2))
+    for futuro in list(gestor._pendientes.values()):
+        futuro.result()
+    assert gestor.historial[0].archivada
+    assert gestor.bytes_historial < FOTOGRAMA + FOTOGRAMA // 10
+    assert gestor.deshacer(_imagen(3))[0, 0] == 2
+    assert gestor.deshacer(_imagen(2))[0, 0] == 1
+
+def test_rafaga_con_fotogramas_grandes_conserva_pasos(monkeypatch):
+    # Fotogramas "grandes" respecto al presupuesto base: con el presupuesto fijo y
+    # las compresiones en cola contadas en crudo solo quedaban 2 pasos
+    monkeypatch.setattr(gestor_estado, "PRESUPUESTO_BASE", 3 * FOTOGRAMA)
+    dentro, soltar = _compresion_bloqueada(monkeypatch)
+    gestor = GestorEstado()
+    try:
+        for valor in range(12):
+            gestor.guardar_estado(_imagen(valor))
+        assert dentro.wait(5)
+        assert gestor.presupuesto == gestor_estado.FOTOGRAMAS_PRESUPUESTO * FOTOGRAMA
+        assert len(gestor.historial) >= 8
+    finally:
+        soltar.set()
+    for futuro in list(gestor._pendientes.values()):
+        futuro.result()
+    # Los pasos que quedan se pueden deshacer en orden
+    actual = _imagen(12)
+    for valor in range(11, 3, -1):
+        actual = gestor.deshacer(actual)
+        assert actual[0, 0] == valor
+    gestor._compresor.shutdown(wait=True)
+
+def test_operaciones_reconstruye_congelado_y_plan_no_mueve_el_historial():
+    gestor = GestorOperaciones(intervalo_checkpoint=5)
+    sumar = lambda imagen, n: imagen + np.uint8(n)
+    imagen = _imagen(0)
+    for n in range(1, 4):
+        resultado = sumar(imagen, n)
+        gestor.registrar(imagen, resultado, sumar, n)
+        imagen = resultado
+
+    indice = gestor.indice_deshacer()
+    checkpoint, pasos = gestor.plan(indice)
+    assert len(pasos) == 2 and gestor.indice_deshacer() == indice  # Sin cambios hasta ir_a
+    reconstruida = reproducir(checkpoint, pasos)
+    assert reconstruida[0, 0] == 3 and es_inmutable(reconstruida)
+
+    anterior = gestor.deshacer(imagen)
+    assert anterior[0, 0] == 3 and es_inmutable(anterior)
+    assert gestor.rehacer(anterior)[0, 0] == 6
+
+def test_disco_cerrar_borra_y_libera_el_gestor(tmp_path):
+    gestor = GestorEstadoDisco(recientes=0, directorio=str(tmp_path))
+    gestor.guardar_estado(_imagen(1))
+    _esperar_compresiones(gestor)
+    directorio = gestor.directorio
+    assert os.listdir(directorio)
+
+    gestor.cerrar()
+    assert not os.path.exists(directorio)
+    # Sin el registro de atexit nada retiene al gestor cerrado
+    referencia = weakref.ref(gestor)
+    del gestor
+    gc.collect()
+    assert referencia() is None
@@ -0,0 +1,95 @@
+"""
+Cuenta con tracemalloc la memoria que reservan el historial, aplicar_modelo y
+la carga de imágenes: desde que las imágenes se congelan y se comparten, no
+deben copiar el fotograma completo.
+Uso (desde la raíz del proyecto):  python -m pytest -q tests
+"""
+import os
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from src.logic import colores
+from src.logic.gestor_estado import GestorEstado
+from src.logic.inmutable import congelar, editable, es_inmutable
+
+ALTO, ANCHO = 1500, 2000
+FOTOGRAMA = ALTO * ANCHO * 3  # Bytes de una imagen BGR uint8
+
+def _imagen():
+    imagen = np.random.default_rng(0).integers(0, 256, (ALTO, ANCHO, 3), dtype=np.uint8)
+    return congelar(imagen)
+
+def _pico(funcion, *args):
+    """(resultado, pico de memoria reservada durante la llamada en bytes)"""
+    tracemalloc.start()
+    try:
+        resultado = funcion(*args)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, pico
+
+def test_congelar_no_copia():
+    imagen = np.zeros((ALTO, ANCHO, 3), np.uint8)
+    congelada, pico = _pico(congelar, imagen)
+    assert congelada is imagen and es_inmutable(imagen)
+    assert pico < FOTOGRAMA // 10
+
+def test_editable_copia_solo_si_esta_congelada():
+    imagen = _imagen()
+    copia, pico = _pico(editable, imagen)
+    assert copia is not imagen and copia.flags.writeable
+    assert pico >= FOTOGRAMA
+    assert editable(copia) is copia
+
+def test_guardar_estado_no_copia():
+    gestor = GestorEstado(recientes=8)  # Sin compresión en segundo plano durante la medida
+    imagen = _imagen()
+    _, pico = _pico(gestor.guardar_estado, imagen)
+    assert pico < FOTOGRAMA // 10
+    assert np.shares_memory(gestor.historial[-1].obtener(), imagen)
+
+def test_deshacer_devuelve_el_mismo_buffer():
+    gestor = GestorEstado(recientes=8)
+    previa, actual = _imagen(), _imagen()
+    gestor.guardar_estado(previa)
+    recuperada, pico = _pico(gestor.deshacer, actual)
+    assert recuperada is previa
+    assert pico < FOTOGRAMA // 10
+
+def test_aplicar_modelo_rgb_no_copia():
+    imagen = _imagen()
+    resultado, pico = _pico(colores.aplicar_modelo, imagen, "RGB")
+    assert resultado is imagen
+    assert pico < FOTOGRAMA // 10
+
+def test_aplicar_modelo_gris_solo_reserva_la_salida():
+    imagen = _imagen()
+    resultado, pico = _pico(colores.aplicar_modelo, imagen, "GRAY")
+    assert resultado.shape == (ALTO, ANCHO)
+    # La salida en grises es un tercio del fotograma; antes se sumaba una copia BGR entera
+    assert pico < FOTOGRAMA // 3 + FOTOGRAMA // 10
+
+def test_cargar_imagen_no_copia(tmp_path, monkeypatch):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    from src.ui import ventana
+
+    aplicacion = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    ruta = str(tmp_path / "grande.png")
+    cv2.imwrite(ruta, _imagen())
+
+    principal = ventana.VentanaPrincipal()
+    monkeypatch.setattr(ventana.QFileDialog, "getOpenFileName", lambda *a, **k: (ruta, ""))
+    # El visor convierte a RGB para pintar: es la única copia legítima y no se mide
+    monkeypatch.setattr(principal, "actualizar_visores", lambda: None)
+    _, pico = _pico(principal.cargar_imagen)
+
+    # Solo el fotograma que decodifica cv2.imread
+    assert pico < FOTOGRAMA + FOTOGRAMA // 2
+    assert principal.imagen_original is principal.imagen_mostrada
+    assert es_inmutable(principal.imagen_original)
+    aplicacion.processEvents()
@@ -0,0 +1,51 @@
+"""
+La vista previa escala los parámetros espaciales al tamaño del proxy; con una
+imagen grande y un visor pequeño el valor escalado debe seguir siendo válido.
+Uso (desde la raíz del proyecto):  python -m pytest -q tests
+"""
+import os
+
+import numpy as np
+import pytest
+
+from src.logic import registro
+
+def _parametro(operacion, nombre):
+    return next(p for p in registro.obtener(operacion).parametros if p.nombre == nombre)
+
+def test_escalar_respeta_limites_y_paridad():
+    ventana = _parametro("aplicar_modelo", "ventana")
+    for valor in range(3, 256):
+        escalado = ventana.escalar(valor, 0.094)
+        assert ventana.convertir(escalado) == escalado
+        assert escalado % 2 == 1
+    assert ventana.escalar(25, 0.094) == 3
+    assert ventana.escalar(255, 1.0) == 255
+
+    sigma = _parametro("filtro_bilateral_rejilla", "sigma_espacial")
+    assert sigma.escalar(16, 0.094) == 2
+    assert _parametro("aplicar_modelo", "modelo").escalar("GRAY", 0.1) == "GRAY"
+
+@pytest.mark.parametrize("operacion, parametro, args_fijos", [
+    ("aplicar_modelo", "ventana", ("NIBLACK",)),
+    ("aplicar_modelo", "ventana", ("SAUVOLA",)),
+    ("filtro_bilateral_rejilla", "sigma_espacial", ()),
+    ("filtro_promedio", "kernel_size", ()),
+])
+def test_vista_previa_con_escala_pequena(operacion, parametro, args_fijos):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    from src.ui.ventanas_aux import VentanaVistaPrevia
+
+    aplicacion = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    # Proporciones de la foto de muestra (5312x2988) en un visor de 500x280: escala ≈ 0.094
+    imagen = np.random.default_rng(0).integers(0, 256, (2988, 5312, 3), dtype=np.uint8)
+    op = registro.obtener(operacion)
+    vista = VentanaVistaPrevia(imagen, op, _parametro(operacion, parametro), args_fijos,
+                               tam_proxy=(500, 280))
+    assert vista.escala < 0.1
+    for valor in (vista.slider.minimum(), int(_parametro(operacion, parametro).defecto), vista.slider.maximum()):
+        vista.slider.setValue(valor)
+        vista.recalcular()
+        assert vista.lbl_img.pixmap() is not None and not vista.lbl_img.pixmap().isNull(), vista.lbl_img.text()
+    aplicacion.processEvents()